@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+SSH driver parser corpus benchmark.
+
+Each parser of benchmarks/check_parsers.py is timed on each CLI output file
+of its corpus directory, in the manner of pytest-benchmark: the parse is
+repeated for a number of rounds, calibrated so that each round takes at least
+the minimum round time, and the min, mean and standard deviation of the per
+call time are reported along with the min time per parsed interface.
+
+Examples
+--------
+    invoke bench-corpus
+    python benchmarks/bench_corpus.py --ttp --rounds 10
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import time
+import argparse
+import statistics
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers.ios_ssh import show_interfaces_transceiver as ios_xcvr
+from netpaca.drivers.nxos_ssh import show_interfaces_transceiver as nxos_xcvr
+
+from check_parsers import CORPUS_PARSERS, corpus_files
+
+# -----------------------------------------------------------------------------
+#
+#                               BENCHMARK CODE
+#
+# -----------------------------------------------------------------------------
+
+TTP_PARSERS = {
+    "ios_ssh/show_interfaces_transceiver": (
+        ios_xcvr._parse_show_interface_transceiver_ttp
+    ),
+    "nxos_ssh/show_interface_transceiver_details": (
+        nxos_xcvr._parse_show_interface_transceiver_ttp
+    ),
+}
+
+
+def calibrate(parse, cli_text, min_time):
+    """ returns the number of calls per round so a round lasts min_time """
+    calls = 1
+    while True:
+        ts_start = time.perf_counter()
+        for _ in range(calls):
+            parse(cli_text)
+        if time.perf_counter() - ts_start >= min_time:
+            return calls
+        calls *= 2
+
+
+def bench(label, parse, cli_text, rounds, min_time):
+    # the TTP parsers fail on some of the corpus edge cases.
+    try:
+        interfaces = len(parse(cli_text) or ())
+    except (KeyError, ValueError) as exc:
+        print(f"  {label:<28} failed: {exc!r}")
+        return
+
+    calls = calibrate(parse, cli_text, min_time)
+    times = list()
+
+    for _ in range(rounds):
+        ts_start = time.perf_counter()
+        for _ in range(calls):
+            parse(cli_text)
+        times.append((time.perf_counter() - ts_start) / calls * 1e6)
+
+    t_min = min(times)
+    print(
+        f"  {label:<28} {interfaces:>5} {t_min:>10.1f} {statistics.mean(times):>10.1f}"
+        f" {statistics.pstdev(times):>8.1f} {t_min / max(interfaces, 1):>8.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="netpaca parser corpus benchmark")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument(
+        "--ttp", action="store_true", help="include the retained TTP parsers"
+    )
+    opts = parser.parse_args()
+
+    for corpus_name, corpus_parser in CORPUS_PARSERS.items():
+        print(
+            f"\n{corpus_name}\n"
+            f"  {'file':<28} {'ifs':>5} {'min us':>10} {'mean us':>10}"
+            f" {'stddev':>8} {'us/if':>8}"
+        )
+
+        ttp_parser = TTP_PARSERS.get(corpus_name) if opts.ttp else None
+
+        for cli_file in corpus_files(corpus_name):
+            cli_text = cli_file.read_text()
+            bench(cli_file.stem, corpus_parser, cli_text, opts.rounds, opts.min_time)
+            if ttp_parser:
+                label = f"{cli_file.stem} (ttp)"
+                bench(label, ttp_parser, cli_text, opts.rounds, opts.min_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Exporter throughput benchmark.
+
+This script starts a local stub HTTP server, in a separate process, that
+emulates the InfluxDB "/write" and the Circonus PUT endpoints.  The stub can
+add response latency, return random 5xx errors, and simulate periodic 5xx
+"storms".  Each exporter is then run against the stub for each batch size,
+each run in a new process so that the peak memory is that of the run, and
+the following are reported:
+
+    * points/sec sent, including the batches that failed
+    * goodput, the points/sec of the batches accepted with a 2xx response
+    * the number of non-2xx responses and of request exceptions
+    * p50 and p99 export_metrics latency
+    * CPU time used by the exporter process
+    * peak RSS memory of the exporter process
+
+Examples
+--------
+    invoke bench-exporters
+    python benchmarks/bench_exporters.py --batch-sizes 100,1000 --latency 5
+    python benchmarks/bench_exporters.py --error-rate 0.01 --storm-every 10
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+import resource
+import statistics
+import multiprocessing
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, MetricBatch
+from netpaca.drivers import DriverBase
+from netpaca.exporters.influxdb import InfluxDBExporter
+from netpaca.exporters.circonus import CirconusExporter
+
+# -----------------------------------------------------------------------------
+#
+#                               STUB HTTP SERVER
+#
+# -----------------------------------------------------------------------------
+
+
+class StubBackend(object):
+    """
+    A minimal HTTP/1.1 server that accepts any POST or PUT request.  A POST is
+    answered as InfluxDB does (204), and a PUT as Circonus does (200 with the
+    JSON stats body).
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, storm_every=0, storm_duration=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.storm_every = storm_every
+        self.storm_duration = storm_duration
+        self.started = time.monotonic()
+
+    def in_storm(self) -> bool:
+        if not self.storm_every:
+            return False
+
+        elapsed = (time.monotonic() - self.started) % self.storm_every
+        return elapsed < self.storm_duration
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readuntil(b"\r\n\r\n")
+                method = header.split(b" ", 1)[0]
+                length = 0
+                for line in header.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.lower() == b"content-length":
+                        length = int(value)
+
+                if length:
+                    await reader.readexactly(length)
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                if self.in_storm() or random.random() < self.error_rate:
+                    status, body = b"503 Service Unavailable", b'{"error": "stub"}'
+                elif method == b"PUT":
+                    status, body = b"200 OK", b'{"stats": 1}'
+                else:
+                    status, body = b"204 No Content", b""
+
+                writer.write(
+                    b"HTTP/1.1 %s\r\ncontent-type: application/json\r\n"
+                    b"content-length: %d\r\n\r\n%s" % (status, len(body), body)
+                )
+                await writer.drain()
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        finally:
+            writer.close()
+
+
+def run_stub_server(port, ready, **options):
+    async def serve():
+        backend = StubBackend(**options)
+        server = await asyncio.start_server(backend.handle, "127.0.0.1", port)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+# -----------------------------------------------------------------------------
+#
+#                               BENCHMARK CODE
+#
+# -----------------------------------------------------------------------------
+
+
+def make_device():
+    device = DriverBase(name="switch1")
+    device.tags = {
+        "host": "switch1",
+        "ipaddr": "10.0.0.1",
+        "os_name": "nxos",
+        "role": "leaf",
+        "site": "site1",
+        "region": "region1",
+    }
+    return device
+
+
+def make_metrics(count, as_batch=False):
+    ts = int(time.time() * 1000)
+
+    if as_batch:
+        batch = MetricBatch(ts=ts)
+        for idx in range(count):
+            batch.add(
+                "ifdom_rxpower",
+                -2.5 + (idx % 10) / 10,
+                tags={"if_name": f"Ethernet1/{idx}", "media": "10GBASE-SR"},
+            )
+        return batch
+
+    return [
+        Metric(
+            name="ifdom_rxpower",
+            value=-2.5 + (idx % 10) / 10,
+            ts=ts,
+            tags={"if_name": f"Ethernet1/{idx}", "media": "10GBASE-SR"},
+        )
+        for idx in range(count)
+    ]
+
+
+def make_exporter(name, port):
+    if name == "influxdb":
+        exporter = InfluxDBExporter(name)
+        config = dict(server_url=f"http://127.0.0.1:{port}", database="bench")
+    else:
+        exporter = CirconusExporter(name)
+        config = dict(circonus_datasubmission_url=f"http://127.0.0.1:{port}/circonus")
+
+    exporter.prepare(exporter.config.validate(config))
+    return exporter
+
+
+class ResponseCounter(object):
+    """
+    Wraps the exporter HTTP client post and put methods to count the 2xx and
+    the non-2xx responses, and the request exceptions.
+    """
+
+    def __init__(self, httpx):
+        self.ok = 0
+        self.failed = 0
+        self.exceptions = 0
+        httpx.post = self.wrap(httpx.post)
+        httpx.put = self.wrap(httpx.put)
+
+    def wrap(self, send):
+        async def counted(url, **kwargs):
+            try:
+                res = await send(url, **kwargs)
+            except Exception:
+                self.exceptions += 1
+                raise
+
+            if res.is_success:
+                self.ok += 1
+            else:
+                self.failed += 1
+
+            return res
+
+        return counted
+
+
+async def bench_exporter(exporter, batch_size, batches, concurrency, as_batch):
+    counter = ResponseCounter(exporter.httpx)
+    device = make_device()
+    metrics = make_metrics(batch_size, as_batch=as_batch)
+    latencies = list()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def export_one():
+        async with semaphore:
+            ts_start = time.perf_counter()
+            await exporter.export_metrics(device, metrics)
+            latencies.append(time.perf_counter() - ts_start)
+
+    cpu_start = time.process_time()
+    ts_start = time.perf_counter()
+    await asyncio.gather(*(export_one() for _ in range(batches)))
+    elapsed = time.perf_counter() - ts_start
+    cpu_used = time.process_time() - cpu_start
+
+    latencies.sort()
+    return dict(
+        points_sec=batch_size * batches / elapsed,
+        goodput=batch_size * counter.ok / elapsed,
+        failed=counter.failed,
+        exceptions=counter.exceptions,
+        p50=statistics.median(latencies) * 1000,
+        p99=latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        cpu=cpu_used,
+        maxrss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    )
+
+
+def run_scenario(e_name, port, batch_size, batches, concurrency, as_batch):
+    """ runs one exporter and batch size, called in a new process per run """
+
+    async def run():
+        exporter = make_exporter(e_name, port)
+        try:
+            return await bench_exporter(
+                exporter, batch_size, batches, concurrency, as_batch
+            )
+        finally:
+            await exporter.close()
+
+    return asyncio.run(run())
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="netpaca exporter benchmark")
+    parser.add_argument("--exporters", default="influxdb,circonus")
+    parser.add_argument("--batch-sizes", default="100,1000,10000")
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=18086)
+    parser.add_argument(
+        "--metric-batch", action="store_true", help="export MetricBatch"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="stub latency ms")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--storm-every", type=float, default=0, help="seconds between 5xx storms"
+    )
+    parser.add_argument(
+        "--storm-duration", type=float, default=0, help="5xx storm seconds"
+    )
+    return parser.parse_args()
+
+
+def main():
+    opts = cli()
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=run_stub_server,
+        args=(opts.port, ready),
+        kwargs=dict(
+            latency=opts.latency / 1000,
+            error_rate=opts.error_rate,
+            storm_every=opts.storm_every,
+            storm_duration=opts.storm_duration,
+        ),
+        daemon=True,
+    )
+    server.start()
+    if not ready.wait(timeout=10):
+        sys.exit("stub server failed to start")
+
+    print(
+        f"{'exporter':<10} {'batch':>7} {'points/s':>10} {'goodput':>10} "
+        f"{'non-2xx':>8} {'exc':>5} {'p50 ms':>9} {'p99 ms':>9} {'cpu s':>8} "
+        f"{'maxrss MB':>10}"
+    )
+
+    ctx = multiprocessing.get_context("spawn")
+
+    try:
+        for e_name in opts.exporters.split(","):
+            for batch_size in map(int, opts.batch_sizes.split(",")):
+                with ctx.Pool(1) as pool:
+                    res = pool.apply(
+                        run_scenario,
+                        (
+                            e_name,
+                            opts.port,
+                            batch_size,
+                            opts.batches,
+                            opts.concurrency,
+                            opts.metric_batch,
+                        ),
+                    )
+                print(
+                    f"{e_name:<10} {batch_size:>7} {res['points_sec']:>10.0f} "
+                    f"{res['goodput']:>10.0f} {res['failed']:>8} "
+                    f"{res['exceptions']:>5} {res['p50']:>9.1f} {res['p99']:>9.1f} "
+                    f"{res['cpu']:>8.2f} {res['maxrss']:>10.1f}"
+                )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Metric construction benchmark.
+
+Compares the construction cost and the memory per metric of the pydantic
+Metric dataclass, a Metric subclass, and LiteMetric with and without the
+debug validation enabled.
+
+Examples
+--------
+    invoke bench-metric
+    python benchmarks/bench_metric.py --count 200000
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import time
+import argparse
+import tracemalloc
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pydantic import dataclasses
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, LiteMetric, set_metric_validation
+
+
+@dataclasses.dataclass
+class IFdomRxPowerMetric(Metric):
+    value: float
+    name: str = "ifdom_rxpower"
+
+
+class IFdomRxPowerLiteMetric(LiteMetric):
+    __slots__ = ()
+    metric_name = "ifdom_rxpower"
+    model = IFdomRxPowerMetric
+
+
+def bench(label, factory, count):
+    tags = {"if_name": "Ethernet1/1", "media": "10GBASE-SR"}
+    ts = int(time.time() * 1000)
+
+    ts_start = time.perf_counter()
+    for _ in range(count):
+        factory(value=-2.5, ts=ts, tags=tags)
+    elapsed = time.perf_counter() - ts_start
+
+    # measure the memory of the metric instances only; the shared tags and
+    # values are not included.
+
+    tracemalloc.start()
+    keep = [factory(value=-2.5, ts=ts, tags=tags) for _ in range(count)]
+    mem_used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+
+    print(
+        f"{label:<36} {elapsed / count * 1e6:>10.2f} us {mem_used / count:>10.1f} B"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="netpaca metric benchmark")
+    parser.add_argument("--count", type=int, default=100_000)
+    opts = parser.parse_args()
+
+    print(f"{'metric type':<36} {'per-metric':>13} {'memory':>12}")
+
+    bench("Metric", lambda **kw: Metric(name="ifdom_rxpower", **kw), opts.count)
+    bench("Metric subclass", IFdomRxPowerMetric, opts.count)
+    bench("LiteMetric", lambda **kw: LiteMetric(name="ifdom_rxpower", **kw), opts.count)
+    bench("LiteMetric subclass", IFdomRxPowerLiteMetric, opts.count)
+
+    set_metric_validation(True)
+    bench("LiteMetric subclass (validated)", IFdomRxPowerLiteMetric, opts.count)
+
+
+if __name__ == "__main__":
+    main()
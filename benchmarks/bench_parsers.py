@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+SSH driver TTP parser benchmark.
+
+Compares, per call, creating a new ttp object for each parse with the cached
+parsers from netpaca.drivers.ttp_cache, for each of the SSH driver TTP
+templates, on synthetic CLI output of a given number of interfaces.  The
+single pass parsers that replaced a TTP parser are then compared with the
+retained TTP parser.
+
+Examples
+--------
+    invoke bench-parsers
+    python benchmarks/bench_parsers.py --interfaces 96 --count 50
+    python benchmarks/bench_parsers.py --interfaces 480 --count 10
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import time
+import argparse
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from ttp import ttp
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers.ttp_cache import ttp_parse
+from netpaca.drivers.ios_ssh import show_interfaces_transceiver as ios_xcvr
+from netpaca.drivers.nxos_ssh import show_interfaces_transceiver as nxos_xcvr
+from netpaca.drivers.nxos_ssh import show_interfaces_status as nxos_status
+
+import cli_samples
+
+# -----------------------------------------------------------------------------
+#
+#                               BENCHMARK CODE
+#
+# -----------------------------------------------------------------------------
+
+PARSERS = {
+    "nxos show interface transceiver": (
+        nxos_xcvr._TEMPLATE,
+        cli_samples.nxos_show_interface_transceiver_details,
+    ),
+    "nxos show interface status": (
+        nxos_status._TEMPLATE,
+        lambda interfaces: cli_samples.nxos_show_interface_status(interfaces)[
+            nxos_status._skip_header
+        ],
+    ),
+    "ios show interfaces transceiver": (
+        ios_xcvr._TEMPLATE,
+        cli_samples.ios_show_interfaces_transceiver,
+    ),
+}
+
+
+REPLACED_PARSERS = {
+    "nxos show interface transceiver": (
+        nxos_xcvr._parse_show_interface_transceiver_ttp,
+        nxos_xcvr.parse_show_interface_transceiver,
+        cli_samples.nxos_show_interface_transceiver_details,
+    ),
+    "ios show interfaces transceiver": (
+        ios_xcvr._parse_show_interface_transceiver_ttp,
+        ios_xcvr.parse_show_interface_transceiver,
+        cli_samples.ios_show_interfaces_transceiver,
+    ),
+}
+
+
+def ttp_parse_new(template, data):
+    """ the former parse, a new ttp object per call """
+    parser = ttp(data=data, template=template, log_level="none")
+    parser.parse()
+    return parser.result()
+
+
+def bench(label, parse, template, data, count):
+    ts_start = time.perf_counter()
+    for _ in range(count):
+        result = parse(template, data)
+    elapsed = time.perf_counter() - ts_start
+    print(f"  {label:<12} {elapsed / count * 1e6:>12.0f} us/call")
+    return result
+
+
+def bench_parser(label, parse, data, count, interfaces):
+    ts_start = time.perf_counter()
+    for _ in range(count):
+        parse(data)
+    elapsed = (time.perf_counter() - ts_start) / count * 1e6
+    print(f"  {label:<12} {elapsed:>12.0f} us/call {elapsed / interfaces:>8.1f} us/if")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="netpaca TTP parser benchmark")
+    parser.add_argument("--interfaces", type=int, default=48)
+    parser.add_argument("--count", type=int, default=100)
+    opts = parser.parse_args()
+
+    for name, (template, make_data) in PARSERS.items():
+        print(f"\n{name}, {opts.interfaces} interfaces")
+        data = make_data(opts.interfaces)
+
+        # the first cached parse creates the parser, as for the first device.
+        ttp_parse(template, data)
+
+        slow = bench("new ttp", ttp_parse_new, template, data, opts.count)
+        fast = bench("ttp_parse", ttp_parse, template, data, opts.count)
+        assert slow == fast
+
+    for name, (ttp_parser, single_pass, make_data) in REPLACED_PARSERS.items():
+        print(f"\n{name} TTP vs single pass, {opts.interfaces} interfaces")
+        data = make_data(opts.interfaces)
+        ttp_parser(data)
+
+        bench_parser("ttp_parse", ttp_parser, data, opts.count, opts.interfaces)
+        bench_parser("single pass", single_pass, data, opts.count, opts.interfaces)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+SNMP row factory benchmark.
+
+Compares the prettyPrint() then parse row factories with the typed factories
+from netpaca.aiosnmp.factories, for both the pysnmp values and the fast path
+codec values, on a synthetic table of a given number of rows.  The memory of
+the resulting table as a dict and as an IndexedColumn is also reported.
+
+Examples
+--------
+    invoke bench-snmp-factories
+    python benchmarks/bench_snmp_factories.py --rows 100000
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import time
+import argparse
+import tracemalloc
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pysnmp.hlapi import ObjectType, ObjectIdentity
+from pysnmp.smi import builder, view
+from pysnmp.proto import rfc1902
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.aiosnmp import codec
+from netpaca.aiosnmp.interfaces import factory_ifindex_value
+from netpaca.aiosnmp.factories import (
+    factory_ifindex_int,
+    factory_ifindex_str,
+    IndexedColumn,
+)
+
+# -----------------------------------------------------------------------------
+#
+#                               BENCHMARK CODE
+#
+# -----------------------------------------------------------------------------
+
+OID_IF_HC_IN_OCTETS = "1.3.6.1.2.1.31.1.1.1.6"
+OID_IF_ALIAS = "1.3.6.1.2.1.31.1.1.1.18"
+
+
+def factory_reparse_int(var_bind):
+    """ the former prettyPrint then int() row factory """
+    var_name, var_value = var_bind
+    return var_name.getOid().asTuple()[-1], int(var_value.prettyPrint())
+
+
+def pysnmp_var_binds(oid, values):
+    mib_view = view.MibViewController(builder.MibBuilder())
+    return [
+        tuple(
+            ObjectType(ObjectIdentity(f"{oid}.{index}"), value).resolveWithMib(
+                mib_view
+            )
+        )
+        for index, value in enumerate(values, start=1)
+    ]
+
+
+def codec_var_binds(oid, values):
+    root = codec.Oid(oid)
+    return [
+        (codec.Oid(root + (index,)), value)
+        for index, value in enumerate(values, start=1)
+    ]
+
+
+def bench(label, factory, var_binds):
+    ts_start = time.perf_counter()
+    rows = [factory(var_bind) for var_bind in var_binds]
+    elapsed = time.perf_counter() - ts_start
+    print(f"{label:<32} {elapsed / len(var_binds) * 1e9:>10.0f} ns/row")
+    return rows
+
+
+def table_memory(label, make_table):
+    tracemalloc.start()
+    table = make_table()
+    mem_used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {mem_used / len(table):>10.1f} B/row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="netpaca SNMP factory benchmark")
+    parser.add_argument("--rows", type=int, default=50_000)
+    opts = parser.parse_args()
+
+    counters = [index * 1_000_003 for index in range(1, opts.rows + 1)]
+    aliases = [f"to server{index} port eth0" for index in range(1, opts.rows + 1)]
+
+    for source, make_var_binds, counter_cls, octets_cls in (
+        ("pysnmp", pysnmp_var_binds, rfc1902.Counter64, rfc1902.OctetString),
+        ("codec", codec_var_binds, codec.Counter64, codec.OctetString),
+    ):
+        print(f"\n{source} values, {opts.rows} rows")
+        counter_vbs = make_var_binds(OID_IF_HC_IN_OCTETS, map(counter_cls, counters))
+        alias_vbs = make_var_binds(
+            OID_IF_ALIAS, (octets_cls(alias.encode()) for alias in aliases)
+        )
+
+        slow = bench("counter prettyPrint + int()", factory_reparse_int, counter_vbs)
+        fast = bench("counter factory_ifindex_int", factory_ifindex_int, counter_vbs)
+        assert slow == fast
+
+        slow = bench("alias prettyPrint", factory_ifindex_value, alias_vbs)
+        fast = bench("alias factory_ifindex_str", factory_ifindex_str, alias_vbs)
+        assert slow == fast
+
+    # the rows are created within the measurement, as the decoded values are.
+
+    def rows():
+        return ((index, index * 1_000_003) for index in range(1, opts.rows + 1))
+
+    print()
+    table_memory("counter table as dict", lambda: dict(rows()))
+    table_memory("counter table as IndexedColumn", lambda: IndexedColumn(rows(), "Q"))
+
+
+if __name__ == "__main__":
+    main()
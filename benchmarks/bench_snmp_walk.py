@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+SNMP table walk benchmark.
+
+This script starts the local SNMP agent simulator in a separate process,
+either the codec based snmp_sim.py (default) or the pysnmp based
+snmp_agent.py, and walks the ifAlias table using walk_table (GETNEXT) and
+bulk_walk_table (GETBULK) for each of the max-repetitions values.  Each of
+the get_if_*_table functions is then measured, and the interface table
+snapshot is fetched as four separate column walks and as one multi-column
+walk_columns walk.  The simulator serves either a synthetic table of
+--interfaces, or the recorded walk given by --recording.  Finally the interface table is
+fetched concurrently for a number of devices, that all use the same agent,
+to measure the walk throughput.  With --fastpath the devices use the
+lightweight SNMP client, see netpaca.aiosnmp.client, rather than the pysnmp
+hlapi.  The following are reported:
+
+    * rows walked
+    * elapsed time per walk
+    * rows/sec
+    * CPU time used by the walking process
+
+Examples
+--------
+    invoke bench-snmp-walk
+    python benchmarks/bench_snmp_walk.py --interfaces 500 --latency 2
+    python benchmarks/bench_snmp_walk.py --max-repetitions 10,25,50
+    python benchmarks/bench_snmp_walk.py --devices 50 --engine-per-device
+    python benchmarks/bench_snmp_walk.py --fastpath
+    python benchmarks/bench_snmp_walk.py --recording \
+        benchmarks/recordings/switch48.snmprec
+    python benchmarks/bench_snmp_walk.py --agent pysnmp
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pysnmp.hlapi.asyncio import SnmpEngine
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers import DriverBase
+from netpaca.aiosnmp.walk import walk_table, bulk_walk_table
+from netpaca.aiosnmp import interfaces
+from netpaca.aiosnmp.config import SnmpConfigModel
+from netpaca.aiosnmp.engine import snmp_prepare
+
+from snmp_agent import run_agent
+from snmp_sim import run_sim
+
+# -----------------------------------------------------------------------------
+#
+#                               BENCHMARK CODE
+#
+# -----------------------------------------------------------------------------
+
+OID_IF_ALIAS = "1.3.6.1.2.1.31.1.1.1.18"
+
+IF_TABLE_FUNCTIONS = {
+    "if-name": interfaces.get_if_name_table,
+    "if-alias": interfaces.get_if_alias_table,
+    "if-operstatus": interfaces.get_if_operstatus_table,
+    "if-lastchange": interfaces.get_if_lastchange_table,
+}
+
+
+def make_device(port, name="agent1", engine_per_device=False, fastpath=False):
+    device = DriverBase(name=name)
+    device.device_host = "127.0.0.1"
+    device.private = dict()
+    snmp_prepare(device, SnmpConfigModel(port=port, fastpath=fastpath))
+
+    if engine_per_device:
+        device.private["pysnmp"]["engine"] = SnmpEngine()
+
+    return device
+
+
+async def bench_walk(walk, device, walks, *args, **kwargs):
+    cpu_start = time.process_time()
+    ts_start = time.perf_counter()
+
+    for _ in range(walks):
+        rows = await walk(device, *args, **kwargs)
+
+    elapsed = (time.perf_counter() - ts_start) / walks
+    return dict(
+        rows=len(rows),
+        elapsed=elapsed * 1000,
+        rows_sec=len(rows) / elapsed,
+        cpu=(time.process_time() - cpu_start) / walks,
+    )
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="netpaca SNMP walk benchmark")
+    parser.add_argument("--agent", choices=["sim", "pysnmp"], default="sim")
+    parser.add_argument("--recording", help="simulator recorded walk file")
+    parser.add_argument("--interfaces", type=int, default=500)
+    parser.add_argument("--walks", type=int, default=3)
+    parser.add_argument("--max-repetitions", default="10,25,50")
+    parser.add_argument("--port", type=int, default=18161)
+    parser.add_argument("--latency", type=float, default=0.0, help="agent latency ms")
+    parser.add_argument("--loss", type=float, default=0.0, help="response loss")
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument(
+        "--engine-per-device", action="store_true", help="SnmpEngine per device"
+    )
+    parser.add_argument(
+        "--fastpath", action="store_true", help="use the lightweight SNMP client"
+    )
+    return parser.parse_args()
+
+
+def main():
+    opts = cli()
+
+    agent_kwargs = dict(
+        interfaces=opts.interfaces, latency=opts.latency / 1000, loss=opts.loss
+    )
+    if opts.agent == "sim":
+        agent_kwargs["recording"] = opts.recording
+    elif opts.recording:
+        sys.exit("--recording requires the sim agent")
+
+    ready = multiprocessing.Event()
+    agent = multiprocessing.Process(
+        target=run_sim if opts.agent == "sim" else run_agent,
+        args=(opts.port, ready),
+        kwargs=agent_kwargs,
+        daemon=True,
+    )
+    agent.start()
+    if not ready.wait(timeout=10):
+        sys.exit("SNMP agent failed to start")
+
+    print(
+        f"{'method':<16} {'rows':>6} {'ms/walk':>10} {'rows/s':>10} {'cpu s/walk':>11}"
+    )
+
+    def report(method, res):
+        print(
+            f"{method:<16} {res['rows']:>6} {res['elapsed']:>10.1f} "
+            f"{res['rows_sec']:>10.0f} {res['cpu']:>11.3f}"
+        )
+
+    async def run_all():
+        device = make_device(opts.port, fastpath=opts.fastpath)
+        res = await bench_walk(walk_table, device, opts.walks, OID_IF_ALIAS)
+        report("getnext", res)
+
+        for max_rep in map(int, opts.max_repetitions.split(",")):
+            res = await bench_walk(
+                bulk_walk_table,
+                device,
+                opts.walks,
+                OID_IF_ALIAS,
+                max_repetitions=max_rep,
+            )
+            report(f"getbulk/{max_rep}", res)
+
+        for method, if_table_func in IF_TABLE_FUNCTIONS.items():
+            res = await bench_walk(if_table_func, device, opts.walks)
+            report(method, res)
+
+        async def if_table_by_column(_device):
+            if_names = await interfaces.get_if_name_table(_device)
+            await interfaces.get_if_alias_table(_device)
+            await interfaces.get_if_operstatus_table(_device)
+            await interfaces.get_if_lastchange_table(_device)
+            return if_names
+
+        res = await bench_walk(if_table_by_column, device, opts.walks)
+        report("if-table/4-walk", res)
+
+        res = await bench_walk(interfaces.get_if_table, device, opts.walks)
+        report("if-table/columns", res)
+
+        devices = [
+            make_device(
+                opts.port,
+                f"agent{idx}",
+                engine_per_device=opts.engine_per_device,
+                fastpath=opts.fastpath,
+            )
+            for idx in range(opts.devices)
+        ]
+
+        cpu_start = time.process_time()
+        ts_start = time.perf_counter()
+        for _ in range(opts.walks):
+            await asyncio.gather(*map(interfaces.get_if_table, devices))
+
+        elapsed = time.perf_counter() - ts_start
+        cpu = time.process_time() - cpu_start
+        walks = opts.devices * opts.walks
+        print(
+            f"\n{opts.devices} devices: {walks / elapsed:.1f} if-table walks/s, "
+            f"cpu {cpu / walks * 1000:.1f} ms/walk"
+        )
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        agent.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+SSH driver parser correctness check.
+
+Each CLI output file, <name>.txt, in the benchmarks/corpus directories is
+parsed by the driver parser of the directory and the result is compared with
+the golden result file, <name>.json, of the same name.  The golden files are
+written with the --update option, and are then reviewed by hand against the
+CLI output before being committed.
+
+The single pass parsers are then compared with the retained TTP parsers on
+synthetic CLI output of increasing number of interfaces; the NX-OS TTP parser
+values are strings without flags, and are compared as floats without flags.
+
+Finally, each cached TTP parser, see netpaca.drivers.ttp_cache, is used to
+parse two different inputs back to back, and then the first input again, and
+each result is compared with that of a new ttp object; the cached parser reset
+relies on the ttp internals of the pinned ttp version.
+
+Examples
+--------
+    invoke check-parsers
+    python benchmarks/check_parsers.py --update
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers import ios_ssh, nxos_ssh
+from netpaca.drivers.ios_ssh import show_interfaces_transceiver as ios_xcvr
+from netpaca.drivers.nxos_ssh import show_interfaces_transceiver as nxos_xcvr
+
+from ttp import ttp
+
+from netpaca.drivers.ttp_cache import ttp_parse
+from netpaca.drivers.nxos_ssh import show_interfaces_status as nxos_status
+
+import cli_samples
+
+# -----------------------------------------------------------------------------
+#
+#                               BENCHMARK CODE
+#
+# -----------------------------------------------------------------------------
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+CORPUS_PARSERS = {
+    "ios_ssh/show_interfaces_status": ios_ssh.parse_show_interfaces_status,
+    "ios_ssh/show_interfaces_transceiver": ios_ssh.parse_show_interface_transceiver,
+    "nxos_ssh/show_interface_status": nxos_ssh.parse_show_interfaces_status,
+    "nxos_ssh/show_interface_transceiver_details": (
+        nxos_ssh.parse_show_interface_transceiver
+    ),
+}
+
+CROSS_CHECK_INTERFACES = (1, 48, 96, 480)
+
+
+def without_flags(result):
+    return {
+        if_name: {tag: value for tag, value in if_dom.items() if "_flag" not in tag}
+        for if_name, if_dom in (result or {}).items()
+    }
+
+
+def nxos_ttp_values(result):
+    return {
+        if_name: {
+            tag: 0.0 if value == "N/A" else float(value)
+            for tag, value in if_dom.items()
+        }
+        for if_name, if_dom in without_flags(result).items()
+    }
+
+
+CROSS_CHECKS = {
+    "ios_ssh/show_interfaces_transceiver": (
+        ios_xcvr.parse_show_interface_transceiver,
+        ios_xcvr._parse_show_interface_transceiver_ttp,
+        cli_samples.ios_show_interfaces_transceiver,
+        lambda result: result,
+        lambda result: result,
+    ),
+    "nxos_ssh/show_interface_transceiver_details": (
+        nxos_xcvr.parse_show_interface_transceiver,
+        nxos_xcvr._parse_show_interface_transceiver_ttp,
+        cli_samples.nxos_show_interface_transceiver_details,
+        without_flags,
+        nxos_ttp_values,
+    ),
+}
+
+
+CACHED_PARSER_CHECKS = {
+    "ios_ssh/show_interfaces_transceiver": (
+        ios_xcvr._TEMPLATE,
+        cli_samples.ios_show_interfaces_transceiver,
+    ),
+    "nxos_ssh/show_interface_status": (
+        nxos_status._TEMPLATE,
+        lambda interfaces, seed: cli_samples.nxos_show_interface_status(
+            interfaces, seed
+        )[nxos_status._skip_header],
+    ),
+    "nxos_ssh/show_interface_transceiver_details": (
+        nxos_xcvr._TEMPLATE,
+        cli_samples.nxos_show_interface_transceiver_details,
+    ),
+}
+
+
+def corpus_files(corpus_name):
+    return sorted((CORPUS_DIR / corpus_name).glob("*.txt"))
+
+
+def parse_file(parser, cli_file):
+    """ returns the parser result as the JSON encoded then decoded value """
+    return json.loads(json.dumps(parser(cli_file.read_text())))
+
+
+def check(corpus_name, parser) -> int:
+    failures = 0
+
+    for cli_file in corpus_files(corpus_name):
+        result = parse_file(parser, cli_file)
+        golden = json.loads(cli_file.with_suffix(".json").read_text())
+
+        if result == golden:
+            print(f"  ok    {cli_file.name}")
+            continue
+
+        failures += 1
+        print(f"  FAIL  {cli_file.name}")
+        for if_name in sorted({*(result or {}), *(golden or {})}):
+            got, expected = (result or {}).get(if_name), (golden or {}).get(if_name)
+            if got != expected:
+                print(f"        {if_name}: expected {expected}, got {got}")
+
+    return failures
+
+
+def cross_check(parser, ttp_parser, make_data, normalize, ttp_normalize) -> int:
+    failures = 0
+
+    for interfaces in CROSS_CHECK_INTERFACES:
+        cli_text = make_data(interfaces)
+        if normalize(parser(cli_text)) == ttp_normalize(ttp_parser(cli_text)):
+            print(f"  ok    {interfaces} interfaces")
+            continue
+
+        failures += 1
+        print(f"  FAIL  {interfaces} interfaces")
+
+    return failures
+
+
+def cached_parser_check(template, make_data) -> int:
+    failures = 0
+    inputs = [(48, 1), (96, 2), (48, 1)]
+
+    for interfaces, seed in inputs:
+        cli_text = make_data(interfaces, seed)
+        parser = ttp(data=cli_text, template=template, log_level="none")
+        parser.parse()
+        if ttp_parse(template, cli_text) == parser.result():
+            print(f"  ok    {interfaces} interfaces, seed {seed}")
+            continue
+
+        failures += 1
+        print(f"  FAIL  {interfaces} interfaces, seed {seed}")
+
+    return failures
+
+
+def update(corpus_name, parser):
+    for cli_file in corpus_files(corpus_name):
+        result = parse_file(parser, cli_file)
+        cli_file.with_suffix(".json").write_text(json.dumps(result, indent=2) + "\n")
+        print(f"  wrote {cli_file.with_suffix('.json').name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="netpaca parser corpus check")
+    parser.add_argument(
+        "--update", action="store_true", help="write the golden result files"
+    )
+    opts = parser.parse_args()
+
+    failures = 0
+
+    for corpus_name, corpus_parser in CORPUS_PARSERS.items():
+        print(corpus_name)
+        if opts.update:
+            update(corpus_name, corpus_parser)
+        else:
+            failures += check(corpus_name, corpus_parser)
+
+    if not opts.update:
+        for corpus_name, cross_check_args in CROSS_CHECKS.items():
+            print(f"{corpus_name} vs TTP")
+            failures += cross_check(*cross_check_args)
+
+        for corpus_name, cached_check_args in CACHED_PARSER_CHECKS.items():
+            print(f"{corpus_name} cached TTP parser")
+            failures += cached_parser_check(*cached_check_args)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Exporter-process check.
+
+A stub exporter, that registers a self-metric source counting the exported
+metrics as the HTTP exporters do, is run with the ProcessExporter.  The check
+exports metrics through the child process, and then verifies that the child
+self-metrics are reported by the collector process, and that the child
+process completes the pending exports and exits when closed.
+
+Examples
+--------
+    invoke check-process-exporter
+    python benchmarks/check_process_exporter.py
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import sys
+import asyncio
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+from netpaca import selfmetrics
+from netpaca.drivers import DriverBase
+from netpaca.exporters import ExporterBase
+from netpaca.exporters.process import ProcessExporter
+
+# -----------------------------------------------------------------------------
+#
+#                               BENCHMARK CODE
+#
+# -----------------------------------------------------------------------------
+
+METRICS = 100
+SELFMETRICS_INTERVAL = 0.2
+
+
+class CountingExporter(ExporterBase):
+    """ a stub exporter that counts the exported metrics as a self-metric """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.exported = 0
+
+    def prepare(self, config):
+        selfmetrics.register(self.self_metrics)
+
+    async def export_metrics(self, device, metrics):
+        self.exported += len(metrics)
+
+    def self_metrics(self):
+        return [
+            Metric(
+                name="check_exported", value=self.exported, tags={"exporter": self.name}
+            )
+        ]
+
+
+def child_exported(metrics):
+    """ returns the last check_exported value reported by the child, or None """
+    values = [metric.value for metric in metrics if metric.name == "check_exported"]
+    return values[-1] if values else None
+
+
+async def check() -> int:
+    failures = 0
+
+    exporter = ProcessExporter("check", CountingExporter)
+    exporter.selfmetrics_interval = SELFMETRICS_INTERVAL
+    exporter.prepare(None)
+
+    device = DriverBase(name="device1")
+    device.tags = {"host": device.name}
+
+    for value in range(METRICS):
+        await exporter.export_metrics(
+            device, [Metric(name="check_value", value=value, tags={})]
+        )
+
+    # wait for the child process to report the exports.
+
+    reported = None
+    for _ in range(50):
+        await asyncio.sleep(SELFMETRICS_INTERVAL)
+        reported = child_exported(selfmetrics.collect()) or reported
+        if reported == METRICS:
+            break
+
+    if reported == METRICS:
+        print(f"  ok    child self-metrics reported {reported} exports")
+    else:
+        failures += 1
+        print(f"  FAIL  child self-metrics reported {reported}, expected {METRICS}")
+
+    await exporter.close()
+
+    if exporter.process.exitcode == 0:
+        print("  ok    child process exited on close")
+    else:
+        failures += 1
+        print(f"  FAIL  child process exitcode {exporter.process.exitcode}")
+
+    return failures
+
+
+def main():
+    print("exporter process")
+    failures = asyncio.run(check())
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Synthetic CLI output generators used by the parser benchmarks.  The outputs
+follow the formats of the examples in the SSH driver parser modules, scaled
+to a given number of interfaces, with a mix of ports with and without
+transceivers, and values outside of the warning and alarm thresholds.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import random
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "nxos_show_interface_transceiver_details",
+    "nxos_show_interface_status",
+    "ios_show_interfaces_status",
+    "ios_show_interfaces_transceiver",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+_NXOS_XCVR = """\
+Ethernet1/{port}
+    transceiver is present
+    type is {media}
+    name is CISCO-OPLINK
+    part number is TPP4XGDS0CCISE2G
+    revision is 01
+    serial number is OPL{port:05d}XYZ
+    nominal bitrate is 10300 MBit/sec
+    Link length supported for 50/125um OM2 fiber is 82 m
+    Link length supported for 62.5/125um fiber is 26 m
+    Link length supported for copper is 40 m
+    Link length supported for 50/125um OM3 fiber is 300 m
+    cisco id is --
+    cisco extended id number is 4
+
+           SFP Detail Diagnostics Information (internal calibration)
+  ----------------------------------------------------------------------------
+                Current              Alarms                  Warnings
+                Measurement     High        Low         High          Low
+  ----------------------------------------------------------------------------
+  Temperature   {temp:5.2f} C        75.00 C     -5.00 C     70.00 C        0.00 C
+  Voltage        {voltage:4.2f} V {voltage_flag:<2}     3.63 V      2.97 V      3.46 V        3.13 V
+  Current        6.34 mA       12.00 mA     0.50 mA    11.50 mA       1.00 mA
+  Tx Power      {txpower} {txpower_flag:<2}   1.99 dBm  -11.30 dBm   -1.00 dBm     -7.30 dBm
+  Rx Power      {rxpower} {rxpower_flag:<2}   1.99 dBm  -13.97 dBm   -1.00 dBm     -9.91 dBm
+  ----------------------------------------------------------------------------
+  Note: ++  high-alarm; +  high-warning; --  low-alarm; -  low-warning
+
+"""
+
+_NXOS_NO_XCVR = """\
+Ethernet1/{port}
+    transceiver is not present
+
+"""
+
+
+def _nxos_power(rand, low_warn, low_alarm):
+    """ returns the (value text, flag) of a Tx or Rx power measurement """
+    roll = rand.random()
+    if roll < 0.05:
+        return "  N/A    ", "--"
+
+    value = rand.uniform(low_alarm - 3, -1.5) if roll < 0.2 else rand.uniform(-6, -2)
+    flag = "--" if value < low_alarm else "-" if value < low_warn else ""
+    return f"{value:6.2f} dBm", flag
+
+
+def nxos_show_interface_transceiver_details(interfaces: int, seed: int = 1) -> str:
+    """ returns NX-OS "show interface transceiver details" output """
+    rand = random.Random(seed)
+    blocks = []
+
+    for port in range(1, interfaces + 1):
+        if rand.random() < 0.15:
+            blocks.append(_NXOS_NO_XCVR.format(port=port))
+            continue
+
+        voltage = rand.uniform(3.1, 3.5)
+        txpower, txpower_flag = _nxos_power(rand, -7.30, -11.30)
+        rxpower, rxpower_flag = _nxos_power(rand, -9.91, -13.97)
+        blocks.append(
+            _NXOS_XCVR.format(
+                port=port,
+                media=rand.choice(["10Gbase-SR", "10Gbase-LR", "25Gbase-SR"]),
+                temp=rand.uniform(25, 45),
+                voltage=voltage,
+                voltage_flag="-" if voltage < 3.13 else "+" if voltage > 3.46 else "",
+                txpower=txpower,
+                txpower_flag=txpower_flag,
+                rxpower=rxpower,
+                rxpower_flag=rxpower_flag,
+            )
+        )
+
+    return "".join(blocks)
+
+
+def nxos_show_interface_status(interfaces: int, seed: int = 1) -> str:
+    """ returns NX-OS "show interface status" output """
+    rand = random.Random(seed)
+    lines = ["Port      Name               Status       Vlan       Duplex  Speed Type"]
+
+    for idx in range(interfaces):
+        port = f"Eth{1 + idx // 48}/{1 + idx % 48}"
+        status = rand.choice(["connected", "connected", "notconnec", "disabled"])
+        name = rand.choice(["--", f"server{idx + 1}", f"to rack{idx // 48} port"])
+        vlan = rand.choice(["1", "100", "trunk", "routed"])
+        lines.append(
+            f"{port:<13} {name:<18} {status:<9} {vlan:<9} full    10G     10Gbase-SR"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def ios_show_interfaces_status(interfaces: int, seed: int = 1) -> str:
+    """
+    returns IOS "show interfaces status" output; the Duplex and Speed values
+    are right aligned, and the Type column is empty for the not present
+    transceivers.
+    """
+    rand = random.Random(seed)
+    lines = ["Port      Name               Status       Vlan       Duplex  Speed Type"]
+
+    for idx in range(interfaces):
+        port = f"Gi{1 + idx // 48}/0/{1 + idx % 48}"
+        name = rand.choice(["", f"server{idx + 1} eth0", "printer", "ap-floor-3"])
+        status, duplex, speed = rand.choice(
+            [
+                ("connected", "a-full", "a-1000"),
+                ("connected", "a-full", "a-100"),
+                ("notconnect", "auto", "auto"),
+                ("err-disabled", "auto", "auto"),
+                ("disabled", "auto", "auto"),
+            ]
+        )
+        vlan = rand.choice(["1", "10", "200", "trunk"])
+        lines.append(
+            f"{port:<10}{name:<19}{status:<13}{vlan:<11}{duplex:>6} {speed:>6}"
+            " 10/100/1000BaseTX"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+_IOS_TABLES = (
+    # (name, units, threshold units, precision, thresholds, value range)
+    ("Temperature", "(Celsius)", "(Celsius)", 1, (90.0, 85.0, -5.0, -10.0), (30, 45)),
+    ("Voltage", "(Volts)", "(Volts)", 2, (3.63, 3.47, 3.14, 2.97), (3.1, 3.5)),
+    ("Current", "(milliamperes)", "(mA)", 1, (65.1, 61.0, 3.0, 2.4), (10, 14)),
+    ("Transmit Power", "(dBm)", "(dBm)", 1, (0.0, -3.0, -9.5, -13.0), (-8, -2)),
+    ("Receive Power", "(dBm)", "(dBm)", 1, (0.0, -3.0, -19.0, -23.0), (-25, -5)),
+)
+
+
+def ios_show_interfaces_transceiver(interfaces: int, seed: int = 1) -> str:
+    """ returns IOS "show interfaces transceiver" output """
+    rand = random.Random(seed)
+    ports = [f"Te{1 + idx // 48}/1/{1 + idx % 48}" for idx in range(interfaces)]
+    lines = [
+        "mA: milliamperes, dBm: decibels (milliwatts), NA or N/A: not applicable.",
+        "++ : high alarm, +  : high warning, -  : low warning, -- : low alarm.",
+        "A2D readouts (if they differ), are reported in parentheses.",
+        "The threshold values are calibrated.",
+        "",
+    ]
+
+    for name, units, th_units, prec, thresholds, value_range in _IOS_TABLES:
+        optical = "Optical" if name.endswith("Power") else ""
+        th_text = f"{thresholds[0]:>23.{prec}f}" + "".join(
+            f"{threshold:>11.{prec}f}" for threshold in thresholds[1:]
+        )
+        lines.extend(
+            [
+                f"           {optical:<19}High Alarm  High Warn  Low Warn   Low Alarm",
+                f"           {name:<19}Threshold   Threshold  Threshold  Threshold",
+                f"Port       {units:<19}{th_units:<12}"
+                + " ".join(f"{th_units:<10}" for _ in range(3)).rstrip(),
+                "---------  -----------------  ----------  ---------  ---------  "
+                "---------",
+            ]
+        )
+        hi_a, hi_w, lo_w, lo_a = thresholds
+        for port in ports:
+            value = rand.uniform(*value_range)
+            flag = (
+                "--"
+                if value <= lo_a
+                else "-"
+                if value <= lo_w
+                else "++"
+                if value >= hi_a
+                else "+"
+                if value >= hi_w
+                else ""
+            )
+            lines.append(f"{port:<10}{value:>7.{prec}f}   {flag:<2}{th_text[5:]}")
+        lines.append("")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,214 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Local SNMPv2c agent simulator used by the SNMP benchmarks.
+
+The agent serves a synthetic interface table of a given number of interfaces
+(sysUpTime, ifDescr, ifOperStatus, ifLastChange, the error and discard
+counters, ifName, ifHCInOctets, ifHCOutOctets, ifAlias, ifTableLastChange,
+snmpEngineTime) for the community "public", and for the SNMPv3 user
+"netpaca" (SHA "netpaca-auth", AES128 "netpaca-priv").  The agent can add
+response latency and drop a fraction of the responses to emulate a remote
+device.  The sysUpTime and the HC octet counters increase over time, so that
+rate computations can be exercised.  The agent is run in a separate process
+via run_agent().
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+import time
+import random
+import asyncio
+from bisect import bisect_right
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pysnmp.entity import engine, config
+from pysnmp.entity.rfc3413 import cmdrsp, context
+from pysnmp.carrier.asyncio.dgram import udp
+from pysnmp.smi import instrum
+from pysnmp.proto import rfc1902, rfc1905
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["run_agent", "make_if_table"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+OID_SYS_UPTIME = (1, 3, 6, 1, 2, 1, 1, 3, 0)
+OID_IF_DESCR = (1, 3, 6, 1, 2, 1, 2, 2, 1, 2)
+OID_IF_OPSTATUS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 8)
+OID_IF_LASTCHANGE = (1, 3, 6, 1, 2, 1, 2, 2, 1, 9)
+OID_IF_IN_DISCARDS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 13)
+OID_IF_IN_ERRORS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 14)
+OID_IF_OUT_DISCARDS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 19)
+OID_IF_OUT_ERRORS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 20)
+OID_IF_NAME = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 1)
+OID_IF_HC_IN_OCTETS = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 6)
+OID_IF_HC_OUT_OCTETS = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 10)
+OID_IF_ALIAS = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 18)
+OID_IF_TABLE_LASTCHANGE = (1, 3, 6, 1, 2, 1, 31, 1, 5, 0)
+OID_SNMP_ENGINE_TIME = (1, 3, 6, 1, 6, 3, 10, 2, 1, 3, 0)
+
+V3_USER = "netpaca"
+V3_AUTH_KEY = "netpaca-auth"
+V3_PRIV_KEY = "netpaca-priv"
+
+
+def make_if_table(interfaces: int) -> dict:
+    """ returns the synthetic agent MIB as a dict of OID tuple to value """
+    mib = {
+        OID_SYS_UPTIME: rfc1902.TimeTicks(360_000),
+        OID_IF_TABLE_LASTCHANGE: rfc1902.TimeTicks(500),
+        OID_SNMP_ENGINE_TIME: rfc1902.Integer(3600),
+    }
+
+    for if_index in range(1, interfaces + 1):
+        if_name = f"Ethernet1/{if_index}"
+        mib[OID_IF_DESCR + (if_index,)] = rfc1902.OctetString(if_name)
+        mib[OID_IF_OPSTATUS + (if_index,)] = rfc1902.Integer(1 + if_index % 2)
+        mib[OID_IF_LASTCHANGE + (if_index,)] = rfc1902.TimeTicks(1000 + if_index)
+        mib[OID_IF_NAME + (if_index,)] = rfc1902.OctetString(if_name)
+        mib[OID_IF_HC_IN_OCTETS + (if_index,)] = rfc1902.Counter64(if_index * 10_000)
+        mib[OID_IF_HC_OUT_OCTETS + (if_index,)] = rfc1902.Counter64(if_index * 20_000)
+        mib[OID_IF_IN_DISCARDS + (if_index,)] = rfc1902.Counter32(0)
+        mib[OID_IF_IN_ERRORS + (if_index,)] = rfc1902.Counter32(if_index)
+        mib[OID_IF_OUT_DISCARDS + (if_index,)] = rfc1902.Counter32(0)
+        mib[OID_IF_OUT_ERRORS + (if_index,)] = rfc1902.Counter32(0)
+        mib[OID_IF_ALIAS + (if_index,)] = rfc1902.OctetString(
+            f"to server{if_index} port eth0"
+        )
+
+    return mib
+
+
+class TableMibController(instrum.AbstractMibInstrumController):
+    """ serves GET, GETNEXT, and GETBULK from a static dict of OID values """
+
+    def __init__(self, mib: dict):
+        self.mib = mib
+        self.oids = sorted(mib)
+        self.started = time.monotonic()
+
+    def value(self, oid: tuple):
+        """ returns the OID value, the sysUpTime and HC counters increase """
+        value = self.mib[oid]
+        elapsed = time.monotonic() - self.started
+
+        if oid == OID_SYS_UPTIME:
+            return value.clone(int(value) + int(elapsed * 100))
+
+        if oid[:-1] in (OID_IF_HC_IN_OCTETS, OID_IF_HC_OUT_OCTETS):
+            return value.clone(int(value) + int(elapsed * oid[-1] * 1_000_000))
+
+        return value
+
+    def readVars(self, varBinds, acInfo=(None, None)):
+        return [
+            (
+                name,
+                self.value(oid)
+                if (oid := tuple(name)) in self.mib
+                else rfc1905.NoSuchInstance(),
+            )
+            for name, _ in varBinds
+        ]
+
+    def readNextVars(self, varBinds, acInfo=(None, None)):
+        results = list()
+        for name, _ in varBinds:
+            idx = bisect_right(self.oids, tuple(name))
+            if idx == len(self.oids):
+                results.append((name, rfc1905.EndOfMibView()))
+            else:
+                oid = self.oids[idx]
+                results.append((rfc1902.ObjectName(oid), self.value(oid)))
+
+        return results
+
+
+class LossyUdpTransport(udp.UdpAsyncioTransport):
+    """ the agent UDP transport that delays and drops responses """
+
+    latency = 0.0
+    loss = 0.0
+
+    def sendMessage(self, outgoingMessage, transportAddress):
+        if self.loss and random.random() < self.loss:
+            return
+
+        if not self.latency:
+            return super().sendMessage(outgoingMessage, transportAddress)
+
+        self.loop.call_later(
+            self.latency, super().sendMessage, outgoingMessage, transportAddress
+        )
+
+
+def run_agent(port, ready, interfaces=500, latency=0.0, loss=0.0):
+    """
+    Run the SNMP agent on 127.0.0.1:`port` forever; `ready` is a
+    multiprocessing Event set when the agent is serving.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    LossyUdpTransport.latency = latency
+    LossyUdpTransport.loss = loss
+
+    snmp_engine = engine.SnmpEngine()
+    config.addTransport(
+        snmp_engine,
+        udp.domainName,
+        LossyUdpTransport(loop=loop).openServerMode(("127.0.0.1", port)),
+    )
+    config.addV1System(snmp_engine, "bench-area", "public")
+    config.addVacmUser(snmp_engine, 2, "bench-area", "noAuthNoPriv", (1, 3, 6))
+    config.addV3User(
+        snmp_engine,
+        V3_USER,
+        config.usmHMACSHAAuthProtocol,
+        V3_AUTH_KEY,
+        config.usmAesCfb128Protocol,
+        V3_PRIV_KEY,
+    )
+    config.addVacmUser(snmp_engine, 3, V3_USER, "authPriv", (1, 3, 6))
+
+    # replace the default context MIB with the synthetic table.
+
+    snmp_context = context.SnmpContext(snmp_engine)
+    snmp_context.unregisterContextName(rfc1902.OctetString(""))
+    snmp_context.registerContextName(
+        rfc1902.OctetString(""), TableMibController(make_if_table(interfaces))
+    )
+
+    cmdrsp.GetCommandResponder(snmp_engine, snmp_context)
+    cmdrsp.NextCommandResponder(snmp_engine, snmp_context)
+    cmdrsp.BulkCommandResponder(snmp_engine, snmp_context)
+
+    loop.call_soon(ready.set)
+    loop.run_forever()
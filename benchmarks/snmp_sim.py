@@ -0,0 +1,368 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Lightweight SNMPv2c agent simulator used by the SNMP benchmarks.
+
+Unlike snmp_agent.py, which is built on the pysnmp agent, this simulator
+encodes and decodes the messages using netpaca.aiosnmp.codec, so that the
+simulator uses a small fraction of the CPU of the walking process and the
+benchmark measures the walker rather than the agent.
+
+The simulator serves GET, GETNEXT, and GETBULK requests, for any community,
+from either:
+
+    * a recorded MIB walk file, in the snmprec format ("oid|type|value" per
+      line, as used by snmpsim) or the "snmpwalk -On" output format; see the
+      recordings directory.
+
+    * a synthetic interface table of a given number of interfaces, the same
+      OIDs as snmp_agent.py.
+
+Response latency and loss can be added to emulate a remote device.  The
+simulator is run in a separate process via run_sim(), or standalone:
+
+    python benchmarks/snmp_sim.py --port 11161 --recording \\
+        benchmarks/recordings/switch48.snmprec
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Dict, Tuple, Any, Optional
+import re
+import time
+import random
+import asyncio
+import argparse
+from bisect import bisect_right
+from pathlib import Path
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.aiosnmp import codec
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["run_sim", "load_recording", "make_if_mib", "SimAgentProtocol"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+OID_SYS_UPTIME = (1, 3, 6, 1, 2, 1, 1, 3, 0)
+OID_IF_DESCR = (1, 3, 6, 1, 2, 1, 2, 2, 1, 2)
+OID_IF_OPSTATUS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 8)
+OID_IF_LASTCHANGE = (1, 3, 6, 1, 2, 1, 2, 2, 1, 9)
+OID_IF_IN_DISCARDS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 13)
+OID_IF_IN_ERRORS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 14)
+OID_IF_OUT_DISCARDS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 19)
+OID_IF_OUT_ERRORS = (1, 3, 6, 1, 2, 1, 2, 2, 1, 20)
+OID_IF_NAME = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 1)
+OID_IF_HC_IN_OCTETS = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 6)
+OID_IF_HC_OUT_OCTETS = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 10)
+OID_IF_ALIAS = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 18)
+OID_IF_TABLE_LASTCHANGE = (1, 3, 6, 1, 2, 1, 31, 1, 5, 0)
+OID_SNMP_ENGINE_TIME = (1, 3, 6, 1, 6, 3, 10, 2, 1, 3, 0)
+
+MibType = Dict[Tuple[int, ...], Any]
+
+# -----------------------------------------------------------------------------
+#                               MIB Sources
+# -----------------------------------------------------------------------------
+
+
+def make_if_mib(interfaces: int) -> MibType:
+    """ returns the synthetic interface table MIB of codec values """
+    mib = {
+        OID_SYS_UPTIME: codec.TimeTicks(360_000),
+        OID_IF_TABLE_LASTCHANGE: codec.TimeTicks(500),
+        OID_SNMP_ENGINE_TIME: codec.Integer(3600),
+    }
+
+    for if_index in range(1, interfaces + 1):
+        if_name = f"Ethernet1/{if_index}".encode()
+        mib[OID_IF_DESCR + (if_index,)] = codec.OctetString(if_name)
+        mib[OID_IF_OPSTATUS + (if_index,)] = codec.Integer(1 + if_index % 2)
+        mib[OID_IF_LASTCHANGE + (if_index,)] = codec.TimeTicks(1000 + if_index)
+        mib[OID_IF_NAME + (if_index,)] = codec.OctetString(if_name)
+        mib[OID_IF_HC_IN_OCTETS + (if_index,)] = codec.Counter64(if_index * 10_000)
+        mib[OID_IF_HC_OUT_OCTETS + (if_index,)] = codec.Counter64(if_index * 20_000)
+        mib[OID_IF_IN_DISCARDS + (if_index,)] = codec.Counter32(0)
+        mib[OID_IF_IN_ERRORS + (if_index,)] = codec.Counter32(if_index)
+        mib[OID_IF_OUT_DISCARDS + (if_index,)] = codec.Counter32(0)
+        mib[OID_IF_OUT_ERRORS + (if_index,)] = codec.Counter32(0)
+        mib[OID_IF_ALIAS + (if_index,)] = codec.OctetString(
+            f"to server{if_index} port eth0".encode()
+        )
+
+    return mib
+
+
+# snmprec type tags, see the snmpsim documentation; the "x" suffix denotes a
+# hex encoded value.
+
+_SNMPREC_TYPES = {
+    "2": codec.Integer,
+    "4": codec.OctetString,
+    "5": lambda _value: codec.NULL,
+    "6": codec.Oid,
+    "64": codec.IpAddress,
+    "65": codec.Counter32,
+    "66": codec.Gauge32,
+    "67": codec.TimeTicks,
+    "68": codec.Opaque,
+    "70": codec.Counter64,
+}
+
+# snmpwalk -On output types, for example:
+#   .1.3.6.1.2.1.2.2.1.2.1 = STRING: "Ethernet1/1"
+
+_SNMPWALK_TYPES = {
+    "INTEGER": codec.Integer,
+    "STRING": codec.OctetString,
+    "Hex-STRING": codec.OctetString,
+    "OID": codec.Oid,
+    "IpAddress": codec.IpAddress,
+    "Counter32": codec.Counter32,
+    "Gauge32": codec.Gauge32,
+    "Timeticks": codec.TimeTicks,
+    "Counter64": codec.Counter64,
+}
+
+_SNMPWALK_LINE = re.compile(r"^\.?(?P<oid>[\d.]+) = (?P<type>[\w-]+): ?(?P<value>.*)$")
+
+
+def _snmprec_value(type_tag: str, value: str):
+    if type_tag.endswith("x"):
+        octets = bytes.fromhex(value)
+        type_tag = type_tag[:-1]
+        return _SNMPREC_TYPES[type_tag](
+            int.from_bytes(octets, "big") if type_tag in ("2", "65", "66") else octets
+        )
+
+    value_cls = _SNMPREC_TYPES[type_tag]
+    if issubclass(value_cls, int):
+        return value_cls(int(value))
+
+    if value_cls in (codec.OctetString, codec.Opaque):
+        return value_cls(value.encode())
+
+    if value_cls is codec.IpAddress:
+        return value_cls(bytes(map(int, value.split("."))))
+
+    return value_cls(value)
+
+
+def _snmpwalk_value(type_name: str, value: str):
+    value_cls = _SNMPWALK_TYPES[type_name]
+
+    if type_name == "Hex-STRING":
+        return value_cls(bytes.fromhex(value.replace(" ", "")))
+
+    if type_name == "STRING":
+        return value_cls(value.strip('"').encode())
+
+    if type_name == "Timeticks":
+        # for example: (360000) 1:00:00.00
+        return value_cls(int(value[1 : value.index(")")]))
+
+    if type_name == "INTEGER":
+        # for example: up(1)
+        value = value[value.index("(") + 1 : -1] if "(" in value else value
+        return value_cls(int(value))
+
+    if value_cls is codec.IpAddress:
+        return value_cls(bytes(map(int, value.split("."))))
+
+    return value_cls(int(value) if issubclass(value_cls, int) else value)
+
+
+def load_recording(filepath: Path) -> MibType:
+    """
+    Returns the MIB loaded from the recorded walk file, in either the snmprec
+    or the "snmpwalk -On" format.  Lines that cannot be parsed are skipped.
+    """
+    mib = dict()
+
+    for line in Path(filepath).read_text().splitlines():
+        if not (line := line.strip()) or line.startswith("#"):
+            continue
+
+        try:
+            if (match := _SNMPWALK_LINE.match(line)) is not None:
+                oid = match["oid"]
+                value = _snmpwalk_value(match["type"], match["value"])
+            else:
+                oid, type_tag, value = line.split("|", 2)
+                value = _snmprec_value(type_tag, value)
+
+        except (KeyError, ValueError):
+            continue
+
+        mib[codec.Oid(oid)] = value
+
+    return mib
+
+
+# -----------------------------------------------------------------------------
+#                                  Agent
+# -----------------------------------------------------------------------------
+
+
+class SimAgentProtocol(asyncio.DatagramProtocol):
+    """ serves GET, GETNEXT, and GETBULK from the MIB dict of codec values """
+
+    def __init__(self, mib: MibType, latency: float = 0.0, loss: float = 0.0):
+        self.mib = mib
+        self.oids = sorted(mib)
+        self.latency = latency
+        self.loss = loss
+        self.started = time.monotonic()
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def value(self, oid: tuple):
+        """ returns the OID value, the sysUpTime and HC counters increase """
+        value = self.mib[oid]
+        elapsed = time.monotonic() - self.started
+
+        if oid == OID_SYS_UPTIME:
+            return codec.TimeTicks(value + int(elapsed * 100))
+
+        if oid[:-1] in (OID_IF_HC_IN_OCTETS, OID_IF_HC_OUT_OCTETS):
+            return codec.Counter64(value + int(elapsed * oid[-1] * 1_000_000))
+
+        return value
+
+    def get_next(self, oid: tuple):
+        idx = bisect_right(self.oids, oid)
+        if idx == len(self.oids):
+            return oid, codec.END_OF_MIB_VIEW
+
+        next_oid = self.oids[idx]
+        return next_oid, self.value(next_oid)
+
+    def respond(self, request: codec.SnmpMessage):
+        oids = [oid for oid, _ in request.var_binds]
+
+        if request.pdu_type == codec.PDU_GET:
+            var_binds = [
+                (oid, self.value(oid) if oid in self.mib else codec.NO_SUCH_INSTANCE)
+                for oid in oids
+            ]
+
+        elif request.pdu_type == codec.PDU_GETNEXT:
+            var_binds = [self.get_next(oid) for oid in oids]
+
+        elif request.pdu_type == codec.PDU_GETBULK:
+            non_repeaters = min(request.error_status, len(oids))
+            var_binds = [self.get_next(oid) for oid in oids[:non_repeaters]]
+            repeaters = oids[non_repeaters:]
+
+            for _ in range(request.error_index):
+                if not repeaters:
+                    break
+                row = [self.get_next(oid) for oid in repeaters]
+                var_binds.extend(row)
+                if all(value is codec.END_OF_MIB_VIEW for _, value in row):
+                    break
+                repeaters = [oid for oid, _ in row]
+
+        else:
+            return None
+
+        return codec.encode_message(
+            codec.PDU_RESPONSE, request.community, request.request_id, var_binds
+        )
+
+    def datagram_received(self, data, addr):
+        if self.loss and random.random() < self.loss:
+            return
+
+        try:
+            request = codec.decode_message(data)
+        except codec.CodecError:
+            return
+
+        if (response := self.respond(request)) is None:
+            return
+
+        if self.latency:
+            asyncio.get_running_loop().call_later(
+                self.latency, self.transport.sendto, response, addr
+            )
+        else:
+            self.transport.sendto(response, addr)
+
+
+def run_sim(
+    port,
+    ready=None,
+    interfaces=500,
+    latency=0.0,
+    loss=0.0,
+    recording: Optional[str] = None,
+):
+    """
+    Run the simulator on 127.0.0.1:`port` forever; `ready` is an optional
+    multiprocessing Event set when the simulator is serving.  The MIB is
+    loaded from the `recording` file if provided, otherwise the synthetic
+    interface table of `interfaces` is used.
+    """
+    mib = load_recording(recording) if recording else make_if_mib(interfaces)
+
+    async def serve():
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(
+            lambda: SimAgentProtocol(mib, latency=latency, loss=loss),
+            local_addr=("127.0.0.1", port),
+        )
+        if ready is not None:
+            ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="netpaca SNMP agent simulator")
+    parser.add_argument("--port", type=int, default=11161)
+    parser.add_argument("--interfaces", type=int, default=500)
+    parser.add_argument("--recording", help="recorded walk file")
+    parser.add_argument("--latency", type=float, default=0.0, help="latency ms")
+    parser.add_argument("--loss", type=float, default=0.0, help="response loss")
+    opts = parser.parse_args()
+
+    run_sim(
+        opts.port,
+        interfaces=opts.interfaces,
+        latency=opts.latency / 1000,
+        loss=opts.loss,
+        recording=opts.recording,
+    )
+
+
+if __name__ == "__main__":
+    main()
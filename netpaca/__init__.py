@@ -13,14 +13,29 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Any, Mapping
+from typing import Any, Mapping, Optional, Type
 import time
 from base64 import encodebytes
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 
 from pydantic import dataclasses, PositiveInt, Field, fields
 
-__all__ = ["Metric", "MetricTimestamp", "timestamp_now", "b64encodestr"]
+from netpaca.tags import TagSet
+
+__all__ = [
+    "Metric",
+    "LiteMetric",
+    "MetricBatch",
+    "TagSet",
+    "MetricTimestamp",
+    "timestamp_now",
+    "metric_timestamp",
+    "cycle_timestamp",
+    "b64encodestr",
+    "set_metric_validation",
+]
 
 
 def timestamp_now():
@@ -28,6 +43,34 @@ def timestamp_now():
     return int(time.time() * 1000)
 
 
+# the collection cycle timestamp is set by the CollectorExecutor for the
+# duration of each collector cycle, see cycle_timestamp().
+
+_cycle_timestamp = ContextVar("netpaca_cycle_timestamp", default=None)
+
+
+@contextmanager
+def cycle_timestamp(ts: int):
+    """
+    Context manager that sets the collection cycle timestamp used as the
+    default metric timestamp, see metric_timestamp().  The value is bound to
+    the current asyncio task context, and inherited by tasks it creates.
+    """
+    token = _cycle_timestamp.set(ts)
+    try:
+        yield ts
+    finally:
+        _cycle_timestamp.reset(token)
+
+
+def metric_timestamp():
+    """
+    returns the default metric timestamp; the collection cycle timestamp if
+    set, otherwise the current time.
+    """
+    return _cycle_timestamp.get() or timestamp_now()
+
+
 def b64encodestr(str_value):
     return encodebytes(bytes(str_value, encoding="utf-8")).replace(b"\n", b"")
 
@@ -50,7 +93,7 @@ class Metric:
     """
 
     ts: MetricTimestamp = Field(
-        default_factory=timestamp_now,
+        default_factory=metric_timestamp,
         description="metric timestamp in milliseconds since epoch",
     )
     tags: Mapping = Field(
@@ -67,3 +110,84 @@ class Metric:
 
         if isinstance(self.tags, fields.FieldInfo):
             self.tags = self.tags.default_factory()
+
+
+# when enabled, LiteMetric instances are validated using pydantic; this is
+# meant as a debug mode, see set_metric_validation().
+
+_metric_validation = False
+
+
+def set_metric_validation(enabled: bool = True):
+    """ enable/disable the pydantic validation of LiteMetric instances """
+    global _metric_validation
+    _metric_validation = enabled
+
+
+class LiteMetric(object):
+    """
+    LiteMetric is a lightweight, non-validating, alternative to Metric for
+    use in collector hot paths.  It uses __slots__ so that each instance
+    avoids the pydantic validation cost and the per-instance __dict__.  The
+    exporters treat LiteMetric and Metric instances the same.
+
+    A package should subclass LiteMetric for specific collector metrics, set
+    `metric_name` to the default name, and optionally set `model` to the
+    corresponding pydantic Metric class used for validation when debug
+    validation is enabled via set_metric_validation().  A subclass must
+    define an empty __slots__ to retain the memory benefit.
+
+    Examples
+    --------
+    class IFdomRxPowerLiteMetric(LiteMetric):
+        __slots__ = ()
+        metric_name = 'ifdom_rxpower'
+        model = IFdomRxPowerMetric
+    """
+
+    __slots__ = ("ts", "tags", "value", "name")
+
+    metric_name: Optional[str] = None
+    model: Optional[Type[Metric]] = None
+
+    def __init__(self, value, name=None, ts=None, tags=None):
+        self.value = value
+        self.name = name or self.metric_name
+        self.ts = ts or metric_timestamp()
+        self.tags = tags if tags is not None else {}
+
+        if _metric_validation:
+            self.validate()
+
+    def validate(self):
+        """
+        Validate the metric using the pydantic `model`, or Metric if not
+        defined.  Raises pydantic.ValidationError if the metric is not valid.
+        """
+        (self.model or Metric)(
+            name=self.name, value=self.value, ts=self.ts, tags=self.tags
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, (LiteMetric, Metric)):
+            return NotImplemented
+
+        return (self.name, self.value, self.ts, self.tags) == (
+            other.name,
+            other.value,
+            other.ts,
+            other.tags,
+        )
+
+    # the tags are a mutable dict, so the instances are not hashable.
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(ts={self.ts!r}, tags={self.tags!r}, "
+            f"value={self.value!r}, name={self.name!r})"
+        )
+
+
+from netpaca.batch import MetricBatch  # noqa: E402
@@ -0,0 +1,332 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the SNMPv2c fast path.  The requests are encoded and the
+responses decoded using the minimal BER codec, see codec.py, and sent over an
+asyncio UDP socket pool shared by all devices, see dispatcher.py, bypassing
+the pysnmp hlapi and MIB resolution.
+
+The fast path is enabled per device by the pysnmp private "fastpath" flag,
+see the `fastpath` SNMP configuration option.  The walk.py functions then
+delegate to the functions in this file, which have the same signatures, so
+that the callers and the row factory functions are unchanged.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Callable, List, Any, Mapping, Dict
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers import DriverBase
+from netpaca.aiosnmp.codec import (
+    Oid,
+    SnmpMessage,
+    EndOfMibView,
+    NoSuchObject,
+    NoSuchInstance,
+    encode_message,
+    PDU_GET,
+    PDU_GETNEXT,
+    PDU_GETBULK,
+)
+from netpaca.aiosnmp.dispatcher import get_snmp_dispatcher
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "snmp_request",
+    "walk_table",
+    "bulk_walk_table",
+    "walk_columns",
+    "get_scalars",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+DEFAULT_MAX_REPETITIONS = 25
+
+
+def _community(dev_pysnmp: dict) -> bytes:
+    if (community := dev_pysnmp.get("community_name")) is None:
+        community = dev_pysnmp["community"].communityName
+
+    return community.encode() if isinstance(community, str) else bytes(community)
+
+
+async def snmp_request(
+    device: DriverBase,
+    pdu_type: int,
+    oids: List[Oid],
+    non_repeaters: int = 0,
+    max_repetitions: int = 0,
+) -> SnmpMessage:
+    """
+    Send the SNMP request to the device, via the process SNMP dispatcher, and
+    return the response message.  The request is retransmitted using the
+    device pysnmp "timeout" and "retries" options.
+
+    Raises
+    ------
+    RuntimeError
+        When no response is received.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+    community = _community(dev_pysnmp)
+    var_binds = [(oid, None) for oid in oids]
+
+    def data_factory(request_id):
+        return encode_message(
+            pdu_type,
+            community,
+            request_id,
+            var_binds,
+            error_status=non_repeaters,
+            error_index=max_repetitions,
+        )
+
+    dispatcher = get_snmp_dispatcher(dev_pysnmp.get("sockets"))
+    response = await dispatcher.request(
+        device,
+        data_factory,
+        timeout=dev_pysnmp.get("timeout", 1),
+        retries=dev_pysnmp.get("retries", 5),
+    )
+
+    if response is not None:
+        return response
+
+    emsg = f"{device.name}: SNMP request timeout"
+    device.log.error(emsg)
+    raise RuntimeError(emsg, "requestTimedOut")
+
+
+def _default_factory(var_bind):
+    """ default row factory to return value only """
+    return var_bind[1].prettyPrint()
+
+
+async def walk_table(
+    device: DriverBase, oid, factory: Optional[Callable] = None
+) -> List[Any]:
+    """ fast path walk_table, see netpaca.aiosnmp.walk.walk_table """
+    factory = factory or _default_factory
+    root = Oid(oid)
+    next_oid = root
+    collected = list()
+
+    while True:
+        response = await snmp_request(device, PDU_GETNEXT, [next_oid])
+
+        if response.error_status:
+            device.log.error(
+                f"{device.name}: SNMP error-status {response.error_status} "
+                f"at {next_oid}"
+            )
+            return collected
+
+        var_bind = response.var_binds[0]
+        next_oid, var_value = var_bind
+
+        if isinstance(var_value, EndOfMibView) or not root.isPrefixOf(next_oid):
+            return collected
+
+        collected.append(factory(var_bind))
+
+
+async def bulk_walk_table(
+    device: DriverBase,
+    oid,
+    factory: Optional[Callable] = None,
+    max_repetitions: Optional[int] = None,
+) -> List[Any]:
+    """ fast path bulk_walk_table, see netpaca.aiosnmp.walk.bulk_walk_table """
+    dev_pysnmp = device.private["pysnmp"]
+    if dev_pysnmp.get("bulk", True) is False:
+        return await walk_table(device, oid, factory=factory)
+
+    max_repetitions = (
+        max_repetitions
+        or dev_pysnmp.get("max_repetitions")
+        or DEFAULT_MAX_REPETITIONS
+    )
+
+    factory = factory or _default_factory
+    root = next_oid = Oid(oid)
+    collected = list()
+    last_oid = ()
+
+    def fallback(reason):
+        device.log.warning(
+            f"{device.name}: SNMP GETBULK failed on OID: {oid}: {reason}, "
+            "using GETNEXT"
+        )
+        dev_pysnmp["bulk"] = False
+        return walk_table(device, oid, factory=factory)
+
+    while True:
+        response = await snmp_request(
+            device, PDU_GETBULK, [next_oid], max_repetitions=max_repetitions
+        )
+
+        if response.error_status:
+            return await fallback(f"error-status {response.error_status}")
+
+        if not response.var_binds:
+            return await fallback("empty response")
+
+        for var_bind in response.var_binds:
+            var_oid, var_value = var_bind
+
+            if isinstance(var_value, EndOfMibView) or not root.isPrefixOf(var_oid):
+                return collected
+
+            if var_oid <= last_oid:
+                return await fallback("OID not increasing")
+
+            last_oid = var_oid
+            collected.append(factory(var_bind))
+
+        next_oid = last_oid
+
+
+def _column_index(oid: tuple, root_len: int):
+    """ returns the table row index from the column OID, int if single-valued """
+    index = oid[root_len:]
+    return index[0] if len(index) == 1 else index
+
+
+async def walk_columns(
+    device: DriverBase,
+    columns: Mapping[str, str],
+    converters: Optional[Mapping[str, Callable]] = None,
+    max_repetitions: Optional[int] = None,
+) -> Dict[Any, Dict[str, Any]]:
+    """ fast path walk_columns, see netpaca.aiosnmp.walk.walk_columns """
+    dev_pysnmp = device.private["pysnmp"]
+    converters = converters or {}
+    convert = {
+        name: converters.get(name) or (lambda _val: _val.prettyPrint())
+        for name in columns
+    }
+    roots = {name: Oid(oid) for name, oid in columns.items()}
+    rows: Dict[Any, Dict[str, Any]] = dict()
+
+    async def fallback(reason=None):
+        if reason:
+            device.log.warning(
+                f"{device.name}: SNMP GETBULK failed on columns: "
+                f"{list(columns)}: {reason}, using GETNEXT"
+            )
+            dev_pysnmp["bulk"] = False
+
+        rows.clear()
+        for name, root in roots.items():
+
+            def factory(var_bind, _name=name, _root_len=len(root)):
+                var_oid, var_value = var_bind
+                return _column_index(var_oid, _root_len), convert[_name](var_value)
+
+            for index, value in await walk_table(device, root, factory=factory):
+                rows.setdefault(index, {})[name] = value
+
+        return rows
+
+    if dev_pysnmp.get("bulk", True) is False:
+        return await fallback()
+
+    max_repetitions = max_repetitions or max(
+        1,
+        (dev_pysnmp.get("max_repetitions") or DEFAULT_MAX_REPETITIONS)
+        // len(columns),
+    )
+
+    active = list(columns)
+    next_oids = [roots[name] for name in active]
+    last_oid = dict.fromkeys(active, ())
+
+    while active:
+        response = await snmp_request(
+            device, PDU_GETBULK, next_oids, max_repetitions=max_repetitions
+        )
+
+        if response.error_status:
+            return await fallback(f"error-status {response.error_status}")
+
+        if not (var_binds := response.var_binds):
+            return await fallback("empty response")
+
+        # the response var_binds are the rows of one var_bind per active
+        # column, in the same order as the request.
+
+        n_cols = len(active)
+        done = set()
+
+        for offset in range(0, len(var_binds) - n_cols + 1, n_cols):
+            for name, (var_oid, var_value) in zip(
+                active, var_binds[offset : offset + n_cols]
+            ):
+                if name in done:
+                    continue
+
+                root = roots[name]
+
+                if isinstance(var_value, EndOfMibView) or not root.isPrefixOf(
+                    var_oid
+                ):
+                    done.add(name)
+                    continue
+
+                if var_oid <= last_oid[name]:
+                    return await fallback("OID not increasing")
+
+                last_oid[name] = var_oid
+                index = _column_index(var_oid, len(root))
+                rows.setdefault(index, {})[name] = convert[name](var_value)
+
+        # setup to fetch the next rows for the columns that have not ended
+
+        next_oids = [
+            last_oid[name] or roots[name] for name in active if name not in done
+        ]
+        active = [name for name in active if name not in done]
+
+    return rows
+
+
+async def get_scalars(device: DriverBase, oids: List[str]) -> List[Any]:
+    """ fast path get_scalars, see netpaca.aiosnmp.walk.get_scalars """
+    response = await snmp_request(device, PDU_GET, [Oid(oid) for oid in oids])
+
+    if response.error_status:
+        emsg = f"{device.name}: SNMP failed on OIDs: {oids}"
+        device.log.error(emsg)
+        raise RuntimeError(emsg, response.error_status)
+
+    return [
+        None if isinstance(var_value, (NoSuchObject, NoSuchInstance)) else var_value
+        for _, var_value in response.var_binds
+    ]
@@ -0,0 +1,530 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains a minimal BER encoder/decoder for SNMPv2c messages, used
+by the SNMP fast path, see client.py.  Only numeric OIDs are supported, there
+is no MIB resolution.  For SNMPv3 only the USM engine discovery request and
+its report are supported, see usm.py.
+
+The decoded values are lightweight subclasses of the Python builtin types.
+They provide the subset of the pysnmp value API used by the table row
+factories, that is getOid(), asTuple(), prettyPrint(), and asOctets(), so that
+the same factory functions work with both the pysnmp and the fast path.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import List, Tuple, Any, Iterable, NamedTuple
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "Oid",
+    "Integer",
+    "OctetString",
+    "Null",
+    "IpAddress",
+    "Counter32",
+    "Gauge32",
+    "TimeTicks",
+    "Opaque",
+    "Counter64",
+    "NoSuchObject",
+    "NoSuchInstance",
+    "EndOfMibView",
+    "SnmpMessage",
+    "CodecError",
+    "encode_message",
+    "decode_message",
+    "encode_v3_discovery",
+    "decode_v3_engine",
+    "PDU_GET",
+    "PDU_GETNEXT",
+    "PDU_RESPONSE",
+    "PDU_GETBULK",
+    "PDU_REPORT",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+SNMP_VERSION_2C = 1
+SNMP_VERSION_3 = 3
+USM_SECURITY_MODEL = 3
+
+PDU_GET = 0xA0
+PDU_GETNEXT = 0xA1
+PDU_RESPONSE = 0xA2
+PDU_GETBULK = 0xA5
+PDU_REPORT = 0xA8
+
+TAG_INTEGER = 0x02
+TAG_OCTET_STRING = 0x04
+TAG_NULL = 0x05
+TAG_OID = 0x06
+TAG_SEQUENCE = 0x30
+
+
+class CodecError(ValueError):
+    """ the message could not be decoded """
+
+
+# -----------------------------------------------------------------------------
+#                                 Value Types
+# -----------------------------------------------------------------------------
+
+
+class Oid(tuple):
+    """
+    A numeric OID, created from a tuple of int or from the dotted string form,
+    for example Oid("1.3.6.1.2.1.1.3.0").
+    """
+
+    __slots__ = ()
+    tag = TAG_OID
+
+    def __new__(cls, value=()):
+        if isinstance(value, str):
+            value = (int(arc) for arc in value.strip(".").split("."))
+
+        return super().__new__(cls, value)
+
+    def getOid(self) -> "Oid":  # noqa: N802
+        return self
+
+    def asTuple(self) -> tuple:  # noqa: N802
+        return tuple(self)
+
+    def isPrefixOf(self, other) -> bool:  # noqa: N802
+        return other[: len(self)] == self
+
+    def prettyPrint(self) -> str:  # noqa: N802
+        return ".".join(map(str, self))
+
+    def __str__(self):
+        return self.prettyPrint()
+
+
+class Integer(int):
+    """ the SNMP INTEGER type """
+
+    __slots__ = ()
+    tag = TAG_INTEGER
+
+    def prettyPrint(self) -> str:  # noqa: N802
+        return str(int(self))
+
+
+class Counter32(Integer):
+    __slots__ = ()
+    tag = 0x41
+
+
+class Gauge32(Integer):
+    __slots__ = ()
+    tag = 0x42
+
+
+class TimeTicks(Integer):
+    __slots__ = ()
+    tag = 0x43
+
+
+class Counter64(Integer):
+    __slots__ = ()
+    tag = 0x46
+
+
+class OctetString(bytes):
+    """ the SNMP OCTET STRING type """
+
+    __slots__ = ()
+    tag = TAG_OCTET_STRING
+
+    def asOctets(self) -> bytes:  # noqa: N802
+        return bytes(self)
+
+    def prettyPrint(self) -> str:  # noqa: N802
+        # same as pysnmp: text unless the value contains control characters.
+        for octet in self:
+            if octet < 32 and octet not in (9, 10, 13):
+                return "0x" + self.hex()
+
+        return self.decode("utf-8", "ignore")
+
+
+class Opaque(OctetString):
+    __slots__ = ()
+    tag = 0x44
+
+
+class IpAddress(OctetString):
+    __slots__ = ()
+    tag = 0x40
+
+    def prettyPrint(self) -> str:  # noqa: N802
+        return ".".join(map(str, self))
+
+
+class _Singleton(object):
+    """ base class for the NULL and the exception values, which have no content """
+
+    __slots__ = ()
+    tag = TAG_NULL
+
+    def prettyPrint(self) -> str:  # noqa: N802
+        return ""
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class Null(_Singleton):
+    __slots__ = ()
+    tag = TAG_NULL
+
+
+class NoSuchObject(_Singleton):
+    __slots__ = ()
+    tag = 0x80
+
+    def prettyPrint(self) -> str:  # noqa: N802
+        return "No Such Object currently exists at this OID"
+
+
+class NoSuchInstance(_Singleton):
+    __slots__ = ()
+    tag = 0x81
+
+    def prettyPrint(self) -> str:  # noqa: N802
+        return "No Such Instance currently exists at this OID"
+
+
+class EndOfMibView(_Singleton):
+    __slots__ = ()
+    tag = 0x82
+
+    def prettyPrint(self) -> str:  # noqa: N802
+        return "No more variables left in this MIB View"
+
+
+NULL = Null()
+NO_SUCH_OBJECT = NoSuchObject()
+NO_SUCH_INSTANCE = NoSuchInstance()
+END_OF_MIB_VIEW = EndOfMibView()
+
+_INT_TYPES = {
+    cls.tag: cls for cls in (Integer, Counter32, Gauge32, TimeTicks, Counter64)
+}
+_OCTET_TYPES = {cls.tag: cls for cls in (OctetString, IpAddress, Opaque)}
+_SINGLETONS = {
+    value.tag: value
+    for value in (NULL, NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW)
+}
+
+
+class SnmpMessage(NamedTuple):
+    pdu_type: int
+    community: bytes
+    request_id: int
+    error_status: int  # non-repeaters for GETBULK
+    error_index: int  # max-repetitions for GETBULK
+    var_binds: List[Tuple[Oid, Any]]
+
+
+# -----------------------------------------------------------------------------
+#                                   Encoder
+# -----------------------------------------------------------------------------
+
+
+def _tlv(tag: int, content: bytes) -> bytes:
+    length = len(content)
+    if length < 0x80:
+        return bytes((tag, length)) + content
+
+    len_bytes = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes((tag, 0x80 | len(len_bytes))) + len_bytes + content
+
+
+def _encode_int(tag: int, value: int) -> bytes:
+    # minimal two's complement; the unsigned types are non-negative so the
+    # same encoding adds the leading zero octet when the high bit is set.
+    size = (value if value >= 0 else ~value).bit_length() // 8 + 1
+    return _tlv(tag, value.to_bytes(size, "big", signed=True))
+
+
+def _encode_oid(oid: Iterable[int]) -> bytes:
+    arcs = tuple(oid)
+    content = bytearray()
+    for arc in (arcs[0] * 40 + arcs[1],) + arcs[2:]:
+        if arc < 0x80:
+            content.append(arc)
+            continue
+
+        septets = []
+        while arc:
+            septets.append(arc & 0x7F)
+            arc >>= 7
+
+        content.extend(septet | 0x80 for septet in reversed(septets[1:]))
+        content.append(septets[0])
+
+    return _tlv(TAG_OID, bytes(content))
+
+
+def _encode_value(value) -> bytes:
+    if value is None:
+        return b"\x05\x00"
+
+    tag = value.tag
+    if isinstance(value, int):
+        return _encode_int(tag, value)
+
+    if isinstance(value, bytes):
+        return _tlv(tag, value)
+
+    if isinstance(value, Oid):
+        return _encode_oid(value)
+
+    return bytes((tag, 0))
+
+
+def encode_message(
+    pdu_type: int,
+    community: bytes,
+    request_id: int,
+    var_binds: Iterable[Tuple[Any, Any]],
+    error_status: int = 0,
+    error_index: int = 0,
+) -> bytes:
+    """
+    Returns the encoded SNMPv2c message.  For a request the var_bind values
+    are None; for GETBULK the error_status and error_index are the
+    non-repeaters and max-repetitions values.
+    """
+    var_binds_data = b"".join(
+        _tlv(TAG_SEQUENCE, _encode_oid(oid) + _encode_value(value))
+        for oid, value in var_binds
+    )
+    pdu = (
+        _encode_int(TAG_INTEGER, request_id)
+        + _encode_int(TAG_INTEGER, error_status)
+        + _encode_int(TAG_INTEGER, error_index)
+        + _tlv(TAG_SEQUENCE, var_binds_data)
+    )
+    return _tlv(
+        TAG_SEQUENCE,
+        _encode_int(TAG_INTEGER, SNMP_VERSION_2C)
+        + _tlv(TAG_OCTET_STRING, community)
+        + _tlv(pdu_type, pdu),
+    )
+
+
+# -----------------------------------------------------------------------------
+#                                   Decoder
+# -----------------------------------------------------------------------------
+
+
+def _decode_header(data: bytes, pos: int) -> Tuple[int, int, int]:
+    """ returns (tag, content start, content end) of the TLV at `pos` """
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[pos : pos + size], "big")
+        pos += size
+
+    end = pos + length
+    if end > len(data):
+        raise CodecError("truncated message")
+
+    return tag, pos, end
+
+
+def _decode_oid(data: bytes, pos: int, end: int) -> Oid:
+    arcs = []
+    arc = 0
+
+    for octet in data[pos:end]:
+        arc = (arc << 7) | (octet & 0x7F)
+        if not octet & 0x80:
+            arcs.append(arc)
+            arc = 0
+
+    # the first sub-identifier encodes the first two arcs.
+
+    first = arcs[0]
+    arcs[0:1] = (first // 40, first % 40) if first < 80 else (2, first - 80)
+    return Oid(arcs)
+
+
+def _decode_int(data: bytes, pos: int, end: int) -> int:
+    return int.from_bytes(data[pos:end], "big", signed=True)
+
+
+def _decode_value(tag: int, data: bytes, pos: int, end: int):
+    if (int_cls := _INT_TYPES.get(tag)) is not None:
+        value = int.from_bytes(data[pos:end], "big", signed=tag == TAG_INTEGER)
+        return int_cls(value)
+
+    if (octet_cls := _OCTET_TYPES.get(tag)) is not None:
+        return octet_cls(data[pos:end])
+
+    if tag == TAG_OID:
+        return _decode_oid(data, pos, end)
+
+    if (value := _SINGLETONS.get(tag)) is not None:
+        return value
+
+    raise CodecError(f"unsupported value type: 0x{tag:02x}")
+
+
+def decode_message(data: bytes) -> SnmpMessage:
+    """
+    Returns the SnmpMessage decoded from the SNMPv2c message `data`.  Raises
+    CodecError if the message is not a valid SNMPv2c message.
+    """
+    try:
+        tag, pos, end = _decode_header(data, 0)
+        if tag != TAG_SEQUENCE:
+            raise CodecError("not an SNMP message")
+
+        _, pos, next_pos = _decode_header(data, pos)
+        if _decode_int(data, pos, next_pos) != SNMP_VERSION_2C:
+            raise CodecError("not an SNMPv2c message")
+
+        _, pos, next_pos = _decode_header(data, next_pos)
+        community = data[pos:next_pos]
+
+        pdu_type, pos, _ = _decode_header(data, next_pos)
+        ints = []
+        for _ in range(3):
+            _, pos, next_pos = _decode_header(data, pos)
+            ints.append(_decode_int(data, pos, next_pos))
+            pos = next_pos
+
+        _, pos, vbs_end = _decode_header(data, pos)
+        var_binds = []
+
+        while pos < vbs_end:
+            _, pos, vb_end = _decode_header(data, pos)
+            _, pos, next_pos = _decode_header(data, pos)
+            oid = _decode_oid(data, pos, next_pos)
+            tag, pos, next_pos = _decode_header(data, next_pos)
+            var_binds.append((oid, _decode_value(tag, data, pos, next_pos)))
+            pos = vb_end
+
+    except IndexError:
+        raise CodecError("truncated message")
+
+    return SnmpMessage(pdu_type, bytes(community), *ints, var_binds)
+
+
+# -----------------------------------------------------------------------------
+#                           SNMPv3 Engine Discovery
+# -----------------------------------------------------------------------------
+
+
+def encode_v3_discovery(msg_id: int, max_size: int = 65507) -> bytes:
+    """
+    Returns the SNMPv3 engine discovery request, see RFC 3414 section 4: an
+    unauthenticated, reportable, GET with no var_binds and an empty engine-id
+    and user name.  The msg_id is also used as the request-id.
+    """
+    usm_params = _tlv(
+        TAG_SEQUENCE,
+        _tlv(TAG_OCTET_STRING, b"")  # msgAuthoritativeEngineID
+        + _encode_int(TAG_INTEGER, 0)  # msgAuthoritativeEngineBoots
+        + _encode_int(TAG_INTEGER, 0)  # msgAuthoritativeEngineTime
+        + _tlv(TAG_OCTET_STRING, b"")  # msgUserName
+        + _tlv(TAG_OCTET_STRING, b"")  # msgAuthenticationParameters
+        + _tlv(TAG_OCTET_STRING, b""),  # msgPrivacyParameters
+    )
+    header = _tlv(
+        TAG_SEQUENCE,
+        _encode_int(TAG_INTEGER, msg_id)
+        + _encode_int(TAG_INTEGER, max_size)
+        + _tlv(TAG_OCTET_STRING, b"\x04")  # reportable, noAuthNoPriv
+        + _encode_int(TAG_INTEGER, USM_SECURITY_MODEL),
+    )
+    pdu = _tlv(
+        PDU_GET,
+        _encode_int(TAG_INTEGER, msg_id)
+        + _encode_int(TAG_INTEGER, 0)
+        + _encode_int(TAG_INTEGER, 0)
+        + _tlv(TAG_SEQUENCE, b""),
+    )
+    scoped_pdu = _tlv(
+        TAG_SEQUENCE,
+        _tlv(TAG_OCTET_STRING, b"") + _tlv(TAG_OCTET_STRING, b"") + pdu,
+    )
+    return _tlv(
+        TAG_SEQUENCE,
+        _encode_int(TAG_INTEGER, SNMP_VERSION_3)
+        + header
+        + _tlv(TAG_OCTET_STRING, usm_params)
+        + scoped_pdu,
+    )
+
+
+def decode_v3_engine(data: bytes) -> Tuple[int, bytes, int, int]:
+    """
+    Returns the (msg_id, engine_id, engine_boots, engine_time) from the USM
+    security parameters of the SNMPv3 message `data`, that is the report in
+    response to the engine discovery request.  Raises CodecError if the
+    message is not a valid SNMPv3 USM message.
+    """
+    try:
+        tag, pos, end = _decode_header(data, 0)
+        if tag != TAG_SEQUENCE:
+            raise CodecError("not an SNMP message")
+
+        _, pos, next_pos = _decode_header(data, pos)
+        if _decode_int(data, pos, next_pos) != SNMP_VERSION_3:
+            raise CodecError("not an SNMPv3 message")
+
+        # msgGlobalData: the msgID is the first field.
+
+        _, pos, header_end = _decode_header(data, next_pos)
+        _, pos, next_pos = _decode_header(data, pos)
+        msg_id = _decode_int(data, pos, next_pos)
+
+        # msgSecurityParameters: an OCTET STRING that contains the USM
+        # security parameters sequence.
+
+        _, pos, _ = _decode_header(data, header_end)
+        _, pos, _ = _decode_header(data, pos)
+        _, pos, next_pos = _decode_header(data, pos)
+        engine_id = bytes(data[pos:next_pos])
+
+        fields = []
+        for _ in range(2):
+            _, pos, next_pos = _decode_header(data, next_pos)
+            fields.append(_decode_int(data, pos, next_pos))
+
+    except IndexError:
+        raise CodecError("truncated message")
+
+    return (msg_id, engine_id, *fields)
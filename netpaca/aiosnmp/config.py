@@ -0,0 +1,110 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the SNMP configuration model used in the configuration
+file defaults.  This module does not import pysnmp so that the configuration
+can be loaded when the SNMP support is not installed.
+
+    [defaults.snmp]
+        community = "$SNMP_COMMUNITY"
+        timeout = 2
+        retries = 3
+        max_repetitions = 25
+        fastpath = false
+        max_inflight = 4
+        sockets = 4
+
+    [defaults.snmp.v3]
+        user = "netpaca"
+        auth_protocol = "sha"
+        auth_key = "$SNMP_AUTH_KEY"
+        priv_protocol = "aes128"
+        priv_key = "$SNMP_PRIV_KEY"
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Literal
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pydantic import PositiveInt, PositiveFloat, conint
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.core.config_model import NoExtraBaseModel, EnvSecretStr
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["SnmpConfigModel", "SnmpV3ConfigModel", "SNMP_V2_PORT"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+SNMP_V2_PORT = 161
+
+AuthProtocol = Literal["md5", "sha", "sha224", "sha256", "sha384", "sha512"]
+PrivProtocol = Literal["des", "3des", "aes128", "aes192", "aes256"]
+
+
+class SnmpV3ConfigModel(NoExtraBaseModel):
+    """
+    The SNMPv3 USM user options.  The security level is authPriv when both
+    keys are configured, authNoPriv when only the auth_key is configured, and
+    noAuthNoPriv otherwise.  The keys are passphrases, localized for each
+    device engine-id.
+    """
+
+    user: str
+    auth_protocol: AuthProtocol = "sha"
+    auth_key: Optional[EnvSecretStr]
+    priv_protocol: PrivProtocol = "aes128"
+    priv_key: Optional[EnvSecretStr]
+
+
+class SnmpConfigModel(NoExtraBaseModel):
+    """
+    The SNMP options used for all devices.  The community can be overridden
+    per device using the inventory "snmp_community" field.  When `fastpath` is
+    true the SNMPv2c requests use the lightweight codec and asyncio transport
+    rather than the pysnmp hlapi, see netpaca.aiosnmp.client.  The fast path
+    requests of all devices are multiplexed over a pool of `sockets` UDP
+    sockets, with at most `max_inflight` requests outstanding per device.
+
+    When the `v3` options are configured the devices are polled using SNMPv3,
+    and the community and fastpath options are not used.
+    """
+
+    community: Optional[EnvSecretStr]
+    port: PositiveInt = SNMP_V2_PORT
+    timeout: PositiveFloat = 1.0  # seconds per request
+    retries: conint(ge=0) = 5
+    max_repetitions: PositiveInt = 25
+    fastpath: bool = False
+    max_inflight: PositiveInt = 4  # fastpath requests per device
+    sockets: PositiveInt = 4  # fastpath UDP sockets per process
+    v3: Optional[SnmpV3ConfigModel]
@@ -0,0 +1,230 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the SNMP dispatcher used by the SNMP fast path client.  The
+requests of all devices are multiplexed over a small pool of unconnected UDP
+sockets, rather than one socket per device, and the responses are matched to
+the pending requests by the request-id and the device address.
+
+The number of requests that are in-flight for a device at the same time is
+limited, so that a device is not overrun when several collectors walk it
+concurrently; the requests beyond the limit wait their turn.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Dict, List, Tuple
+from itertools import count, cycle
+import asyncio
+import random
+import socket
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers import DriverBase
+from netpaca.aiosnmp.config import SNMP_V2_PORT
+from netpaca.aiosnmp.codec import SnmpMessage, CodecError, decode_message
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["SnmpDispatcher", "get_snmp_dispatcher"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+DEFAULT_SOCKETS = 4
+DEFAULT_MAX_INFLIGHT = 4
+
+
+class _DispatcherProtocol(asyncio.DatagramProtocol):
+    """ a pool socket; all of the responses are handled by the dispatcher """
+
+    def __init__(self, dispatcher: "SnmpDispatcher"):
+        self.dispatcher = dispatcher
+
+    def datagram_received(self, data, addr):
+        self.dispatcher.response_received(data, addr)
+
+    def error_received(self, exc):
+        # for example ICMP port unreachable; the request times out.
+        pass
+
+
+class SnmpDispatcher(object):
+    """
+    The process SNMP dispatcher, see get_snmp_dispatcher().  The sockets are
+    opened on first use, per address family, and the requests are sent using
+    the sockets in turn.
+
+    Parameters
+    ----------
+    sockets: int
+        The number of UDP sockets per address family.
+    """
+
+    def __init__(self, sockets: int = DEFAULT_SOCKETS):
+        self.loop = asyncio.get_running_loop()
+        self.sockets = sockets
+        self.pending: Dict[int, Tuple[tuple, asyncio.Future]] = dict()
+        self._transports: Dict[int, cycle] = dict()
+        self._opened: List[asyncio.DatagramTransport] = list()
+        self._open_lock = asyncio.Lock()
+        self._request_ids = count(random.randrange(1, 0x3FFFFFFF))
+
+    def next_request_id(self) -> int:
+        while (request_id := next(self._request_ids) & 0x7FFFFFFF) == 0:
+            pass
+        return request_id
+
+    async def _get_transport(self, family: int) -> asyncio.DatagramTransport:
+        if (transports := self._transports.get(family)) is None:
+            async with self._open_lock:
+                if (transports := self._transports.get(family)) is None:
+                    transports = self._transports[family] = cycle(
+                        await self._open_sockets(family)
+                    )
+
+        return next(transports)
+
+    async def _open_sockets(self, family: int) -> List[asyncio.DatagramTransport]:
+        local_addr = ("::", 0) if family == socket.AF_INET6 else ("0.0.0.0", 0)
+        opened = list()
+
+        for _ in range(self.sockets):
+            transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: _DispatcherProtocol(self), local_addr=local_addr, family=family
+            )
+            opened.append(transport)
+
+        self._opened.extend(opened)
+        return opened
+
+    async def _get_device_addr(self, device: DriverBase) -> Tuple[int, tuple]:
+        """
+        Returns the device (address family, socket address), resolved once and
+        cached in the device pysnmp private data.
+        """
+        dev_pysnmp = device.private["pysnmp"]
+
+        if (addr := dev_pysnmp.get("dispatcher_addr")) is None:
+            infos = await self.loop.getaddrinfo(
+                device.device_host,
+                dev_pysnmp.get("port", SNMP_V2_PORT),
+                type=socket.SOCK_DGRAM,
+            )
+            family, *_, sockaddr = infos[0]
+            addr = dev_pysnmp["dispatcher_addr"] = (family, sockaddr[:2])
+
+        return addr
+
+    def response_received(self, data: bytes, addr: tuple):
+        try:
+            message = decode_message(data)
+        except CodecError:
+            return
+
+        # late, duplicate, and responses from another address are discarded.
+
+        pending = self.pending.get(message.request_id)
+        if pending is None:
+            return
+
+        pending_addr, future = pending
+        if addr[:2] == pending_addr and not future.done():
+            future.set_result(message)
+
+    async def request(
+        self, device: DriverBase, data_factory, timeout: float, retries: int
+    ) -> Optional[SnmpMessage]:
+        """
+        Send the request to the device and return the response message, or
+        None if no response is received after the retries.
+
+        Parameters
+        ----------
+        device: DriverBase
+            The device instance
+
+        data_factory: Callable
+            Called with the request-id to return the encoded request.
+
+        timeout: float
+            The seconds to wait for the response per try.
+
+        retries: int
+            The number of times the request is retransmitted.
+        """
+        dev_pysnmp = device.private["pysnmp"]
+
+        if (inflight := dev_pysnmp.get("inflight")) is None:
+            inflight = dev_pysnmp["inflight"] = asyncio.Semaphore(
+                dev_pysnmp.get("max_inflight") or DEFAULT_MAX_INFLIGHT
+            )
+
+        family, addr = await self._get_device_addr(device)
+
+        async with inflight:
+            request_id = self.next_request_id()
+            data = data_factory(request_id)
+            future = self.loop.create_future()
+            self.pending[request_id] = (addr, future)
+
+            try:
+                for _ in range(retries + 1):
+                    transport = await self._get_transport(family)
+                    transport.sendto(data, addr)
+                    try:
+                        return await asyncio.wait_for(asyncio.shield(future), timeout)
+                    except asyncio.TimeoutError:
+                        continue
+
+            finally:
+                del self.pending[request_id]
+
+        return None
+
+    def close(self):
+        for transport in self._opened:
+            transport.close()
+
+        self._opened.clear()
+        self._transports.clear()
+
+
+_dispatcher: Optional[SnmpDispatcher] = None
+
+
+def get_snmp_dispatcher(sockets: Optional[int] = None) -> SnmpDispatcher:
+    """
+    Returns the SNMP dispatcher shared by all devices in this process, created
+    on first use for the running event loop.  The `sockets` value is only used
+    when the dispatcher is created.
+    """
+    global _dispatcher
+
+    if _dispatcher is None or _dispatcher.loop is not asyncio.get_running_loop():
+        _dispatcher = SnmpDispatcher(sockets=sockets or DEFAULT_SOCKETS)
+
+    return _dispatcher
@@ -0,0 +1,189 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the pysnmp engine and transport management.  A single
+SnmpEngine is shared by all devices in the process, and the UDP transport
+target of each device is created once and cached in the device pysnmp
+private data, rather than per request.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Union
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pysnmp.hlapi.asyncio import (
+    SnmpEngine,
+    CommunityData,
+    UsmUserData,
+    UdpTransportTarget,
+)
+from pysnmp.proto import errind
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers import DriverBase
+from netpaca.aiosnmp.config import SnmpConfigModel, SNMP_V2_PORT
+from netpaca.aiosnmp import usm
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "get_snmp_engine",
+    "get_transport_target",
+    "get_auth_data",
+    "auth_failed",
+    "snmp_prepare",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+DEFAULT_COMMUNITY = "public"
+
+# the error indications that are caused by a changed device engine, for
+# example a replaced device, and require the engine to be discovered again.
+
+_USM_ENGINE_ERRORS = (
+    errind.UnknownEngineID,
+    errind.WrongDigest,
+    errind.DecryptionError,
+    errind.UnknownSecurityName,
+)
+
+_snmp_engine: Optional[SnmpEngine] = None
+
+
+def get_snmp_engine() -> SnmpEngine:
+    """ returns the SnmpEngine shared by all devices in this process """
+    global _snmp_engine
+
+    if _snmp_engine is None:
+        _snmp_engine = SnmpEngine()
+
+    return _snmp_engine
+
+
+def snmp_prepare(device: DriverBase, config: Optional[SnmpConfigModel] = None):
+    """
+    Setup the device pysnmp private data using the shared engine and the SNMP
+    configuration options.  A device driver that uses SNMP calls this
+    function from its prepare() method, for example:
+
+        def prepare(self, inventory_rec, config):
+            super().prepare(inventory_rec, config)
+            snmp_prepare(self, config.defaults.snmp)
+
+    Parameters
+    ----------
+    device: DriverBase
+        The device instance, already prepared with the inventory record.
+
+    config: SnmpConfigModel, optional
+        The SNMP options; the model defaults are used if not provided.
+    """
+    config = config or SnmpConfigModel()
+
+    if config.v3:
+        # the UsmUserData is created on first use, once the device engine is
+        # discovered; see get_auth_data().  The fast path is SNMPv2c only.
+
+        device.private["pysnmp"] = dict(
+            engine=get_snmp_engine(),
+            v3=config.v3,
+            port=config.port,
+            timeout=config.timeout,
+            retries=config.retries,
+            max_repetitions=config.max_repetitions,
+            fastpath=False,
+        )
+        return
+
+    if not (community := device.private.get("snmp_community")):
+        community = (
+            config.community.get_secret_value()
+            if config.community
+            else DEFAULT_COMMUNITY
+        )
+
+    device.private["pysnmp"] = dict(
+        engine=get_snmp_engine(),
+        community=CommunityData(community),
+        community_name=community,
+        port=config.port,
+        timeout=config.timeout,
+        retries=config.retries,
+        max_repetitions=config.max_repetitions,
+        fastpath=config.fastpath,
+        max_inflight=config.max_inflight,
+        sockets=config.sockets,
+    )
+
+
+def get_transport_target(device: DriverBase) -> UdpTransportTarget:
+    """
+    Returns the UDP transport target for the device, creating it on first
+    use.  The target creation resolves the device host address, so caching
+    the target also avoids a blocking address lookup per request.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+
+    if (target := dev_pysnmp.get("transport")) is None:
+        target = dev_pysnmp["transport"] = UdpTransportTarget(
+            (device.device_host, dev_pysnmp.get("port", SNMP_V2_PORT)),
+            timeout=dev_pysnmp.get("timeout", 1),
+            retries=dev_pysnmp.get("retries", 5),
+        )
+
+    return target
+
+
+async def get_auth_data(device: DriverBase) -> Union[CommunityData, UsmUserData]:
+    """
+    Returns the device pysnmp authentication data: the CommunityData for
+    SNMPv2c, or the UsmUserData for SNMPv3 which is created on first use.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+
+    if "v3" in dev_pysnmp:
+        return await usm.get_usm_user_data(device)
+
+    return dev_pysnmp["community"]
+
+
+def auth_failed(device: DriverBase, err_indication):
+    """
+    Called with the request error indication.  If the error is caused by a
+    changed SNMPv3 device engine, then the engine is discovered again on the
+    next request.
+    """
+    if "v3" in device.private["pysnmp"] and isinstance(
+        err_indication, _USM_ENGINE_ERRORS
+    ):
+        device.log.warning(f"{device.name}: SNMPv3 {err_indication}, rediscover")
+        usm.invalidate_usm_user_data(device)
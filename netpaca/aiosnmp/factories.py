@@ -0,0 +1,150 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the typed value converters and row factories for the SNMP
+walk functions.  The values are read natively, int() for the INTEGER,
+Counter, Gauge and TimeTicks types and asOctets() for the OCTET STRING types,
+rather than formatted with prettyPrint() and then parsed again.  The same
+functions work with both the pysnmp values and the fast path codec values.
+
+For large tables the IndexedColumn stores the column as two arrays, the table
+indexes and the values, rather than a dict of Python objects.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Callable, Iterable, Tuple, Any, Optional, Iterator
+from array import array
+from bisect import bisect_left
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "as_int",
+    "as_str",
+    "as_bytes",
+    "as_link_up",
+    "make_index_factory",
+    "factory_ifindex_int",
+    "factory_ifindex_str",
+    "IndexedColumn",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                              Value Converters
+# -----------------------------------------------------------------------------
+
+as_int = int
+
+
+def as_bytes(value) -> bytes:
+    """ OCTET STRING value as bytes """
+    return value.asOctets()
+
+
+def as_str(value) -> str:
+    """ OCTET STRING value as str, for example ifName or ifAlias """
+    return value.asOctets().decode("utf-8", "replace")
+
+
+def as_link_up(value) -> bool:
+    """ ifOperStatus / ifAdminStatus value: up(1) -> True, otherwise False """
+    return int(value) == 1
+
+
+# -----------------------------------------------------------------------------
+#                               Row Factories
+# -----------------------------------------------------------------------------
+
+
+def make_index_factory(converter: Callable[[Any], Any]) -> Callable:
+    """
+    Returns the walk_table row factory that converts a single-index table
+    var_bind, for example of the ifTable, to (index, converter(value)).
+    """
+
+    def factory(var_bind):
+        var_name, var_value = var_bind
+        return var_name.getOid()[-1], converter(var_value)
+
+    return factory
+
+
+factory_ifindex_int = make_index_factory(as_int)
+factory_ifindex_str = make_index_factory(as_str)
+
+
+# -----------------------------------------------------------------------------
+#                               Indexed Column
+# -----------------------------------------------------------------------------
+
+
+class IndexedColumn(object):
+    """
+    A single-index table column stored as the sorted array of the indexes and
+    the array of the values in the same order.  The values array typecode is
+    "q" for the INTEGER, Counter32, Gauge32 and TimeTicks columns, and "Q" for
+    the Counter64 columns.
+
+    The column provides the read-only mapping methods, keyed by index.
+    """
+
+    __slots__ = ("indexes", "values")
+
+    def __init__(self, rows: Iterable[Tuple[int, int]] = (), typecode: str = "q"):
+        rows = sorted(rows)
+        self.indexes = array("Q", (index for index, _ in rows))
+        self.values = array(typecode, (value for _, value in rows))
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.indexes)
+
+    def __contains__(self, index) -> bool:
+        return self._position(index) is not None
+
+    def __getitem__(self, index) -> int:
+        if (pos := self._position(index)) is None:
+            raise KeyError(index)
+        return self.values[pos]
+
+    def _position(self, index) -> Optional[int]:
+        pos = bisect_left(self.indexes, index)
+        if pos < len(self.indexes) and self.indexes[pos] == index:
+            return pos
+        return None
+
+    def get(self, index, default=None):
+        pos = self._position(index)
+        return default if pos is None else self.values[pos]
+
+    def keys(self):
+        return self.indexes
+
+    def items(self):
+        return zip(self.indexes, self.values)
@@ -0,0 +1,165 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This module contains the per-device interface metadata cache.  The interface
+name and description tables rarely change, so rather than walking them each
+collection cycle the cached tables are revalidated with a single GET request
+of sysUpTime and ifTableLastChange:
+
+    * sysUpTime decreased: the device rebooted, the ifIndex values may have
+      changed.
+
+    * ifTableLastChange changed: an interface was created or deleted.
+
+    * the cache entry is older than `max_age`: ifAlias edits do not change
+      ifTableLastChange, so the tables are re-walked periodically.
+
+If the device does not return sysUpTime, the reboot check is not possible and
+the cache is revalidated only by ifTableLastChange and `max_age`.
+
+The cache hit and miss counters are reported as self-metrics.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List
+import time
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+from netpaca import selfmetrics
+from netpaca.drivers import DriverBase
+
+from .walk import walk_columns, get_scalars
+from .interfaces import ODI_IF_NAME, OID_IF_DESC
+from .factories import as_str
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["get_if_metadata", "cached_sys_uptime", "invalidate"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+OID_SYS_UPTIME_0 = "1.3.6.1.2.1.1.3.0"
+OID_IF_TABLE_LASTCHANGE_0 = "1.3.6.1.2.1.31.1.5.0"
+
+DEFAULT_MAX_AGE = 3600  # seconds
+
+
+class IfCacheEntry(object):
+    """ the cached interface tables of a device and the revalidation values """
+
+    __slots__ = ("table", "sys_uptime", "table_last_change", "fetched")
+
+    def __init__(self, table, sys_uptime, table_last_change):
+        self.table = table
+        self.sys_uptime = sys_uptime
+        self.table_last_change = table_last_change
+        self.fetched = time.monotonic()
+
+
+class IfCacheStats(object):
+    """ the cache hit and miss counters of all devices """
+
+    hits = 0
+    misses = 0
+
+
+async def get_if_metadata(
+    device: DriverBase, max_age: Optional[int] = DEFAULT_MAX_AGE
+) -> dict:
+    """
+    Returns the interface metadata dictionary, from the cache if still valid,
+    otherwise walks the tables and updates the cache:
+        key: int
+            ifIndex
+        value: dict
+            name: str - interface name
+            alias: str - interface description
+
+    Parameters
+    ----------
+    device: DriverBase
+        The device instance
+
+    max_age: int, optional
+        The maximum age in seconds of the cached tables.  If None, the tables
+        are only re-walked on reboot or table change.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+    entry: Optional[IfCacheEntry] = dev_pysnmp.get("ifcache")
+
+    sys_uptime, table_last_change = await get_scalars(
+        device, [OID_SYS_UPTIME_0, OID_IF_TABLE_LASTCHANGE_0]
+    )
+    sys_uptime = None if sys_uptime is None else int(sys_uptime)
+    table_last_change = None if table_last_change is None else int(table_last_change)
+
+    if (
+        entry is not None
+        and (
+            sys_uptime is None
+            or entry.sys_uptime is None
+            or sys_uptime >= entry.sys_uptime
+        )
+        and table_last_change == entry.table_last_change
+        and (max_age is None or time.monotonic() - entry.fetched < max_age)
+    ):
+        IfCacheStats.hits += 1
+        entry.sys_uptime = sys_uptime
+        return entry.table
+
+    IfCacheStats.misses += 1
+    table = await walk_columns(
+        device,
+        columns={"name": ODI_IF_NAME, "alias": OID_IF_DESC},
+        converters={"name": as_str, "alias": as_str},
+    )
+    dev_pysnmp["ifcache"] = IfCacheEntry(table, sys_uptime, table_last_change)
+    return table
+
+
+def cached_sys_uptime(device: DriverBase) -> Optional[int]:
+    """
+    Returns the device sysUpTime (TimeTicks) obtained by the last call to
+    get_if_metadata, or None if not yet called or not returned by the device.
+    """
+    entry = device.private["pysnmp"].get("ifcache")
+    return entry.sys_uptime if entry else None
+
+
+def invalidate(device: DriverBase):
+    """ remove the cached interface tables of the device """
+    device.private["pysnmp"].pop("ifcache", None)
+
+
+@selfmetrics.register
+def ifcache_self_metrics() -> List[Metric]:
+    return [
+        Metric(name="netpaca_snmp_ifcache_hits", value=IfCacheStats.hits),
+        Metric(name="netpaca_snmp_ifcache_misses", value=IfCacheStats.misses),
+    ]
@@ -26,7 +26,14 @@ from netpaca.drivers import DriverBase
 # Private Imports
 # -----------------------------------------------------------------------------
 
-from .walk import walk_table
+from .walk import walk_table, walk_columns
+from .factories import (
+    as_str,
+    as_link_up,
+    make_index_factory,
+    factory_ifindex_int,
+    factory_ifindex_str,
+)
 
 # -----------------------------------------------------------------------------
 # Exports
@@ -37,6 +44,7 @@ __all__ = [
     "get_if_alias_table",
     "get_if_lastchange_table",
     "get_if_operstatus_table",
+    "get_if_table",
 ]
 # -----------------------------------------------------------------------------
 #
@@ -63,7 +71,7 @@ async def get_if_name_table(device: DriverBase) -> dict:
     device: DriverBase
         The device instance
     """
-    recs = await walk_table(device, oid=ODI_IF_NAME, factory=factory_ifindex_value)
+    recs = await walk_table(device, oid=ODI_IF_NAME, factory=factory_ifindex_str)
     return dict(recs)
 
 
@@ -80,7 +88,7 @@ async def get_if_alias_table(device: DriverBase) -> dict:
     device: DriverBase
         The device instance
     """
-    recs = await walk_table(device, oid=OID_IF_DESC, factory=factory_ifindex_value)
+    recs = await walk_table(device, oid=OID_IF_DESC, factory=factory_ifindex_str)
     return dict(recs)
 
 
@@ -98,16 +106,9 @@ async def get_if_operstatus_table(device: DriverBase) -> dict:
     device: DriverBase
         The device instance
     """
-
-    def factory(var_bind):
-        """ oid values: up(1), down(2) -> True, False """
-        var_name, var_value = var_bind
-        oid = var_name.getOid()
-        if_index = oid.asTuple()[-1]
-        link_up = "1" == var_value.prettyPrint()
-        return if_index, link_up
-
-    recs = await walk_table(device, oid=OID_IF_OPSTATUS, factory=factory)
+    recs = await walk_table(
+        device, oid=OID_IF_OPSTATUS, factory=make_index_factory(as_link_up)
+    )
     return dict(recs)
 
 
@@ -124,16 +125,42 @@ async def get_if_lastchange_table(device):
     device: DriverBase
         The device instance
     """
+    recs = await walk_table(device, oid=OID_IF_LASTUPDATE, factory=factory_ifindex_int)
+    return dict(recs)
 
-    def factory(var_bind):
-        """ oid values as TimeTicks int """
-        var_name, var_value = var_bind
-        oid = var_name.getOid()
-        if_index = oid.asTuple()[-1]
-        return if_index, int(var_value.prettyPrint())
 
-    recs = await walk_table(device, oid=OID_IF_LASTUPDATE, factory=factory)
-    return dict(recs)
+async def get_if_table(device: DriverBase) -> dict:
+    """
+    Fetches the interface name, description, oper-status and last-change
+    columns in a single multi-column walk, and returns dictionary:
+        key: int
+            ifIndex
+        value: dict
+            name: str - interface name
+            alias: str - interface description
+            oper_up: bool - True if link-up
+            last_change: int - last changed time as SNMP TimeTicks
+
+    Parameters
+    ----------
+    device: DriverBase
+        The device instance
+    """
+    return await walk_columns(
+        device,
+        columns={
+            "name": ODI_IF_NAME,
+            "alias": OID_IF_DESC,
+            "oper_up": OID_IF_OPSTATUS,
+            "last_change": OID_IF_LASTUPDATE,
+        },
+        converters={
+            "name": as_str,
+            "alias": as_str,
+            "oper_up": as_link_up,
+            "last_change": int,
+        },
+    )
 
 
 def factory_ifindex_value(var_bind):
@@ -0,0 +1,281 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the SNMPv3 User-based Security Model (USM) support.  The
+device engine-id is discovered once per device, see RFC 3414 section 4, and
+the passphrases are converted into the localized keys for the discovered
+engine-id.  The pysnmp UsmUserData is then created with the localized keys
+and the engine-id, so that pysnmp neither repeats the engine discovery nor
+the key localization per request.
+
+The engine boots and time of the discovery response are kept for information
+only; pysnmp synchronizes the timeliness values used by the authenticated
+requests itself, from the authenticated responses and reports.
+
+The passphrase to key conversion, RFC 3414 section 2.6, hashes one megabyte
+of data; the master and the localized keys are cached so that the conversion
+is done once per passphrase, and once per device engine-id respectively.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, NamedTuple
+from functools import lru_cache
+import asyncio
+import random
+import time
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pysnmp.hlapi.asyncio import (
+    UsmUserData,
+    OctetString,
+    usmHMACMD5AuthProtocol,
+    usmHMACSHAAuthProtocol,
+    usmHMAC128SHA224AuthProtocol,
+    usmHMAC192SHA256AuthProtocol,
+    usmHMAC256SHA384AuthProtocol,
+    usmHMAC384SHA512AuthProtocol,
+    usmDESPrivProtocol,
+    usm3DESEDEPrivProtocol,
+    usmAesCfb128Protocol,
+    usmAesCfb192Protocol,
+    usmAesCfb256Protocol,
+)
+from pysnmp.hlapi.auth import usmKeyTypeLocalized
+from pysnmp.proto.secmod.rfc3414.service import SnmpUSMSecurityModel
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers import DriverBase
+from netpaca.aiosnmp.config import SnmpV3ConfigModel, SNMP_V2_PORT
+from netpaca.aiosnmp.codec import CodecError, encode_v3_discovery, decode_v3_engine
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = [
+    "EngineInfo",
+    "discover_engine",
+    "localize_auth_key",
+    "localize_priv_key",
+    "get_usm_user_data",
+]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+AUTH_PROTOCOLS = {
+    "md5": usmHMACMD5AuthProtocol,
+    "sha": usmHMACSHAAuthProtocol,
+    "sha224": usmHMAC128SHA224AuthProtocol,
+    "sha256": usmHMAC192SHA256AuthProtocol,
+    "sha384": usmHMAC256SHA384AuthProtocol,
+    "sha512": usmHMAC384SHA512AuthProtocol,
+}
+
+PRIV_PROTOCOLS = {
+    "des": usmDESPrivProtocol,
+    "3des": usm3DESEDEPrivProtocol,
+    "aes128": usmAesCfb128Protocol,
+    "aes192": usmAesCfb192Protocol,
+    "aes256": usmAesCfb256Protocol,
+}
+
+
+class EngineInfo(NamedTuple):
+    """
+    the discovered device SNMP engine; the boots and time are the values at
+    discovery, they are not used for the requests.
+    """
+
+    engine_id: bytes
+    boots: int
+    time: int
+    discovered: float  # time.monotonic() value
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, msg_id: int, future: asyncio.Future):
+        self.msg_id = msg_id
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        try:
+            msg_id, *engine = decode_v3_engine(data)
+        except CodecError:
+            return
+
+        if msg_id == self.msg_id and engine[0] and not self.future.done():
+            self.future.set_result(EngineInfo(*engine, time.monotonic()))
+
+    def error_received(self, exc):
+        pass
+
+
+async def discover_engine(device: DriverBase) -> EngineInfo:
+    """
+    Discover the device SNMP engine-id, boots and time using the RFC 3414
+    discovery request.  The request is retransmitted using the device pysnmp
+    "timeout" and "retries" options.
+
+    Raises
+    ------
+    RuntimeError
+        When the device does not respond to the discovery request.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+    loop = asyncio.get_running_loop()
+
+    msg_id = random.randrange(1, 0x7FFFFFFF)
+    future = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _DiscoveryProtocol(msg_id, future),
+        remote_addr=(device.device_host, dev_pysnmp.get("port", SNMP_V2_PORT)),
+    )
+
+    data = encode_v3_discovery(msg_id)
+
+    try:
+        for _ in range(dev_pysnmp.get("retries", 5) + 1):
+            transport.sendto(data)
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(future), dev_pysnmp.get("timeout", 1)
+                )
+            except asyncio.TimeoutError:
+                continue
+
+    finally:
+        transport.close()
+
+    emsg = f"{device.name}: SNMPv3 engine discovery timeout"
+    device.log.error(emsg)
+    raise RuntimeError(emsg, "requestTimedOut")
+
+
+@lru_cache(maxsize=None)
+def _master_auth_key(auth_protocol: str, passphrase: str) -> bytes:
+    auth_service = SnmpUSMSecurityModel.authServices[AUTH_PROTOCOLS[auth_protocol]]
+    return bytes(auth_service.hashPassphrase(passphrase))
+
+
+@lru_cache(maxsize=None)
+def _master_priv_key(auth_protocol: str, priv_protocol: str, passphrase: str) -> bytes:
+    priv_service = SnmpUSMSecurityModel.privServices[PRIV_PROTOCOLS[priv_protocol]]
+    return bytes(priv_service.hashPassphrase(AUTH_PROTOCOLS[auth_protocol], passphrase))
+
+
+@lru_cache(maxsize=4096)
+def localize_auth_key(auth_protocol: str, passphrase: str, engine_id: bytes) -> bytes:
+    """ returns the auth key localized for the engine-id, see RFC 3414 2.6 """
+    auth_service = SnmpUSMSecurityModel.authServices[AUTH_PROTOCOLS[auth_protocol]]
+    master_key = _master_auth_key(auth_protocol, passphrase)
+    return bytes(auth_service.localizeKey(master_key, OctetString(engine_id)))
+
+
+@lru_cache(maxsize=4096)
+def localize_priv_key(
+    auth_protocol: str, priv_protocol: str, passphrase: str, engine_id: bytes
+) -> bytes:
+    """
+    returns the priv key localized for the engine-id; the auth protocol hash
+    is used, and the key is extended as needed by the priv protocol.
+    """
+    priv_service = SnmpUSMSecurityModel.privServices[PRIV_PROTOCOLS[priv_protocol]]
+    master_key = _master_priv_key(auth_protocol, priv_protocol, passphrase)
+    return bytes(
+        priv_service.localizeKey(
+            AUTH_PROTOCOLS[auth_protocol], master_key, OctetString(engine_id)
+        )
+    )
+
+
+async def get_usm_user_data(device: DriverBase) -> UsmUserData:
+    """
+    Returns the pysnmp UsmUserData of the device, with the keys localized for
+    the device engine-id.  The engine is discovered on first use, and the
+    UsmUserData is then cached in the device pysnmp private data until
+    invalidated, see invalidate_usm_user_data().  The concurrent first uses
+    of a device wait for a single discovery.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+
+    if (user_data := dev_pysnmp.get("usm_user_data")) is not None:
+        return user_data
+
+    if (lock := dev_pysnmp.get("usm_lock")) is None:
+        lock = dev_pysnmp["usm_lock"] = asyncio.Lock()
+
+    async with lock:
+        if (user_data := dev_pysnmp.get("usm_user_data")) is not None:
+            return user_data
+
+        return await _make_usm_user_data(device)
+
+
+async def _make_usm_user_data(device: DriverBase) -> UsmUserData:
+    dev_pysnmp = device.private["pysnmp"]
+    v3: SnmpV3ConfigModel = dev_pysnmp["v3"]
+    engine: Optional[EngineInfo] = dev_pysnmp.get("v3_engine")
+
+    if engine is None:
+        engine = dev_pysnmp["v3_engine"] = await discover_engine(device)
+
+    kwargs = dict(securityEngineId=OctetString(engine.engine_id))
+
+    if v3.auth_key:
+        auth_key = v3.auth_key.get_secret_value()
+        kwargs.update(
+            authProtocol=AUTH_PROTOCOLS[v3.auth_protocol],
+            authKeyType=usmKeyTypeLocalized,
+            authKey=localize_auth_key(v3.auth_protocol, auth_key, engine.engine_id),
+        )
+
+        if v3.priv_key:
+            kwargs.update(
+                privProtocol=PRIV_PROTOCOLS[v3.priv_protocol],
+                privKeyType=usmKeyTypeLocalized,
+                privKey=localize_priv_key(
+                    v3.auth_protocol,
+                    v3.priv_protocol,
+                    v3.priv_key.get_secret_value(),
+                    engine.engine_id,
+                ),
+            )
+
+    user_data = dev_pysnmp["usm_user_data"] = UsmUserData(v3.user, **kwargs)
+    return user_data
+
+
+def invalidate_usm_user_data(device: DriverBase):
+    """
+    Discard the device engine and UsmUserData, so that the engine is
+    discovered again on the next request; for example when the device was
+    replaced and the engine-id changed.
+    """
+    device.private["pysnmp"].pop("v3_engine", None)
+    device.private["pysnmp"].pop("usm_user_data", None)
@@ -16,12 +16,16 @@
 """
 This file contains asyncio SNMPv2 functions that can be used by DeviceBase
 instance.
+
+When the device pysnmp private "fastpath" option is set, the functions
+delegate to the same named functions in client.py, which bypass the pysnmp
+hlapi; see the SNMP configuration `fastpath` option.
 """
 # -----------------------------------------------------------------------------
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional, Callable, List, Any
+from typing import Optional, Callable, List, Any, Mapping, Dict
 
 # -----------------------------------------------------------------------------
 # Public Imports
@@ -32,16 +36,31 @@ from netpaca.drivers import DriverBase
 from pysnmp.hlapi.asyncio import (
     ObjectType,
     ObjectIdentity,
+    getCmd,
     nextCmd,
-    UdpTransportTarget,
+    bulkCmd,
     ContextData,
 )
+from pysnmp.proto.rfc1905 import EndOfMibView, NoSuchObject, NoSuchInstance
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.aiosnmp.config import SNMP_V2_PORT  # noqa: F401
+from netpaca.aiosnmp.engine import (
+    get_snmp_engine,
+    get_transport_target,
+    get_auth_data,
+    auth_failed,
+)
+from netpaca.aiosnmp import client
 
 # -----------------------------------------------------------------------------
 # Exports
 # -----------------------------------------------------------------------------
 
-__all__ = ["walk_table"]
+__all__ = ["walk_table", "bulk_walk_table", "walk_columns", "get_scalars"]
 
 # -----------------------------------------------------------------------------
 #
@@ -50,7 +69,7 @@ __all__ = ["walk_table"]
 # -----------------------------------------------------------------------------
 
 
-SNMP_V2_PORT = 161
+DEFAULT_MAX_REPETITIONS = 25
 
 
 async def walk_table(
@@ -75,13 +94,15 @@ async def walk_table(
         is not provided, then the default factory behavior is to extract the
         var_bind data only (via the .prettyPrint method).
     """
-    target = device.device_host
-
     # obtain the pySnmp required objects from the device private dictionary.
 
     dev_pysnmp = device.private["pysnmp"]
-    snmp_engine = dev_pysnmp["engine"]
-    snmp_community = dev_pysnmp["community"]
+    if dev_pysnmp.get("fastpath"):
+        return await client.walk_table(device, oid, factory=factory)
+
+    snmp_engine = dev_pysnmp.get("engine") or get_snmp_engine()
+    snmp_community = await get_auth_data(device)
+    transport = get_transport_target(device)
 
     initial_var_binds = var_binds = [ObjectType(ObjectIdentity(oid))]
     collected = list()
@@ -99,7 +120,7 @@ async def walk_table(
         (err_indications, err_st, err_idx, var_bind_table) = await nextCmd(
             snmp_engine,
             snmp_community,
-            UdpTransportTarget((target, SNMP_V2_PORT)),
+            transport,
             ContextData(),
             *var_binds,
         )
@@ -109,6 +130,7 @@ async def walk_table(
             # processing the walk
             emsg = f"{device.name}: SNMP failed on OID: {oid}"
             device.log.error(emsg)
+            auth_failed(device, err_indications)
             raise RuntimeError(emsg, err_indications)
 
         elif err_st:
@@ -129,3 +151,343 @@ async def walk_table(
 
         # setup to fetch the next item in table
         var_binds = var_bind_table[-1]
+
+
+async def bulk_walk_table(
+    device: DriverBase,
+    oid,
+    factory: Optional[Callable] = None,
+    max_repetitions: Optional[int] = None,
+) -> List[Any]:
+    """
+    This coroutine implements an SNMP "walk" of a given table starting at
+    `oid` using GETBULK requests, so that up to `max_repetitions` rows are
+    retrieved per request/response round trip rather than one row as with
+    walk_table.  The rows beyond the end of the table that are returned in
+    the last response are discarded.
+
+    If the agent misbehaves, that is returns an error status, an empty
+    response, or OIDs that do not increase, then the walk is retried using
+    walk_table (GETNEXT) and the device is marked to use GETNEXT for all
+    subsequent bulk walks.  SNMPv1 devices always use GETNEXT.
+
+    Parameters
+    ----------
+    device: DriverBase
+        The device instance
+
+    oid: str
+        The SNMP table OID string value, for example "1.3.6.1.2.1.31.1.1.1.18"
+
+    factory: Callable
+        See walk_table.
+
+    max_repetitions: int
+        The GETBULK max-repetitions value.  If not provided, then the value
+        from the device private pysnmp "max_repetitions" is used, or the
+        DEFAULT_MAX_REPETITIONS value.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+    if dev_pysnmp.get("fastpath"):
+        return await client.bulk_walk_table(
+            device, oid, factory=factory, max_repetitions=max_repetitions
+        )
+
+    snmp_engine = dev_pysnmp.get("engine") or get_snmp_engine()
+    snmp_community = await get_auth_data(device)
+
+    # SNMPv1 does not support GETBULK, and a device that has misbehaved
+    # before is walked using GETNEXT.
+
+    if (
+        getattr(snmp_community, "mpModel", 1) == 0
+        or dev_pysnmp.get("bulk", True) is False
+    ):
+        return await walk_table(device, oid, factory=factory)
+
+    max_repetitions = (
+        max_repetitions
+        or dev_pysnmp.get("max_repetitions")
+        or DEFAULT_MAX_REPETITIONS
+    )
+
+    if not factory:
+
+        def factory(_vb):
+            """ default row factory to return value only """
+            return _vb[1].prettyPrint()
+
+    root = ObjectIdentity(oid)
+    var_binds = [ObjectType(root)]
+    transport = get_transport_target(device)
+    collected = list()
+    last_oid = None
+
+    def fallback(reason):
+        device.log.warning(
+            f"{device.name}: SNMP GETBULK failed on OID: {oid}: {reason}, "
+            "using GETNEXT"
+        )
+        dev_pysnmp["bulk"] = False
+        return walk_table(device, oid, factory=factory)
+
+    while True:
+        (err_indications, err_st, err_idx, var_bind_table) = await bulkCmd(
+            snmp_engine,
+            snmp_community,
+            transport,
+            ContextData(),
+            0,
+            max_repetitions,
+            *var_binds,
+        )
+
+        if err_indications:
+            emsg = f"{device.name}: SNMP failed on OID: {oid}"
+            device.log.error(emsg)
+            auth_failed(device, err_indications)
+            raise RuntimeError(emsg, err_indications)
+
+        if err_st:
+            return await fallback(err_st.prettyPrint())
+
+        if not var_bind_table:
+            return await fallback("empty response")
+
+        for var_bind_row in var_bind_table:
+            var_name, var_value = var_bind_row[0]
+            var_oid = var_name.getOid()
+
+            # end-of-table: the first row beyond the table, or the end of the
+            # agent MIB, completes the walk.
+
+            if isinstance(var_value, EndOfMibView) or not root.isPrefixOf(var_name):
+                return collected
+
+            if last_oid is not None and var_oid <= last_oid:
+                return await fallback("OID not increasing")
+
+            last_oid = var_oid
+            collected.append(factory((var_name, var_value)))
+
+        # setup to fetch the next rows in the table
+
+        var_binds = var_bind_table[-1]
+
+
+def _column_index(oid: tuple, root_len: int):
+    """ returns the table row index from the column OID, int if single-valued """
+    index = oid[root_len:]
+    return index[0] if len(index) == 1 else index
+
+
+async def walk_columns(
+    device: DriverBase,
+    columns: Mapping[str, str],
+    converters: Optional[Mapping[str, Callable]] = None,
+    max_repetitions: Optional[int] = None,
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    This coroutine walks several columns of the same table together, using
+    one GETBULK variable binding per column in each request, and returns the
+    joined rows keyed by the table index.  Each column is walked until its
+    end, so that sparse columns are supported; a row only contains the
+    columns for which the agent has a value.
+
+    The walk falls back to GETNEXT in the same cases as bulk_walk_table, in
+    which case each column is walked using walk_table and then joined.
+
+    Parameters
+    ----------
+    device: DriverBase
+        The device instance
+
+    columns: dict
+        key: str - the column name used in the returned rows
+        value: str - the column OID, for example "1.3.6.1.2.1.31.1.1.1.18"
+
+    converters: dict, optional
+        key: str - the column name
+        value: Callable - called with the var_bind value to return the row
+        column value.  If not provided for a column, then the value is
+        obtained via the .prettyPrint method.
+
+    max_repetitions: int, optional
+        The GETBULK max-repetitions value, that is rows per request.  If not
+        provided, then the bulk_walk_table value is divided by the number of
+        columns so that the response size remains the same.
+
+    Returns
+    -------
+    dict
+        key: int, or tuple of int for multi-valued table indexes
+        value: dict of column name to column value
+
+    Examples
+    --------
+        rows = await walk_columns(
+            device,
+            columns={"name": OID_IF_NAME, "alias": OID_IF_ALIAS},
+        )
+        rows[1] -> {"name": "Ethernet1/1", "alias": "to server1"}
+    """
+    dev_pysnmp = device.private["pysnmp"]
+    if dev_pysnmp.get("fastpath"):
+        return await client.walk_columns(
+            device, columns, converters=converters, max_repetitions=max_repetitions
+        )
+
+    snmp_engine = dev_pysnmp.get("engine") or get_snmp_engine()
+    snmp_community = await get_auth_data(device)
+
+    converters = converters or {}
+    convert = {
+        name: converters.get(name) or (lambda _val: _val.prettyPrint())
+        for name in columns
+    }
+    roots = {
+        name: tuple(int(part) for part in oid.strip(".").split("."))
+        for name, oid in columns.items()
+    }
+    rows: Dict[Any, Dict[str, Any]] = dict()
+
+    async def fallback(reason=None):
+        if reason:
+            device.log.warning(
+                f"{device.name}: SNMP GETBULK failed on columns: "
+                f"{list(columns)}: {reason}, using GETNEXT"
+            )
+            dev_pysnmp["bulk"] = False
+
+        rows.clear()
+        for name, oid in columns.items():
+            root_len = len(roots[name])
+
+            def factory(var_bind, _name=name, _root_len=root_len):
+                var_name, var_value = var_bind
+                index = _column_index(tuple(var_name.getOid()), _root_len)
+                return index, convert[_name](var_value)
+
+            for index, value in await walk_table(device, oid, factory=factory):
+                rows.setdefault(index, {})[name] = value
+
+        return rows
+
+    if (
+        getattr(snmp_community, "mpModel", 1) == 0
+        or dev_pysnmp.get("bulk", True) is False
+    ):
+        return await fallback()
+
+    max_repetitions = max_repetitions or max(
+        1,
+        (dev_pysnmp.get("max_repetitions") or DEFAULT_MAX_REPETITIONS)
+        // len(columns),
+    )
+
+    transport = get_transport_target(device)
+    active = list(columns)
+    var_binds = [ObjectType(ObjectIdentity(columns[name])) for name in active]
+    last_oid = dict.fromkeys(active, ())
+
+    while active:
+        (err_indications, err_st, err_idx, var_bind_table) = await bulkCmd(
+            snmp_engine,
+            snmp_community,
+            transport,
+            ContextData(),
+            0,
+            max_repetitions,
+            *var_binds,
+        )
+
+        if err_indications:
+            emsg = f"{device.name}: SNMP failed on columns: {list(columns)}"
+            device.log.error(emsg)
+            auth_failed(device, err_indications)
+            raise RuntimeError(emsg, err_indications)
+
+        if err_st:
+            return await fallback(err_st.prettyPrint())
+
+        if not var_bind_table:
+            return await fallback("empty response")
+
+        # each response row contains one var_bind per active column, in the
+        # same order as the request.
+
+        done = set()
+        for var_bind_row in var_bind_table:
+            for name, (var_name, var_value) in zip(active, var_bind_row):
+                if name in done:
+                    continue
+
+                var_oid = tuple(var_name.getOid())
+                root = roots[name]
+
+                if (
+                    isinstance(var_value, EndOfMibView)
+                    or var_oid[: len(root)] != root
+                ):
+                    done.add(name)
+                    continue
+
+                if var_oid <= last_oid[name]:
+                    return await fallback("OID not increasing")
+
+                last_oid[name] = var_oid
+                index = _column_index(var_oid, len(root))
+                rows.setdefault(index, {})[name] = convert[name](var_value)
+
+        # setup to fetch the next rows for the columns that have not ended
+
+        var_binds = [
+            var_bind
+            for name, var_bind in zip(active, var_bind_table[-1])
+            if name not in done
+        ]
+        active = [name for name in active if name not in done]
+
+    return rows
+
+
+async def get_scalars(device: DriverBase, oids: List[str]) -> List[Any]:
+    """
+    This coroutine fetches the values of the given scalar OIDs, for example
+    "1.3.6.1.2.1.1.3.0", using a single GET request.
+
+    Parameters
+    ----------
+    device: DriverBase
+        The device instance
+
+    oids: list of str
+        The scalar instance OIDs
+
+    Returns
+    -------
+    The list of pysnmp values in the same order as `oids`; the value is None
+    if the device does not provide the OID.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+    if dev_pysnmp.get("fastpath"):
+        return await client.get_scalars(device, oids)
+
+    (err_indications, err_st, err_idx, var_binds) = await getCmd(
+        dev_pysnmp.get("engine") or get_snmp_engine(),
+        await get_auth_data(device),
+        get_transport_target(device),
+        ContextData(),
+        *(ObjectType(ObjectIdentity(oid)) for oid in oids),
+    )
+
+    if err_indications or err_st:
+        emsg = f"{device.name}: SNMP failed on OIDs: {oids}"
+        device.log.error(emsg)
+        auth_failed(device, err_indications)
+        raise RuntimeError(emsg, err_indications or err_st.prettyPrint())
+
+    return [
+        None if isinstance(var_value, (NoSuchObject, NoSuchInstance)) else var_value
+        for _, var_value in var_binds
+    ]
@@ -0,0 +1,147 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the MetricBatch, a columnar collection of metrics that
+share a single timestamp.  A collector can return a MetricBatch in place of a
+list of Metric; the exporters serialize a MetricBatch by looping over the
+columns rather than over individual metric objects.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Mapping, List, Iterator, Iterable, Tuple
+from array import array
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import LiteMetric, metric_timestamp
+from netpaca.tags import TagSet
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["MetricBatch"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class MetricBatch(object):
+    """
+    A MetricBatch stores metrics as columns:
+
+        names: list of str
+            The metric name of each metric
+        values: array of float
+            The numeric value of each metric
+        tag_index: array of int
+            The index into `tag_sets` for the tags of each metric
+
+    along with the `tag_sets` list of distinct TagSet used by the metrics,
+    and the `ts` timestamp shared by all metrics.  Only numeric values are
+    supported.
+
+    Examples
+    --------
+        batch = MetricBatch(ts=timestamp)
+        for if_name, if_dom in ifs_dom.items():
+            tags_idx = batch.add_tags({"if_name": if_name})
+            batch.add("ifdom_rxpower", if_dom["rxpower"], tags_idx=tags_idx)
+            batch.add("ifdom_txpower", if_dom["txpower"], tags_idx=tags_idx)
+
+        return batch
+    """
+
+    __slots__ = ("ts", "names", "values", "tag_sets", "tag_index", "_tags_lookup")
+
+    def __init__(self, ts: Optional[int] = None):
+        self.ts = ts or metric_timestamp()
+        self.names: List[str] = list()
+        self.values = array("d")
+        self.tag_sets: List[TagSet] = list()
+        self.tag_index = array("L")
+        self._tags_lookup = dict()
+
+    def add_tags(self, tags: Mapping) -> int:
+        """
+        Add the tag-set to the batch, if not already present, and return the
+        tag-set index used when adding metrics.
+        """
+        tags = TagSet.intern(tags)
+        if (idx := self._tags_lookup.get(tags)) is None:
+            idx = self._tags_lookup[tags] = len(self.tag_sets)
+            self.tag_sets.append(tags)
+
+        return idx
+
+    def add(
+        self,
+        name: str,
+        value: float,
+        tags: Optional[Mapping] = None,
+        tags_idx: Optional[int] = None,
+    ):
+        """
+        Add a metric to the batch.  The metric tags are provided either as the
+        `tags` mapping, or as the `tags_idx` value returned from add_tags().
+        """
+        if tags_idx is None:
+            tags_idx = self.add_tags(tags or {})
+
+        self.names.append(name)
+        self.values.append(value)
+        self.tag_index.append(tags_idx)
+
+    def extend(self, name: str, values: Iterable[float], tags_idx: Iterable[int]):
+        """
+        Add a metric named `name` for each of the values, with the tags of the
+        corresponding `tags_idx` value returned from add_tags().
+        """
+        values = array("d", values)
+        self.names.extend([name] * len(values))
+        self.values.extend(values)
+        self.tag_index.extend(tags_idx)
+
+    def rows(self) -> Iterator[Tuple[str, float, int]]:
+        """ returns an iterator of (name, value, tags_idx) for each metric """
+        return zip(self.names, self.values, self.tag_index)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[LiteMetric]:
+        """
+        Iterating a MetricBatch produces a LiteMetric per metric, so that code
+        written for a list of Metric can also process a MetricBatch.
+        """
+        ts, tag_sets = self.ts, self.tag_sets
+        for name, value, tags_idx in self.rows():
+            yield LiteMetric(name=name, value=value, ts=ts, tags=tag_sets[tags_idx])
+
+    def __getstate__(self):
+        return (self.ts, self.names, self.values, self.tag_sets, self.tag_index)
+
+    def __setstate__(self, state):
+        self.ts, self.names, self.values, self.tag_sets, self.tag_index = state
+        self._tags_lookup = {tags: idx for idx, tags in enumerate(self.tag_sets)}
@@ -14,13 +14,17 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
+from typing import List
 import asyncio
 import functools
+import socket
 
 from first import first
 
-from netpaca import timestamp_now
+from netpaca import timestamp_now, cycle_timestamp
 from netpaca import log
+from netpaca import selfmetrics
+from netpaca.drivers import DriverBase
 from netpaca.exporters import ExporterBase
 
 from netpaca.config_model import ConfigModel
@@ -30,10 +34,16 @@ from netpaca.config_model import CollectorModel
 class CollectorExecutor(object):
     def __init__(self, config):
         self.config: ConfigModel = config
-        exporter_name = first(self.config.defaults.exporters) or first(
-            self.config.exporters.keys()
-        )
-        self.exporter: ExporterBase = self.config.exporters[exporter_name]
+
+        # all of the exporters listed in the defaults are active; if none are
+        # listed then the first configured exporter is used.
+
+        exporter_names = self.config.defaults.exporters or [
+            first(self.config.exporters.keys())
+        ]
+        self.exporters: List[ExporterBase] = [
+            self.config.exporters[e_name] for e_name in exporter_names
+        ]
         self.log = log.get_logger()
 
     def start(self, spec: CollectorModel, coro, device, interval=None, **kwargs):
@@ -42,6 +52,70 @@ class CollectorExecutor(object):
         task = ic(device, **kwargs)
         asyncio.create_task(task)
 
+    async def export_self_metrics(self, interval=None):
+        """
+        This coroutine periodically collects the netpaca self-metrics, see
+        netpaca.selfmetrics, and exports them using the local hostname as the
+        device.
+        """
+        interval = interval or self.config.defaults.interval
+        device = DriverBase(name=socket.gethostname())
+        device.tags = {"host": device.name}
+
+        while True:
+            await asyncio.sleep(interval)
+            if metrics := selfmetrics.collect():
+                self.export(device, metrics)
+
+    async def close_exporters(self):
+        """
+        Close all of the configured exporters, for example to write the
+        buffered metrics, when netpaca stops.  The exporter pipeline stages are
+        closed first, so that the metrics held by the stages are exported.
+        """
+
+        async def close_exporter(exporter):
+            await self.close_stages(exporter)
+            await exporter.close()
+
+        results = await asyncio.gather(
+            *(close_exporter(exporter) for exporter in self.config.exporters.values()),
+            return_exceptions=True,
+        )
+        for exporter, result in zip(self.config.exporters.values(), results):
+            if isinstance(result, Exception):
+                self.log.error(f"exporter {exporter.name}: close failed: {result}")
+
+    @staticmethod
+    async def close_stages(exporter: ExporterBase):
+        """
+        Close the exporter pipeline stages, in order, and pass the metrics
+        returned by each stage through the following stages to the exporter.
+        """
+        for pos, stage in enumerate(exporter.stages):
+            for device, metrics in stage.close():
+                for next_stage in exporter.stages[pos + 1 :]:
+                    if not (metrics := next_stage.process(device, metrics)):
+                        break
+                else:
+                    await exporter.export_metrics(device=device, metrics=metrics)
+
+    def export(self, device, metrics):
+        """
+        For each active exporter, pass the metrics through the exporter
+        pipeline stages, if any, and then create a task to export the
+        resulting metrics.
+        """
+        for exporter in self.exporters:
+            e_metrics = metrics
+            for stage in exporter.stages:
+                if not (e_metrics := stage.process(device, e_metrics)):
+                    break
+            else:
+                asyncio.create_task(
+                    exporter.export_metrics(device=device, metrics=e_metrics)
+                )
+
     def interval_executor(self, spec, interval):
         """
         This decorator should be used on all interval based collector coroutines
@@ -56,7 +130,20 @@ class CollectorExecutor(object):
             async def my_collector(device, interval, **kwargs):
                 # does the actual work of the collector
 
+        The collector coroutine returns either a list of Metric or a
+        MetricBatch.
+
+        The collector coroutine is called with the `timestamp` of the cycle,
+        which is also the default timestamp of the metrics created during the
+        cycle.  When the `align_timestamps` default is enabled, the timestamp
+        is snapped to the interval grid.  The cycles are not scheduled on the
+        grid, so that the devices are not all collected at the same instant;
+        since the sleep and the wall clock can disagree, the aligned timestamp
+        is at least one interval after the previous cycle of the device.
         """
+        align = self.config.defaults.align_timestamps
+        interval_ms = interval * 1000
+        last_ts = dict()
 
         def decorate(coro):
             @functools.wraps(coro)
@@ -73,7 +160,17 @@ class CollectorExecutor(object):
 
                 try:
                     ts_start = timestamp_now()
-                    metrics = await coro(device=device, timestamp=ts_start, **kwargs)
+                    ts_cycle = ts_start
+                    if align:
+                        ts_cycle -= ts_cycle % interval_ms
+                        if (last := last_ts.get(device.name)) is not None:
+                            ts_cycle = max(ts_cycle, last + interval_ms)
+                        last_ts[device.name] = ts_cycle
+
+                    with cycle_timestamp(ts_cycle):
+                        metrics = await coro(
+                            device=device, timestamp=ts_cycle, **kwargs
+                        )
                     count = len(metrics) if metrics else 0
                     ts_end = timestamp_now()
                     self.log.debug(
@@ -95,15 +192,15 @@ class CollectorExecutor(object):
                     return
 
                 if metrics:
-                    asyncio.create_task(
-                        self.exporter.export_metrics(device=device, metrics=metrics)
-                    )
-                elif hasattr(spec.collector, "metrics"):
+                    self.export(device, metrics)
+                elif metrics is None and hasattr(spec.collector, "metrics"):
                     # if the collector is defined to have metrics (not all do),
                     # but no metrics where produced, log a warning.  This
                     # condition may or may not be an actual issue given that
                     # some collectors might not have anything to emit during
-                    # that cycle.
+                    # that cycle.  A collector that returns an empty list has
+                    # nothing to emit by design, for example the first cycle
+                    # of a rate collector.
                     self.log.warning(f"{log_ident} 0 metrics")
 
                 # sleep for an interval of time and then create a new task to
@@ -0,0 +1,322 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the SNMP interface counters collector.  Each cycle the
+high-capacity octet counters, and the error and discard counters, are walked
+in a single multi-column walk, and the per-second rates since the previous
+cycle are emitted as a MetricBatch.
+
+The rates are computed using the device sysUpTime as the time base.  Counter
+wraps are handled using the counter width, 64-bit for the HC octet counters
+and 32-bit for the error and discard counters.  If the device rebooted, that
+is sysUpTime decreased, then all of the counters are re-baselined and no
+rates are emitted for that cycle.  An interface that is new, or whose ifIndex
+is now used by a different interface name, is re-baselined on its own; the
+rates of the other interfaces are still emitted.
+
+Example configuration
+---------------------
+    [collectors.ifcounters]
+        use = "netpaca.collectors:ifcounters"
+        # config.include_errors = false
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, Dict, List, Union
+from array import array
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pydantic import dataclasses, Field, PositiveInt
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, MetricBatch
+from netpaca.collectors import CollectorType, CollectorConfigModel
+from netpaca.collectors.executor import CollectorExecutor
+from netpaca.config_model import CollectorModel
+from netpaca.drivers import DriverBase
+from netpaca.aiosnmp.engine import snmp_prepare
+from netpaca.aiosnmp.walk import walk_columns
+from netpaca.aiosnmp.factories import IndexedColumn
+from netpaca.aiosnmp import ifcache
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["IFCountersCollector", "IFCountersCollectorConfig"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class IFCountersCollectorConfig(CollectorConfigModel):
+    include_errors: Optional[bool] = True
+    include_discards: Optional[bool] = True
+    max_repetitions: Optional[PositiveInt]
+
+
+@dataclasses.dataclass
+class IFInBitsRateMetric(Metric):
+    value: float = Field(..., description="interface receive rate as bits/sec")
+    name: str = "ifcounters_in_bps"
+
+
+@dataclasses.dataclass
+class IFOutBitsRateMetric(Metric):
+    value: float = Field(..., description="interface transmit rate as bits/sec")
+    name: str = "ifcounters_out_bps"
+
+
+@dataclasses.dataclass
+class IFInErrorsRateMetric(Metric):
+    value: float = Field(..., description="interface receive errors/sec")
+    name: str = "ifcounters_in_errors"
+
+
+@dataclasses.dataclass
+class IFOutErrorsRateMetric(Metric):
+    value: float = Field(..., description="interface transmit errors/sec")
+    name: str = "ifcounters_out_errors"
+
+
+@dataclasses.dataclass
+class IFInDiscardsRateMetric(Metric):
+    value: float = Field(..., description="interface receive discards/sec")
+    name: str = "ifcounters_in_discards"
+
+
+@dataclasses.dataclass
+class IFOutDiscardsRateMetric(Metric):
+    value: float = Field(..., description="interface transmit discards/sec")
+    name: str = "ifcounters_out_discards"
+
+
+class IFCountersCollector(CollectorType):
+    """
+    This class defines the SNMP interface counters collector.  The collector
+    is registered for all device drivers, using the device SNMP options from
+    the configuration defaults.
+    """
+
+    name = "ifcounters"
+    description = """
+Used to collect SNMP interface traffic, error, and discard rates
+"""
+    config = IFCountersCollectorConfig
+    metrics = [
+        IFInBitsRateMetric,
+        IFOutBitsRateMetric,
+        IFInErrorsRateMetric,
+        IFOutErrorsRateMetric,
+        IFInDiscardsRateMetric,
+        IFOutDiscardsRateMetric,
+    ]
+
+
+# the counter columns are: (column name, OID, counter modulus, scale, metric)
+# where scale converts the counter units to the metric units.
+
+_COUNTER_COLUMNS = (
+    ("in_octets", "1.3.6.1.2.1.31.1.1.1.6", 2 ** 64, 8, IFInBitsRateMetric),
+    ("out_octets", "1.3.6.1.2.1.31.1.1.1.10", 2 ** 64, 8, IFOutBitsRateMetric),
+    ("in_errors", "1.3.6.1.2.1.2.2.1.14", 2 ** 32, 1, IFInErrorsRateMetric),
+    ("out_errors", "1.3.6.1.2.1.2.2.1.20", 2 ** 32, 1, IFOutErrorsRateMetric),
+    ("in_discards", "1.3.6.1.2.1.2.2.1.13", 2 ** 32, 1, IFInDiscardsRateMetric),
+    ("out_discards", "1.3.6.1.2.1.2.2.1.19", 2 ** 32, 1, IFOutDiscardsRateMetric),
+)
+
+
+def _metric_name(metric_cls) -> str:
+    return metric_cls.__dataclass_fields__["name"].default
+
+
+class IFCountersState(object):
+    """
+    The previous cycle counter values of a device.  The counters are stored
+    as one IndexedColumn per column, all with the same indexes, along with
+    the interface name of each index.
+    """
+
+    __slots__ = ("sys_uptime", "counters", "if_names")
+
+    def __init__(
+        self, sys_uptime: int, counters: Dict[str, IndexedColumn], if_names: List[str]
+    ):
+        self.sys_uptime = sys_uptime
+        self.counters = counters
+        self.if_names = if_names
+
+    @property
+    def if_indexes(self) -> array:
+        return next(iter(self.counters.values())).indexes
+
+
+@IFCountersCollector.start.register
+async def start(
+    device: DriverBase, executor: CollectorExecutor, spec: CollectorModel
+):
+    if "pysnmp" not in device.private:
+        snmp_prepare(device, executor.config.defaults.snmp)
+
+    config: IFCountersCollectorConfig = spec.config
+    columns = [
+        col
+        for col in _COUNTER_COLUMNS
+        if (config.include_errors or "errors" not in col[0])
+        and (config.include_discards or "discards" not in col[0])
+    ]
+
+    executor.start(
+        spec=spec,
+        coro=get_ifcounters_metrics,
+        device=device,
+        columns=columns,
+        max_repetitions=config.max_repetitions,
+    )
+
+
+async def get_ifcounters_metrics(
+    device: DriverBase, timestamp: int, columns, max_repetitions=None
+) -> Union[MetricBatch, List]:
+    """
+    Walk the counter columns and return the MetricBatch of the rates since the
+    previous cycle, or an empty list when the counters are (re-)baselined.
+    """
+    dev_pysnmp = device.private["pysnmp"]
+
+    # the interface metadata cache call also obtains the device sysUpTime.
+
+    if_metadata = await ifcache.get_if_metadata(device)
+    sys_uptime = ifcache.cached_sys_uptime(device)
+
+    # the rates cannot be computed without the sysUpTime time base.
+
+    if sys_uptime is None:
+        device.log.warning(f"{device.name}: SNMP sysUpTime not available")
+        dev_pysnmp.pop("ifcounters", None)
+        return []
+
+    rows = await walk_columns(
+        device,
+        columns={c_name: c_oid for c_name, c_oid, *_ in columns},
+        converters={c_name: int for c_name, *_ in columns},
+        max_repetitions=max_repetitions,
+    )
+
+    # only the interfaces that report all of the counters are used.
+
+    if_indexes = [idx for idx, row in rows.items() if len(row) == len(columns)]
+    counters = {
+        c_name: IndexedColumn(((idx, rows[idx][c_name]) for idx in if_indexes), "Q")
+        for c_name, *_ in columns
+    }
+
+    if_names = [
+        if_metadata.get(idx, {}).get("name", str(idx))
+        for idx in next(iter(counters.values())).indexes
+    ]
+
+    state = IFCountersState(sys_uptime, counters, if_names)
+    prev: Optional[IFCountersState] = dev_pysnmp.get("ifcounters")
+    dev_pysnmp["ifcounters"] = state
+
+    if prev is None:
+        return []
+
+    if sys_uptime <= prev.sys_uptime:
+        device.log.info(f"{device.name}: SNMP device rebooted, re-baseline counters")
+        return []
+
+    # only the interfaces present in both cycles, with the same name, have
+    # rates; the others are baselined by this cycle.
+
+    cur_pos, prev_pos = _align_interfaces(state, prev)
+
+    baselined = len(if_names) - len(cur_pos)
+    if baselined:
+        device.log.info(
+            f"{device.name}: SNMP interfaces changed, baseline {baselined} interfaces"
+        )
+
+    if not cur_pos:
+        return []
+
+    # sysUpTime is in 1/100 seconds.
+
+    elapsed = (sys_uptime - prev.sys_uptime) / 100
+
+    batch = MetricBatch(ts=timestamp)
+    tags_idx = array(
+        "L", (batch.add_tags({"if_name": if_names[pos]}) for pos in cur_pos)
+    )
+
+    aligned = len(cur_pos) == len(if_names) == len(prev.if_names)
+
+    for c_name, _, modulus, scale, metric_cls in columns:
+        factor = scale / elapsed
+        cur_values, last_values = counters[c_name].values, prev.counters[c_name].values
+        if not aligned:
+            cur_values = array("Q", map(cur_values.__getitem__, cur_pos))
+            last_values = array("Q", map(last_values.__getitem__, prev_pos))
+
+        batch.extend(
+            _metric_name(metric_cls),
+            [
+                ((cur - last) % modulus) * factor
+                for cur, last in zip(cur_values, last_values)
+            ],
+            tags_idx,
+        )
+
+    return batch
+
+
+def _align_interfaces(state: IFCountersState, prev: IFCountersState):
+    """
+    Returns the tuple (cur_pos, prev_pos) of the positions, in the current and
+    the previous counter arrays, of the interfaces present in both cycles with
+    the same interface name.  The positions are in the ifIndex order.
+    """
+    cur_indexes, prev_indexes = state.if_indexes, prev.if_indexes
+
+    if cur_indexes == prev_indexes and state.if_names == prev.if_names:
+        positions = range(len(cur_indexes))
+        return positions, positions
+
+    prev_lookup = {idx: pos for pos, idx in enumerate(prev_indexes)}
+    cur_pos, prev_pos = list(), list()
+
+    for pos, idx in enumerate(cur_indexes):
+        if (p_pos := prev_lookup.get(idx)) is None:
+            continue
+        if state.if_names[pos] != prev.if_names[p_pos]:
+            continue
+        cur_pos.append(pos)
+        prev_pos.append(p_pos)
+
+    return cur_pos, prev_pos
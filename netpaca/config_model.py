@@ -58,6 +58,9 @@ from netpaca.core.config_model import (
 from netpaca.collectors import CollectorType, CollectorConfigModel
 from netpaca.drivers import DriverBase
 from netpaca.exporters import ExporterBase
+from netpaca.exporters.process import ProcessExporter
+from netpaca.stages import StageBase
+from netpaca.aiosnmp.config import SnmpConfigModel
 
 
 class DefaultCredential(Credential, BaseSettings):
@@ -71,6 +74,9 @@ class DefaultsModel(NoExtraBaseModel, BaseSettings):
     credentials: DefaultCredential
     collectors: Optional[List[str]]
     exporters: Optional[List[str]]
+    self_metrics: Optional[bool] = Field(default=False)
+    align_timestamps: Optional[bool] = Field(default=False)
+    snmp: Optional[SnmpConfigModel]
 
 
 class DeviceDriverModel(NoExtraBaseModel):
@@ -114,10 +120,36 @@ class CollectorModel(NoExtraBaseModel):
             raise ValueError("failed to import collector")
 
 
+class StageModel(NoExtraBaseModel):
+    stage: Optional[Type[StageBase]]
+    use: Optional[Type[StageBase]]
+    config: Optional[Dict]
+
+    @validator("use", pre=True)
+    def _from_use_to_callable(cls, val):
+        return PackagedEntryPoint.validate(val)
+
+    @validator("stage", pre=True)
+    def _from_stage_to_callable(cls, val):
+        return EntryPointImportPath.validate(val)
+
+    @root_validator
+    def normalize_stage(cls, values):
+        try:
+            values["stage"] = first(itemgetter("stage", "use")(values))
+        except KeyError:
+            raise ValueError("Missing one of ['stage', 'use']")
+
+        return values
+
+
 class ExporterModel(NoExtraBaseModel):
     exporter: Optional[Type[ExporterBase]]
     use: Optional[Type[ExporterBase]]
     config: Optional[Dict]
+    stages: Optional[List[StageModel]]
+    process: Optional[bool] = Field(default=False)
+    process_max_inflight: PositiveInt = Field(default=4)
 
     @validator("use", pre=True)
     def _from_use_to_callable(cls, val):
@@ -145,8 +177,24 @@ class ConfigModel(NoExtraBaseModel):
             e_cls = e_val.exporter
             e_cfg_model = e_cls.config
             e_val.config = e_cfg_model.validate(e_val.config)
-            e_inst = e_cls(e_name)
+            e_inst = (
+                ProcessExporter(e_name, e_cls, max_inflight=e_val.process_max_inflight)
+                if e_val.process
+                else e_cls(e_name)
+            )
             e_inst.prepare(e_val.config)
+            e_inst.stages = [
+                make_stage(f"{e_name}.{s_val.stage.__name__}", s_val)
+                for s_val in e_val.stages or []
+            ]
             exporters[e_name] = e_inst
 
         return exporters
+
+
+def make_stage(name: str, spec: StageModel) -> StageBase:
+    """ create and prepare the exporter pipeline stage instance """
+    s_cls = spec.stage
+    s_inst = s_cls(name)
+    s_inst.prepare(s_cls.config.validate(spec.config or {}) if s_cls.config else None)
+    return s_inst
@@ -18,6 +18,7 @@
 from typing import Optional
 
 from netpaca.core.config_model import Credential
+from netpaca.tags import TagSet
 from netpaca import log
 
 
@@ -33,7 +34,7 @@ class DriverBase(object):
     def prepare(self, inventory_rec, config):  # noqa
         self.device_host = inventory_rec.get("ipaddr") or inventory_rec["host"]
         self.private = inventory_rec.copy()
-        self.tags = inventory_rec.copy()
+        self.tags = TagSet.intern(inventory_rec)
 
     async def login(self, creds: Optional[Credential] = None) -> bool:
         raise NotImplementedError()
@@ -111,9 +111,18 @@ _vars = [
 _col_values = _header.split()
 _col_spaces = [len(spcs) for spcs in re.findall(r"\s+", _header)]
 _col_width = [len(col) + _col_spaces[i] for i, col in enumerate(_col_values[:-1])]
+
+# the Duplex and Speed values are right aligned, so that a six character Speed
+# value, "a-1000" for example, starts one column before the "Speed" header.
+# The Type is empty for interfaces without media, such as port-channels, and
+# the row then ends with the Speed value.
+
+_col_width[-2] -= 1
+_col_width[-1] += 1
+
 _re_expr = "".join(
-    ["(?P<%s>.{%s})" % (_vars[i], len) for i, len in enumerate(_col_width)]
-    + ["(?P<if_type>.*)"]
+    ["(?P<%s>.{%s})" % (_vars[i], len) for i, len in enumerate(_col_width[:-1])]
+    + ["(?P<if_speed>.{1,%s})" % _col_width[-1], "(?P<if_type>.*)"]
 )
 _skip_header = slice(len(_header) + 1, -1)
 _match = re.compile(_re_expr).match
@@ -14,8 +14,8 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """
-This file uses TTP to parse the output of the Cisco NX-OS command:
-"show interfaces transceiver details"
+This file parses the output of the Cisco IOS command:
+"show interfaces transceiver"
 
 Example CLI output
 ------------------
@@ -64,7 +64,14 @@ Notes
 -----
 The CLI output does not appear to "mark" the anomolise as expected; for example
 the Rx Power for Te1/1/2 should be marked with a "-" to indicate a warning on
-low-threshold.
+low-threshold.  The flags are therefore determined by comparing the values
+against the thresholds.
+
+The output is parsed in a single pass over the lines, a state machine that
+appends the values and the thresholds of each table row into the arrays of
+the table, and then determines the flags of each table in bulk.  The former
+TTP based parser is retained as _parse_show_interface_transceiver_ttp for
+comparison by the parser benchmarks.
 
 References
 ----------
@@ -76,14 +83,15 @@ https://ttp.readthedocs.io
 # System Imports
 # -----------------------------------------------------------------------------
 
-from typing import Optional
+from typing import Optional, List
 from collections import defaultdict
+from array import array
 
 # -----------------------------------------------------------------------------
-# Public Imports
+# Private Imports
 # -----------------------------------------------------------------------------
 
-from ttp import ttp
+from netpaca.drivers.ttp_cache import ttp_parse
 
 # -----------------------------------------------------------------------------
 # Externs
@@ -108,8 +116,9 @@ def parse_show_interface_transceiver(cli_text: str) -> Optional[dict]:
             <tag>_flag: <flag_value>
 
     Where <tag> is the name of the DOM item such as "rxpower" and the <tag>_flag
-    is the Cisco marker (++,--,+,-) that indicates the DOM item exceeds a
-    threshold value.
+    is the status of the DOM item value against the threshold values, encoded
+    as (0=ok, 1=warn, 2=alert).  A "N/A" reading is reported as 0.0 with the
+    alert status.
 
     Parameters
     ----------
@@ -121,12 +130,127 @@ def parse_show_interface_transceiver(cli_text: str) -> Optional[dict]:
     The dictionary of output as described, if the output contains any transceivers.
     None otherwise.
     """
+    tables = dict()
+    table = tag = None
+
+    for line in cli_text.splitlines():
+        fields = line.split()
+
+        # within the table rows, until the blank line that ends the table.
+
+        if table is not None:
+            if not fields:
+                table = None
+            elif len(fields) >= 6:
+                table.add_row(fields)
+            continue
+
+        if not fields:
+            continue
+
+        # the table header, the measurement name line then the dashes line
+        # that precedes the table rows.
+
+        if (table_tag := _TABLE_TAGS.get(fields[0])) is not None:
+            tag = table_tag
+
+        elif tag and fields[0].startswith("---"):
+            table = tables[tag] = _DomTable()
+            tag = None
 
-    # make a clean copy of the TTP parser and use the provided cli cli_text.
+    ret_ifs_dom = defaultdict(dict)
+
+    for tag, table in tables.items():
+        for if_name, value, flag in zip(
+            table.if_names, table.values, _thresholds_outside(table)
+        ):
+            ret_ifs_dom[if_name].update(
+                {tag: 0.0 if value == _NA_VALUE else value, tag + "_flag": flag}
+            )
+
+    return ret_ifs_dom or None
+
+
+# -----------------------------------------------------------------------------
+#
+#                                PRIVATE CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# the first word of the table measurement name line -> tag
+_TABLE_TAGS = {
+    "Temperature": "temp",
+    "Voltage": "voltage",
+    "Current": "current",
+    "Transmit": "txpower",
+    "Receive": "rxpower",
+}
+
+# a "N/A" value is stored as -inf so that the bulk threshold comparison
+# determines the alert status.
+_NA_VALUE = float("-inf")
+
+
+class _DomTable(object):
+    """ the interface names, values, and thresholds of the table rows """
+
+    __slots__ = ("if_names", "values", "hi_a", "hi_w", "lo_w", "lo_a")
+
+    def __init__(self):
+        self.if_names = list()
+        self.values = array("d")
+        self.hi_a = array("d")
+        self.hi_w = array("d")
+        self.lo_w = array("d")
+        self.lo_a = array("d")
+
+    def add_row(self, fields: List[str]):
+        """
+        Add the table row fields:
+            <if_name> <value> [flag] <hi_a> <hi_w> <lo_w> <lo_a>
+
+        A row whose thresholds are not values is ignored.
+        """
+        try:
+            hi_a, hi_w, lo_w, lo_a = map(float, fields[-4:])
+            value = _NA_VALUE if fields[1] == "N/A" else float(fields[1])
+        except ValueError:
+            return
+
+        self.if_names.append(fields[0])
+        self.values.append(value)
+        self.hi_a.append(hi_a)
+        self.hi_w.append(hi_w)
+        self.lo_w.append(lo_w)
+        self.lo_a.append(lo_a)
+
+
+def _thresholds_outside(table: _DomTable) -> List[int]:
+    """
+    This function determines the status of each table row value, as
+    _threshold_outside() does for one measurement, encoded as (0=ok, 1=warn,
+    2=alert).
+    """
+    return [
+        2
+        if value <= lo_a or value >= hi_a
+        else 1
+        if value <= lo_w or value >= hi_w
+        else 0
+        for value, hi_a, hi_w, lo_w, lo_a in zip(
+            table.values, table.hi_a, table.hi_w, table.lo_w, table.lo_a
+        )
+    ]
+
+
+def _parse_show_interface_transceiver_ttp(cli_text: str) -> Optional[dict]:
+    """
+    The former TTP based parser, retained for comparison by the parser
+    benchmarks.
+    """
+    # use the cached TTP parser with the provided cli text.
     try:
-        parser = ttp(data=cli_text, template=_TEMPLATE, log_level="none")
-        parser.parse()
-        res = parser.result()[0][0]
+        res = ttp_parse(_TEMPLATE, cli_text)[0][0]
         metrics_ifs = res["metrics"]
     except (IndexError, KeyError):
         return None
@@ -145,12 +269,6 @@ def parse_show_interface_transceiver(cli_text: str) -> Optional[dict]:
     return ret_ifs_dom
 
 
-# -----------------------------------------------------------------------------
-#
-#                                PRIVATE CODE BEGINS
-#
-# -----------------------------------------------------------------------------
-
 _TEMPLATE = """
 <vars>
 FLOAT = "[-+]?[0-9]+\.[0-9]+"
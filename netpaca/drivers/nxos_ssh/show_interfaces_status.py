@@ -25,10 +25,10 @@ https://ttp.readthedocs.io
 from typing import Optional
 
 # -----------------------------------------------------------------------------
-# Public Imports
+# Private Imports
 # -----------------------------------------------------------------------------
 
-from ttp import ttp
+from netpaca.drivers.ttp_cache import ttp_parse
 
 # -----------------------------------------------------------------------------
 # Exports
@@ -68,13 +68,9 @@ def parse_show_interfaces_status(parse_text: str) -> Optional[dict]:
     None otherwise.
     """
 
-    # make a clean copy of the TTP parser and use the provided cli cli_text.
+    # use the cached TTP parser with the provided cli text.
     try:
-        parser = ttp(
-            data=parse_text[_skip_header], template=_TEMPLATE, log_level="none"
-        )
-        parser.parse()
-        res = parser.result()[0][0]
+        res = ttp_parse(_TEMPLATE, parse_text[_skip_header])[0][0]
         return res["interfaces"]
 
     except (IndexError, KeyError):
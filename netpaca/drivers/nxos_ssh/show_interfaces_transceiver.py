@@ -15,7 +15,7 @@
 
 
 """
-This file uses TTP to parse the output of the Cisco NX-OS command:
+This file parses the output of the Cisco NX-OS command:
 "show interface transceiver details"
 
 Examples CLI output
@@ -48,6 +48,17 @@ Ethernet1/13
   ----------------------------------------------------------------------------
   Note: ++  high-alarm; +  high-warning; --  low-alarm; -  low-warning
 
+Notes
+-----
+The output is parsed in a single pass over the lines; the interface name lines
+are the only lines that start in the first column with a single word, and the
+measurement lines are identified by the first two letters of the measurement
+name.  Transceivers with multiple lanes, such as QSFP-100G-SR4, report the
+diagnostics of each lane; the first lane is used.
+
+The former TTP based parser is retained as _parse_show_interface_transceiver_ttp
+for comparison by the parser benchmarks.  Its result differs in types: the
+values are the CLI strings, and the flags are always empty; see CHANGELOG.md.
 
 Text parsing done with ttp:
 https://ttp.readthedocs.io
@@ -64,9 +75,14 @@ from collections import defaultdict
 # Public Imports
 # -----------------------------------------------------------------------------
 
-from ttp import ttp
 from first import first
 
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca.drivers.ttp_cache import ttp_parse
+
 # -----------------------------------------------------------------------------
 # Externs
 # -----------------------------------------------------------------------------
@@ -82,8 +98,8 @@ __all__ = ["parse_show_interface_transceiver"]
 
 def parse_show_interface_transceiver(parse_text: str) -> Optional[dict]:
     """
-    This function is used to parse the IOS CLI text from the command
-    "show interfaces transceiver" into a dictionary whose
+    This function is used to parse the NX-OS CLI text from the command
+    "show interface transceiver details" into a dictionary whose
         key=<if_name>
         value=<dict>:
             <tag>: <value>
@@ -91,7 +107,8 @@ def parse_show_interface_transceiver(parse_text: str) -> Optional[dict]:
 
     Where <tag> is the name of the DOM item such as "rxpower" and the <tag>_flag
     is the Cisco marker (++,--,+,-) that indicates the DOM item exceeds a
-    threshold value.
+    threshold value.  The value is a float; a "N/A" reading is reported as 0.0,
+    and is usually marked with the "--" flag.
 
     Parameters
     ----------
@@ -103,12 +120,77 @@ def parse_show_interface_transceiver(parse_text: str) -> Optional[dict]:
     The dictionary of output as described, if the output contains any transceivers.
     None otherwise.
     """
+    ret_ifs_dom = dict()
+    if_name = if_dom = None
+
+    for line in parse_text.splitlines():
+        if not line:
+            continue
+
+        if line[0] != " ":
+            # the interface name line; the "Lane Number:" lines of multi-lane
+            # transceivers are not.
+
+            if len(words := line.split()) == 1:
+                if_name, if_dom = words[0], None
+            continue
+
+        if if_dom is None:
+            if line.strip() == "transceiver is present":
+                if_dom = dict()
+            continue
+
+        if (measurement := _MEASUREMENTS.get(line[2:4])) is None:
+            continue
+
+        tag, at_value = measurement
+        if tag in if_dom:
+            # a lane other than the first lane of the transceiver
+            continue
+
+        fields = line.split()
+        value = fields[at_value]
+
+        # the flag follows the units of the value, a "N/A" value has no units.
+
+        if value == "N/A":
+            value, at_flag = 0.0, at_value + 1
+        else:
+            value, at_flag = float(value), at_value + 2
+
+        flag = fields[at_flag] if len(fields) > at_flag else ""
+        if_dom[tag] = value
+        if_dom[tag + "_flag"] = flag if flag in _FLAGS else ""
+        ret_ifs_dom[if_name] = if_dom
+
+    return ret_ifs_dom or None
+
 
-    # make a clean copy of the TTP parser and use the provided cli cli_text.
+# -----------------------------------------------------------------------------
+#
+#                                PRIVATE CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+# measurement name, first two letters -> (tag, index of the value field)
+_MEASUREMENTS = {
+    "Te": ("temp", 1),
+    "Vo": ("voltage", 1),
+    "Tx": ("txpower", 2),
+    "Rx": ("rxpower", 2),
+}
+
+_FLAGS = frozenset(("++", "+", "--", "-"))
+
+
+def _parse_show_interface_transceiver_ttp(parse_text: str) -> Optional[dict]:
+    """
+    The former TTP based parser, retained for comparison by the parser
+    benchmarks.  The values are the strings from the CLI text, and the flags
+    are always empty.
+    """
     try:
-        parser = ttp(data=parse_text, template=_TEMPLATE)
-        parser.parse()
-        res = parser.result()
+        res = ttp_parse(_TEMPLATE, parse_text)
         ifdom_data = res[0][0]["interfaces"]
 
     except (IndexError, KeyError):
@@ -136,12 +218,6 @@ def parse_show_interface_transceiver(parse_text: str) -> Optional[dict]:
     return ret_ifs_dom
 
 
-# -----------------------------------------------------------------------------
-#
-#                                PRIVATE CODE BEGINS
-#
-# -----------------------------------------------------------------------------
-
 _TEMPLATE = """
 <vars>
 FLOAT = "[-+]?[0-9]+\.[0-9]+"
@@ -0,0 +1,91 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the TTP parser cache used by the SSH drivers.  Creating a
+ttp object parses the template XML and compiles the template regular
+expressions; rather than doing so for each device each collection cycle, a
+ttp object is created once per template per process and only the input data
+is replaced for each parse.
+
+The parse is synchronous, there is no await between replacing the input and
+obtaining the results, so the cached parsers are safe to share between the
+device collector tasks.
+
+Resetting the results of the previous parse relies on the ttp internals, so
+the ttp version is pinned in requirements-drivers-ssh.txt, and the cached
+parsers are checked against a new ttp object by benchmarks/check_parsers.py.
+
+Text parsing done with ttp:
+https://ttp.readthedocs.io
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from functools import lru_cache
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from ttp import ttp
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["get_ttp_parser", "ttp_parse"]
+
+# -----------------------------------------------------------------------------
+#
+#                                CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=None)
+def get_ttp_parser(template: str) -> ttp:
+    """ returns the ttp parser for the template, created once per process """
+    return ttp(template=template, log_level="none")
+
+
+def ttp_parse(template: str, data: str) -> list:
+    """
+    Parse the data using the cached parser of the template, and return the
+    parser results; the same value as ttp(data, template).result() for a new
+    ttp object.
+
+    Parameters
+    ----------
+    template: str
+        The TTP template text
+
+    data: str
+        The text to parse, for example the CLI output obtained from the device
+    """
+    parser = get_ttp_parser(template)
+
+    # the template results accumulate across parses; reset them along with
+    # the input data of the previous parse.
+
+    parser.clear_input()
+    for parser_template in parser._templates:
+        parser_template.results = []
+
+    parser.add_input(data)
+    parser.parse(one=True)
+    return parser.result()
@@ -14,11 +14,11 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from typing import Optional, List
+from typing import Optional, List, Union
 from netpaca.core.config_model import BaseModel
 
 from netpaca.drivers import DriverBase
-from netpaca import Metric
+from netpaca import Metric, MetricBatch
 
 
 class ExporterBase(object):
@@ -29,11 +29,21 @@ class ExporterBase(object):
         self.private = None
         self.tags = dict()
         self.creds = None
+        self.stages = list()
 
     def prepare(self, config):
         raise NotImplementedError()
 
-    async def export_metrics(self, device: DriverBase, metrics: List[Metric]):
+    async def export_metrics(
+        self, device: DriverBase, metrics: Union[List[Metric], MetricBatch]
+    ):
+        pass
+
+    async def close(self):
+        """
+        Called once when netpaca stops, so that the exporter can write any
+        buffered metrics and release its resources.  The default does nothing.
+        """
         pass
 
     def __str__(self):
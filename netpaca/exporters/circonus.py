@@ -17,13 +17,10 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from itertools import chain
-
 # -----------------------------------------------------------------------------
 # Public Imports
 # -----------------------------------------------------------------------------
 
-import httpx
 from tenacity import retry, wait_exponential
 from pydantic import BaseModel
 
@@ -33,14 +30,16 @@ from netpaca.core.config_model import EnvSecretUrl
 # Private Imports
 # -----------------------------------------------------------------------------
 
-from netpaca import Metric
+from netpaca import Metric, MetricBatch, TagSet
 from netpaca import log
 from netpaca.drivers import DriverBase
 from netpaca.exporters import ExporterBase
+from netpaca.exporters.httpclient import HTTPClientConfigModel, ExporterHTTPClient
 
 
 class CirconusConfigModel(BaseModel):
     circonus_datasubmission_url: EnvSecretUrl
+    http: HTTPClientConfigModel = HTTPClientConfigModel()
 
 
 class CirconusExporter(ExporterBase):
@@ -54,17 +53,25 @@ class CirconusExporter(ExporterBase):
 
     def prepare(self, config: CirconusConfigModel):
         self.post_url = config.circonus_datasubmission_url.get_secret_value()
-        self.httpx = httpx.AsyncClient(
-            verify=False, headers={"content-type": "application/json"},
+        self.httpx = ExporterHTTPClient(
+            self.name, config.http, headers={"content-type": "application/json"},
         )
 
+    async def close(self):
+        """ close the pooled HTTP client connections """
+        if self.httpx:
+            await self.httpx.aclose()
+
     async def export_metrics(self, device: DriverBase, metrics):
         self.log.debug(f"{device.name}: Exporting {len(metrics)} metrics")
 
-        post_data = dict(
-            make_circonus_metric(device_tags=device.tags, metric=metric,)
-            for metric in metrics
-        )
+        if isinstance(metrics, MetricBatch):
+            post_data = make_circonus_batch(device_tags=device.tags, batch=metrics)
+        else:
+            post_data = dict(
+                make_circonus_metric(device_tags=device.tags, metric=metric,)
+                for metric in metrics
+            )
 
         @retry(wait=wait_exponential(multiplier=1, min=4, max=10))
         async def to_circonus():
@@ -81,17 +88,36 @@ class CirconusExporter(ExporterBase):
             )
 
 
-def make_circonus_metric(device_tags, metric: Metric):
-    all_tags = chain(device_tags.items(), metric.tags.items())
+def _to_str(value):
+    if isinstance(value, bytes):
+        return 'b"%s"' % value.decode("utf-8")
+    else:
+        return value
 
-    def to_str(value):
-        if isinstance(value, bytes):
-            return 'b"%s"' % value.decode("utf-8")
-        else:
-            return value
 
-    stream_tags = ",".join(f"{key}:{to_str(value)}" for key, value in all_tags)
+def _circonus_stream_tags(tags: TagSet) -> str:
+    return ",".join(f"{key}:{_to_str(value)}" for key, value in tags.items())
 
+
+def make_circonus_stream_tags(device_tags, tags) -> str:
+    # the stream tags string is cached on the interned TagSet of all tags.
+    all_tags = TagSet.intern(device_tags).merge(tags)
+    return all_tags.serialized("circonus", _circonus_stream_tags)
+
+
+def make_circonus_metric(device_tags, metric: Metric):
+    stream_tags = make_circonus_stream_tags(device_tags, metric.tags)
     name = f"{metric.name}|ST[{stream_tags}]"
     value = metric.value
     return name, value
+
+
+def make_circonus_batch(device_tags, batch: MetricBatch) -> dict:
+    # the stream tags are created once per tag-set in the batch.
+    stream_tags = [
+        make_circonus_stream_tags(device_tags, tags) for tags in batch.tag_sets
+    ]
+    return {
+        f"{name}|ST[{stream_tags[tags_idx]}]": value
+        for name, value, tags_idx in batch.rows()
+    }
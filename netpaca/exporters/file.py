@@ -0,0 +1,396 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the local file exporter.  Metrics are buffered in columnar
+form and written either as compressed Parquet files, when pyarrow is
+installed, or as compressed NDJSON files (zstd when zstandard is installed,
+gzip otherwise).  Files are rotated based on age and size.  While a file is
+being written it has the suffix ".inprogress", which is removed when the
+file is rotated or when netpaca stops.  The buffer is flushed when it reaches
+flush_rows metrics, and at least every flush_interval seconds.
+
+All file I/O is performed by a single background thread so that the asyncio
+event loop is never blocked on disk.
+
+Example configuration
+---------------------
+    [exporters.file]
+        use = "netpaca.exporters:file"
+        config.directory = "/var/lib/netpaca"
+        config.rotate_interval = 3600
+        config.rotate_size = 268435456
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict, Literal
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import json
+import gzip
+import time
+import os
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pydantic import PositiveInt, validator
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, MetricBatch, TagSet
+from netpaca import log
+from netpaca.core.config_model import NoExtraBaseModel, EnvExpand
+from netpaca.drivers import DriverBase
+from netpaca.exporters import ExporterBase
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["FileExporter", "FileExporterConfigModel"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+# the NDJSON zstd compression falls back to gzip when zstandard is not
+# installed.
+
+_COMPRESSIONS = {
+    "parquet": {"zstd", "gzip", "snappy", "lz4", "brotli", "none"},
+    "ndjson": {"zstd", "gzip"},
+}
+
+
+class FileExporterConfigModel(NoExtraBaseModel):
+    directory: EnvExpand
+    filename_prefix: str = "netpaca"
+
+    # if the format is not provided, then parquet is used when pyarrow is
+    # installed and ndjson otherwise.
+
+    format: Optional[Literal["parquet", "ndjson"]]
+    compression: str = "zstd"
+
+    rotate_interval: PositiveInt = 3600  # seconds
+    rotate_size: PositiveInt = 256 * 1024 * 1024  # bytes
+    flush_rows: PositiveInt = 50_000
+    flush_interval: PositiveInt = 60  # seconds
+
+    @validator("compression")
+    def _check_compression(cls, val, values):
+        fmt = values.get("format") or ("parquet" if pyarrow else "ndjson")
+        if val not in _COMPRESSIONS[fmt]:
+            raise ValueError(
+                f"{fmt} compression must be one of {sorted(_COMPRESSIONS[fmt])}"
+            )
+        return val
+
+
+_COLUMNS = ("ts", "name", "value", "value_str", "device", "tags")
+
+
+def _tags_json(tags: TagSet) -> str:
+    return json.dumps(dict(tags), sort_keys=True, default=str)
+
+
+class MetricColumns(object):
+    """
+    Metrics buffered in columnar form; one list per column.  The "value"
+    column holds the numeric values as float, and non-numeric values are
+    stored in the "value_str" column.  The "tags" column holds the combined
+    device and metric tags as a JSON string.
+    """
+
+    __slots__ = _COLUMNS
+
+    def __init__(self):
+        for col in _COLUMNS:
+            setattr(self, col, list())
+
+    def __len__(self):
+        return len(self.ts)
+
+    def extend(self, device: DriverBase, metrics: List[Metric]):
+        if isinstance(metrics, MetricBatch):
+            self.extend_batch(device, metrics)
+            return
+
+        device_name = device.name
+        device_tags = TagSet.intern(device.tags)
+
+        for metric in metrics:
+            value = metric.value
+            if isinstance(value, (int, float)):
+                self.value.append(float(value))
+                self.value_str.append(None)
+            else:
+                self.value.append(None)
+                self.value_str.append(str(value))
+
+            tags = device_tags.merge(metric.tags).serialized("json", _tags_json)
+
+            self.ts.append(metric.ts)
+            self.name.append(metric.name)
+            self.device.append(device_name)
+            self.tags.append(tags)
+
+    def extend_batch(self, device: DriverBase, batch: MetricBatch):
+        count = len(batch)
+        device_tags = TagSet.intern(device.tags)
+        tags = [
+            device_tags.merge(tags).serialized("json", _tags_json)
+            for tags in batch.tag_sets
+        ]
+
+        self.ts.extend([batch.ts] * count)
+        self.name.extend(batch.names)
+        self.value.extend(batch.values)
+        self.value_str.extend([None] * count)
+        self.device.extend([device.name] * count)
+        self.tags.extend([tags[tags_idx] for tags_idx in batch.tag_index])
+
+    def as_dict(self) -> Dict[str, list]:
+        return {col: getattr(self, col) for col in _COLUMNS}
+
+
+class _ParquetWriter(object):
+    suffix = ".parquet"
+
+    def __init__(self, filepath: Path, compression: str):
+        schema = pyarrow.schema(
+            [
+                ("ts", pyarrow.int64()),
+                ("name", pyarrow.string()),
+                ("value", pyarrow.float64()),
+                ("value_str", pyarrow.string()),
+                ("device", pyarrow.string()),
+                ("tags", pyarrow.string()),
+            ]
+        )
+        self.filepath = filepath
+        self._writer = pyarrow.parquet.ParquetWriter(
+            str(filepath), schema, compression=compression, use_dictionary=True
+        )
+        self._schema = schema
+
+    def write(self, columns: MetricColumns):
+        table = pyarrow.Table.from_pydict(columns.as_dict(), schema=self._schema)
+        self._writer.write_table(table)
+
+    def size(self) -> int:
+        return self.filepath.stat().st_size
+
+    def close(self):
+        self._writer.close()
+
+
+class _NDJSONWriter(object):
+    def __init__(self, filepath: Path, compression: str):
+        self.filepath = filepath
+        self._fh = open(filepath, "wb")
+
+        # each write is compressed as an independent zstd frame or gzip member,
+        # and concatenated frames/members are valid compressed files.
+
+        if zstandard and compression == "zstd":
+            self._compress = zstandard.ZstdCompressor().compress
+        else:
+            self._compress = gzip.compress
+
+    @classmethod
+    def suffix_for(cls, compression):
+        return ".ndjson.zst" if zstandard and compression == "zstd" else ".ndjson.gz"
+
+    def write(self, columns: MetricColumns):
+        rows = zip(*(getattr(columns, col) for col in _COLUMNS))
+        content = "".join(
+            json.dumps(dict(zip(_COLUMNS, row))) + "\n" for row in rows
+        ).encode()
+        self._fh.write(self._compress(content))
+        self._fh.flush()
+
+    def size(self) -> int:
+        return self._fh.tell()
+
+    def close(self):
+        self._fh.close()
+
+
+class FileExporter(ExporterBase):
+    config = FileExporterConfigModel
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.log = log.get_logger()
+        self.directory: Optional[Path] = None
+        self.buffer = MetricColumns()
+        self.writer = None
+        self.writer_opened = 0
+        self.last_flush = time.monotonic()
+        self._config: Optional[FileExporterConfigModel] = None
+        self._file_seq = 0
+        self._flush_timer: Optional[asyncio.Task] = None
+
+        # a single worker thread is used so that the file writes are
+        # serialized and performed in the order of the flushes.
+
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"netpaca-{name}"
+        )
+
+    def prepare(self, config: FileExporterConfigModel):
+        if config.format == "parquet" and not pyarrow:
+            raise ValueError("parquet format requires pyarrow to be installed")
+
+        if not config.format:
+            config.format = "parquet" if pyarrow else "ndjson"
+
+        self._config = config
+        self.directory = Path(config.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    async def export_metrics(self, device: DriverBase, metrics: List[Metric]):
+        # the flush timer is started with the first export since there is no
+        # running event loop when the exporter is prepared.
+
+        if not self._flush_timer:
+            self._flush_timer = asyncio.create_task(self._flush_periodically())
+
+        self.buffer.extend(device, metrics)
+
+        if len(self.buffer) >= self._config.flush_rows:
+            await self.flush()
+
+    async def _flush_periodically(self):
+        """
+        Flush the buffer, and so rotate the file when due, at least every
+        flush interval, even when no metrics are exported.
+        """
+        interval = self._config.flush_interval
+
+        while True:
+            await asyncio.sleep(max(self.last_flush + interval - time.monotonic(), 0))
+            if time.monotonic() - self.last_flush >= interval:
+                await self.flush()
+
+    async def close(self):
+        """
+        Write the buffered metrics and close the current file, removing the
+        ".inprogress" suffix.
+        """
+        if self._flush_timer:
+            self._flush_timer.cancel()
+
+        await self.flush()
+
+        if self.writer:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._io_executor, self._close_writer)
+
+        self._io_executor.shutdown()
+
+    async def flush(self):
+        """
+        Hand off the current buffer to the I/O thread to be written to the
+        file.  An empty buffer is handed off only to check the file rotation.
+        """
+        columns, self.buffer = self.buffer, MetricColumns()
+        self.last_flush = time.monotonic()
+
+        if not len(columns) and not self.writer:
+            return
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            await loop.run_in_executor(self._io_executor, self._write, columns)
+
+        except Exception as exc:  # noqa
+            exc_name = exc.__class__.__name__
+            self.log.error(
+                f"{self.name}: Unable to write {len(columns)} metrics: "
+                f"{exc_name}: {exc}"
+            )
+
+    # -------------------------------------------------------------------------
+    # the following methods are executed in the I/O thread.
+    # -------------------------------------------------------------------------
+
+    def _write(self, columns: MetricColumns):
+        if self.writer and self._rotate_due():
+            self._close_writer()
+
+        if not len(columns):
+            return
+
+        if not self.writer:
+            self._open_writer()
+
+        self.writer.write(columns)
+
+    def _rotate_due(self) -> bool:
+        age = time.monotonic() - self.writer_opened
+        return (
+            age >= self._config.rotate_interval
+            or self.writer.size() >= self._config.rotate_size
+        )
+
+    def _open_writer(self):
+        cfg = self._config
+        self._file_seq += 1
+        ts_str = datetime.now().strftime("%Y%m%dT%H%M%S")
+
+        if cfg.format == "parquet":
+            writer_cls, suffix = _ParquetWriter, _ParquetWriter.suffix
+        else:
+            writer_cls = _NDJSONWriter
+            suffix = _NDJSONWriter.suffix_for(cfg.compression)
+
+        filename = f"{cfg.filename_prefix}-{ts_str}-{self._file_seq}{suffix}"
+        filepath = self.directory / (filename + ".inprogress")
+
+        self.writer = writer_cls(filepath, compression=cfg.compression)
+        self.writer_opened = time.monotonic()
+        self.log.debug(f"{self.name}: writing metrics to {filepath}")
+
+    def _close_writer(self):
+        self.writer.close()
+        filepath = self.writer.filepath
+        os.rename(filepath, filepath.with_suffix(""))
+        self.writer = None
@@ -0,0 +1,206 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This module contains the HTTP client support shared by the HTTP based
+exporters.  The exporter configuration can include an `http` section to
+control the connection pool, keepalive, HTTP/2 and timeout options:
+
+    [exporters.influxdb]
+        use = "netpaca.exporters:influxdb"
+        config.server_url = "$INFLUXDB_SERVER"
+        config.database = "db0"
+        config.http.max_connections = 50
+        config.http.max_keepalive_connections = 20
+        config.http.keepalive_expiry = 30
+        config.http.http2 = true
+        config.http.timeout = 10
+
+HTTP/2 support requires the httpx "http2" extra to be installed.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List
+from contextlib import asynccontextmanager
+import time
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+import httpx
+from pydantic import PositiveInt, PositiveFloat
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+from netpaca.core.config_model import NoExtraBaseModel
+from netpaca import selfmetrics
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["HTTPClientConfigModel", "ExporterHTTPClient"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class HTTPClientConfigModel(NoExtraBaseModel):
+    """
+    The HTTP client connection pool options used by an exporter.
+    """
+
+    max_connections: PositiveInt = 100
+    max_keepalive_connections: PositiveInt = 20
+    keepalive_expiry: PositiveFloat = 5.0
+    http2: bool = False
+    timeout: PositiveFloat = 10.0
+    connect_timeout: Optional[PositiveFloat]
+    pool_timeout: Optional[PositiveFloat]
+    verify: bool = False
+
+
+class ExporterHTTPClient(object):
+    """
+    The ExporterHTTPClient wraps an httpx.AsyncClient configured from the
+    HTTPClientConfigModel and tracks the request statistics that are reported
+    as self-metrics.
+
+    Attributes
+    ----------
+    client: httpx.AsyncClient
+        The underlying client, can be used directly.
+
+    inflight: int
+        The number of requests currently in progress; the number of requests
+        in excess of `max_connections` are waiting in the pool queue.
+
+    errors: int
+        The number of requests that raised an exception or received a 4xx or
+        5xx response status.
+    """
+
+    def __init__(self, name: str, config: HTTPClientConfigModel, **client_kwargs):
+        self.name = name
+        self.config = config
+
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+
+        # only override the connect and pool timeouts when configured, since a
+        # value of None would disable the timeout.
+
+        timeout = httpx.Timeout(
+            config.timeout,
+            connect=config.connect_timeout or config.timeout,
+            pool=config.pool_timeout or config.timeout,
+        )
+
+        try:
+            self.client = httpx.AsyncClient(
+                limits=limits,
+                timeout=timeout,
+                http2=config.http2,
+                verify=config.verify,
+                **client_kwargs,
+            )
+        except ImportError as exc:
+            raise ValueError(
+                f"exporter {name}: http2 requires the httpx[http2] extra: {str(exc)}"
+            )
+
+        self.inflight = 0
+        self.inflight_max = 0
+        self.requests = 0
+        self.errors = 0
+        self.latency_ms = 0
+
+        selfmetrics.register(self.self_metrics)
+
+    @asynccontextmanager
+    async def track(self):
+        """
+        Async context manager used around each request to update the request
+        statistics.
+        """
+        self.inflight += 1
+        self.inflight_max = max(self.inflight_max, self.inflight)
+        ts_start = time.monotonic()
+
+        try:
+            yield
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.inflight -= 1
+            self.requests += 1
+            self.latency_ms += int((time.monotonic() - ts_start) * 1000)
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        async with self.track():
+            response = await self.client.post(url, **kwargs)
+
+        if response.is_error:
+            self.errors += 1
+        return response
+
+    async def put(self, url, **kwargs) -> httpx.Response:
+        async with self.track():
+            response = await self.client.put(url, **kwargs)
+
+        if response.is_error:
+            self.errors += 1
+        return response
+
+    def self_metrics(self) -> List[Metric]:
+        """
+        Returns the connection pool statistics as a list of Metric.  The
+        inflight_max value is reset on each call so that it reflects the peak
+        usage between reporting intervals.
+        """
+        tags = {"exporter": self.name}
+        values = {
+            "inflight": self.inflight,
+            "inflight_max": self.inflight_max,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": self.latency_ms,
+            "max_connections": self.config.max_connections,
+        }
+
+        self.inflight_max = self.inflight
+
+        return [
+            Metric(name=f"netpaca_exporter_http_{key}", value=value, tags=tags)
+            for key, value in values.items()
+        ]
+
+    async def aclose(self):
+        selfmetrics.unregister(self.self_metrics)
+        await self.client.aclose()
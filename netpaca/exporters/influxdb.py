@@ -17,7 +17,7 @@
 # System Imports
 # -----------------------------------------------------------------------------
 
-from itertools import chain
+from functools import lru_cache
 import re
 
 # -----------------------------------------------------------------------------
@@ -34,10 +34,11 @@ from netpaca.core.config_model import EnvSecretUrl, NoExtraBaseModel
 # Private Imports
 # -----------------------------------------------------------------------------
 
-from netpaca import Metric
+from netpaca import Metric, MetricBatch, TagSet
 from netpaca import log
 from netpaca.drivers import DriverBase
 from netpaca.exporters import ExporterBase
+from netpaca.exporters.httpclient import HTTPClientConfigModel, ExporterHTTPClient
 
 # -----------------------------------------------------------------------------
 # Exports
@@ -49,6 +50,7 @@ __all__ = []
 class InfluxDBConfigModel(NoExtraBaseModel):
     server_url: EnvSecretUrl
     database: str
+    http: HTTPClientConfigModel = HTTPClientConfigModel()
 
 
 class InfluxDBExporter(ExporterBase):
@@ -64,15 +66,22 @@ class InfluxDBExporter(ExporterBase):
     def prepare(self, config: InfluxDBConfigModel):
         self.server_url = config.server_url.get_secret_value()
         self.post_url = f"{self.server_url}/write?db={config.database}"
-        self.httpx = httpx.AsyncClient(verify=False)
+        self.httpx = ExporterHTTPClient(self.name, config.http)
+
+    async def close(self):
+        """ close the pooled HTTP client connections """
+        if self.httpx:
+            await self.httpx.aclose()
 
     async def export_metrics(self, device: DriverBase, metrics):
         self.log.debug(f"{device.name}: exporting {len(metrics)} metrics to InfluxDB")
 
-        metrics_data = "\n".join(
-            _make_influxdb_metric(device_tags=device.tags, metric=metric)
-            for metric in metrics
-        )
+        if isinstance(metrics, MetricBatch):
+            metrics_data = _make_influxdb_batch(device_tags=device.tags, batch=metrics)
+        else:
+            metrics_data = "\n".join(
+                _make_influxdb_metric(device.tags, metric) for metric in metrics
+            )
 
         @retry(wait=wait_exponential(multiplier=1, min=4, max=10))
         async def post_metrics():
@@ -112,7 +121,46 @@ def _escape_tag_value(value):
     return _re_escape_chars(lambda mo: f"\\{mo.group()}", value)
 
 
+def _influxdb_labels(tags: TagSet) -> str:
+    return ",".join(f"{tag}={_escape_tag_value(value)}" for tag, value in tags.items())
+
+
+def _make_influxdb_labels(device_tags, tags) -> str:
+    # the labels string is cached on the interned TagSet of all tags.
+    all_tags = TagSet.intern(device_tags).merge(tags)
+    return all_tags.serialized("influxdb", _influxdb_labels)
+
+
+# the metric names are few, so the escaped measurement names are cached.
+
+
+@lru_cache(maxsize=None)
+def _escape_measurement(name: str) -> str:
+    return re.sub(r"[\s,]", lambda mo: f"\\{mo.group()}", name)
+
+
+def _format_field_value(value) -> str:
+    if not isinstance(value, str):
+        return str(value)
+
+    value = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{value}"'
+
+
 def _make_influxdb_metric(device_tags, metric: Metric) -> str:
-    all_tags = chain(device_tags.items(), metric.tags.items())
-    labels = ",".join(f"{tag}={_escape_tag_value(value)}" for tag, value in all_tags)
-    return f"{metric.name},{labels} value={metric.value} {metric.ts * 1_000_000}"
+    labels = _make_influxdb_labels(device_tags, metric.tags)
+    return (
+        f"{_escape_measurement(metric.name)},{labels} "
+        f"value={_format_field_value(metric.value)} {metric.ts * 1_000_000}"
+    )
+
+
+def _make_influxdb_batch(device_tags, batch: MetricBatch) -> str:
+    # the labels are created once per tag-set, and the timestamp once per batch.
+    labels = [_make_influxdb_labels(device_tags, tags) for tags in batch.tag_sets]
+    ts = batch.ts * 1_000_000
+    return "\n".join(
+        f"{_escape_measurement(name)},{labels[tags_idx]} "
+        f"value={_format_field_value(value)} {ts}"
+        for name, value, tags_idx in batch.rows()
+    )
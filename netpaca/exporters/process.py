@@ -0,0 +1,353 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the exporter-process support.  When an exporter is
+configured with `process = true`, the exporter instance is created in a
+dedicated child process.  The collector event loop only hands the metric
+batches to the child via a multiprocessing queue; the child process performs
+the serialization and sends the metrics to the backend, so that the exporter
+CPU usage does not stall the collector loop.
+
+The child process exports at most `process_max_inflight` batches at a time,
+and does not take further batches from the queue until an export completes,
+so that a slow backend fills the queue rather than the child process memory.
+When the queue is full, the batches are dropped and counted.  When netpaca
+stops, the child process is sent a shutdown sentinel so that it completes the
+pending exports and closes the exporter.
+
+The child process is started with the first export, so that it uses the log
+level set by the command line options.
+
+The self-metrics registered in the child process by the exporter, for example
+the HTTP connection pool statistics, are collected by the child every
+`selfmetrics_interval` seconds and sent to the collector process, where they
+are reported along with the exporter-process self-metrics.
+
+Example configuration
+---------------------
+    [exporters.influxdb]
+        use = "netpaca.exporters:influxdb"
+        process = true
+        process_max_inflight = 4
+        config.server_url = "$INFLUXDB_SERVER"
+        config.database = "db0"
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import List, Type
+import multiprocessing
+import asyncio
+import signal
+import queue
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, LiteMetric, MetricBatch, TagSet
+from netpaca import log
+from netpaca import selfmetrics
+from netpaca.drivers import DriverBase
+from netpaca.exporters import ExporterBase
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["ProcessExporter"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class ProcessExporter(ExporterBase):
+    """
+    The ProcessExporter is a proxy for an exporter that runs in a child
+    process.  The metrics are sent to the child as plain tuples, or as the
+    MetricBatch as-is, so that the pickling cost in the collector process is
+    kept small.
+
+    Attributes
+    ----------
+    queue_maxsize: int
+        The maximum number of metric batches waiting for the child process.
+        If the queue is full, then the batch is dropped and counted.
+
+    close_timeout: int
+        The number of seconds to wait for the child process to complete the
+        pending exports when netpaca stops.
+
+    selfmetrics_interval: float
+        The number of seconds between the child process self-metrics reports.
+    """
+
+    queue_maxsize = 10_000
+    close_timeout = 30
+    selfmetrics_interval = 15
+    _mp_context = multiprocessing.get_context("spawn")
+
+    def __init__(self, name, exporter_cls: Type[ExporterBase], max_inflight=4):
+        super().__init__(name)
+        self.exporter_cls = exporter_cls
+        self.max_inflight = max_inflight
+        self.config = None
+        self.queue = None
+        self.selfmetrics_queue = None
+        self.child_metrics = list()
+        self.process = None
+        self.batches = 0
+        self.dropped = 0
+        self.log = log.get_logger()
+
+    def prepare(self, config):
+        self.config = config
+        self.queue = self._mp_context.Queue(maxsize=self.queue_maxsize)
+        self.selfmetrics_queue = self._mp_context.Queue(maxsize=2)
+        selfmetrics.register(self.self_metrics)
+
+    def start(self):
+        """
+        Start the child process, passing the log level in effect now that the
+        command line options have been processed.
+        """
+        self.process = self._mp_context.Process(
+            target=_exporter_process_main,
+            name=f"netpaca-exporter-{self.name}",
+            args=(
+                self.exporter_cls,
+                self.name,
+                self.config,
+                self.queue,
+                self.max_inflight,
+                self.selfmetrics_queue,
+                self.selfmetrics_interval,
+                self.log.getEffectiveLevel(),
+            ),
+            daemon=True,
+        )
+        self.process.start()
+
+    async def close(self):
+        """
+        Send the shutdown sentinel to the child process and wait for it to
+        complete the pending exports.
+        """
+        if not (self.process and self.process.is_alive()):
+            return
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            await loop.run_in_executor(
+                None, self.queue.put, None, True, self.close_timeout
+            )
+            await loop.run_in_executor(None, self.process.join, self.close_timeout)
+
+        except queue.Full:
+            pass
+
+        if self.process.is_alive():
+            self.log.error(f"exporter {self.name}: process did not stop, terminating")
+            self.process.terminate()
+
+    async def export_metrics(self, device: DriverBase, metrics: List[Metric]):
+        if not self.process:
+            self.start()
+
+        if isinstance(metrics, MetricBatch):
+            rows = metrics
+        else:
+            rows = [(m.name, m.value, m.ts, m.tags) for m in metrics]
+
+        batch = (device.name, TagSet.intern(device.tags), rows)
+
+        try:
+            self.queue.put_nowait(batch)
+            self.batches += 1
+
+        except queue.Full:
+            self.dropped += len(metrics)
+            alive = "" if self.process.is_alive() else ", process is not running"
+            self.log.error(
+                f"{device.name}: exporter {self.name} queue full{alive}, "
+                f"dropping {len(metrics)} metrics"
+            )
+
+    def self_metrics(self) -> List[Metric]:
+        tags = {"exporter": self.name}
+        try:
+            qsize = self.queue.qsize()
+        except NotImplementedError:  # not available on macOS
+            qsize = -1
+
+        # each of the child process reports is exported once; only the latest
+        # report is kept.
+
+        try:
+            while True:
+                self.child_metrics = self.selfmetrics_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        child_metrics = [
+            Metric(name=m_name, value=m_value, ts=m_ts, tags=m_tags)
+            for m_name, m_value, m_ts, m_tags in self.child_metrics
+        ]
+        self.child_metrics = list()
+
+        return child_metrics + [
+            Metric(name="netpaca_exporter_process_queue", value=qsize, tags=tags),
+            Metric(
+                name="netpaca_exporter_process_batches", value=self.batches, tags=tags
+            ),
+            Metric(
+                name="netpaca_exporter_process_dropped", value=self.dropped, tags=tags
+            ),
+        ]
+
+
+# -----------------------------------------------------------------------------
+#
+#                        CODE EXECUTED IN CHILD PROCESS
+#
+# -----------------------------------------------------------------------------
+
+
+def _exporter_process_main(
+    exporter_cls,
+    name,
+    config,
+    metrics_queue,
+    max_inflight,
+    selfmetrics_queue,
+    selfmetrics_interval,
+    log_level,
+):
+    # the parent process controls the shutdown, by the sentinel, so that the
+    # child process is not interrupted by the Ctrl-C sent to the process group.
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    lgr = log.setup_logging()
+    lgr.setLevel(log_level)
+    asyncio.run(
+        _exporter_process_loop(
+            exporter_cls,
+            name,
+            config,
+            metrics_queue,
+            max_inflight,
+            selfmetrics_queue,
+            selfmetrics_interval,
+        )
+    )
+
+
+async def _forward_self_metrics(selfmetrics_queue, interval, process_sources):
+    """
+    Periodically send the self-metrics of the sources registered by the
+    exporter, that is other than the process_sources, to the parent process.
+    If the parent has not taken the previous reports, then the report is
+    dropped.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        sources = [src for src in selfmetrics.sources() if src not in process_sources]
+        report = [
+            (metric.name, metric.value, metric.ts, dict(metric.tags))
+            for metric in selfmetrics.collect(sources)
+        ]
+        try:
+            selfmetrics_queue.put_nowait(report)
+        except queue.Full:
+            pass
+
+
+async def _exporter_process_loop(
+    exporter_cls,
+    name,
+    config,
+    metrics_queue,
+    max_inflight,
+    selfmetrics_queue,
+    selfmetrics_interval,
+):
+    process_sources = selfmetrics.sources()
+    exporter = exporter_cls(name)
+    exporter.prepare(config)
+
+    loop = asyncio.get_running_loop()
+    devices = dict()
+
+    # a batch is taken from the queue only when an export slot is available,
+    # so that the queue provides the back-pressure to the collector process.
+
+    inflight = asyncio.Semaphore(max_inflight)
+    tasks = set()
+
+    forwarder = asyncio.create_task(
+        _forward_self_metrics(selfmetrics_queue, selfmetrics_interval, process_sources)
+    )
+
+    def export_done(task):
+        tasks.discard(task)
+        inflight.release()
+
+    while True:
+        await inflight.acquire()
+        batch = await loop.run_in_executor(None, metrics_queue.get)
+        if batch is None:
+            break
+
+        device_name, device_tags, rows = batch
+
+        # the child process uses a stand-in device instance that only
+        # provides the name and tags used by the exporters.
+
+        if (device := devices.get(device_name)) is None:
+            device = devices[device_name] = DriverBase(name=device_name)
+
+        device.tags = device_tags
+
+        if isinstance(rows, MetricBatch):
+            metrics = rows
+        else:
+            metrics = [
+                LiteMetric(name=m_name, value=m_value, ts=m_ts, tags=m_tags)
+                for m_name, m_value, m_ts, m_tags in rows
+            ]
+
+        task = asyncio.create_task(
+            exporter.export_metrics(device=device, metrics=metrics)
+        )
+        tasks.add(task)
+        task.add_done_callback(export_done)
+
+    # the shutdown sentinel: complete the pending exports and close the
+    # exporter.
+
+    forwarder.cancel()
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    await exporter.close()
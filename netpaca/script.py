@@ -18,6 +18,7 @@
 # -----------------------------------------------------------------------------
 
 import sys
+import signal
 import asyncio
 from importlib import metadata
 from functools import update_wrapper
@@ -33,6 +34,7 @@ from netpaca.core.cli.inventory import opts_inventory, pass_inventory_records
 # Private Imports
 # -----------------------------------------------------------------------------
 
+from netpaca import set_metric_validation
 from netpaca.config import load_config_file
 from netpaca.config_model import ConfigModel
 from netpaca import log
@@ -89,6 +91,10 @@ def set_log_level(ctx, param, value):  # noqa
     lgr.setLevel(value.upper())
 
 
+def set_validate_metrics(ctx, param, value):  # noqa
+    set_metric_validation(value)
+
+
 def map_config_inventory(f):
     """
     This decorator is used to map the config model inventory value into the
@@ -125,6 +131,12 @@ def map_config_inventory(f):
     default="info",
     callback=set_log_level,
 )
+@click.option(
+    "--validate-metrics",
+    is_flag=True,
+    help="validate all metrics using pydantic (debug)",
+    callback=set_validate_metrics,
+)
 @map_config_inventory
 @pass_inventory_records
 def cli_netifdom(inventory_records, config, **kwargs):
@@ -141,7 +153,20 @@ def cli_netifdom(inventory_records, config, **kwargs):
     for rec in inventory_records:
         loop.create_task(async_main_device(executor, rec, config=config))
 
-    loop.run_forever()
+    if config.defaults.self_metrics:
+        loop.create_task(executor.export_self_metrics())
+
+    # stop the loop on SIGTERM as on Ctrl-C, and then close the exporters so
+    # that any buffered metrics are written.
+
+    loop.add_signal_handler(signal.SIGTERM, loop.stop)
+
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(executor.close_exporters())
 
 
 def main():
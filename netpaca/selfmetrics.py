@@ -0,0 +1,100 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This module provides the "self-metrics" registry.  Self-metrics are the metrics
+that netpaca produces about its own operation, for example the exporter HTTP
+connection pool statistics.  Any component can register a source function that
+returns a list of Metric; the CollectorExecutor will periodically collect these
+and export them when the `defaults.self_metrics` option is enabled.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Callable, List, Optional, Iterable
+from itertools import chain
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric
+from netpaca import log
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["register", "unregister", "sources", "collect"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+SelfMetricSource = Callable[[], List[Metric]]
+
+_sources: List[SelfMetricSource] = list()
+
+
+def register(source: SelfMetricSource) -> SelfMetricSource:
+    """
+    Register a function that returns a list of self-metrics.  This function
+    can also be used as a decorator.
+    """
+    if source not in _sources:
+        _sources.append(source)
+
+    return source
+
+
+def unregister(source: SelfMetricSource):
+    """ Remove a previously registered self-metric source function """
+    try:
+        _sources.remove(source)
+    except ValueError:
+        pass
+
+
+def sources() -> List[SelfMetricSource]:
+    """ Returns the list of the registered self-metric source functions """
+    return list(_sources)
+
+
+def collect(
+    from_sources: Optional[Iterable[SelfMetricSource]] = None,
+) -> List[Metric]:
+    """
+    Returns the list of all self-metrics from all registered sources, or from
+    the given sources.  A source function that raises an exception is logged
+    and skipped so that it does not prevent the other sources from reporting.
+    """
+
+    def from_source(source):
+        try:
+            return source() or []
+        except Exception as exc:  # noqa
+            log.get_logger().error(
+                f"self-metrics source {source} failed: {exc.__class__.__name__}"
+            )
+            return []
+
+    if from_sources is None:
+        from_sources = _sources
+
+    return list(chain.from_iterable(map(from_source, from_sources)))
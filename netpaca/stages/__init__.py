@@ -0,0 +1,56 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional, List, Tuple
+from netpaca.core.config_model import BaseModel
+
+from netpaca.drivers import DriverBase
+from netpaca import Metric
+
+
+__all__ = ["StageBase"]
+
+
+class StageBase(object):
+    """
+    A StageBase is a step in the exporter pipeline.  Each exporter can be
+    configured with a list of stages; the metrics produced by a collector are
+    passed through each stage, in order, before they are given to the
+    exporter `export_metrics` coroutine.  A stage can drop, modify, or add
+    metrics.  If a stage returns no metrics then nothing is exported.
+    """
+
+    config: Optional[BaseModel] = None
+
+    def __init__(self, name):
+        self.name = name
+
+    def prepare(self, config):
+        pass
+
+    def process(self, device: DriverBase, metrics: List[Metric]) -> List[Metric]:
+        return metrics
+
+    def close(self) -> List[Tuple[DriverBase, List[Metric]]]:
+        """
+        Called once when netpaca stops.  Returns the list of (device, metrics)
+        held by the stage, for example the open aggregation windows, that are
+        then passed through the following stages to the exporter.  The
+        default returns an empty list.
+        """
+        return []
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,348 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the windowed aggregation (downsampling) stage.  Numeric
+metric values are accumulated per series into fixed time windows aligned to
+the epoch.  A series is identified by the device name, the metric name, and
+the metric tags.
+
+The rolled-up metrics of a window are emitted when a value for a later window
+arrives, or when the stage next processes the metrics of the same device after
+the window has elapsed on the wall clock; so the window of a series that is
+no longer passed to the stage, for example by a preceding deadband stage, is
+still emitted.  A value for a window older than the current window of the
+series is dropped and counted as late.  When netpaca stops the open windows
+are emitted, see StageBase.close().
+
+The series that have not been seen for `expire` windows are dropped, and so
+are the devices; the open windows of a device that is dropped are discarded.
+
+The rolled-up metric names are created using the `name_format` option, for
+example "ifdom_rxpower_max", and use the window start time as the timestamp.
+
+Example configuration
+---------------------
+To store the raw values in one exporter and the 5 minute aggregates in
+another, configure both exporters as active:
+
+    [defaults]
+        exporters = ["influxdb_raw", "influxdb_5m"]
+
+    [[exporters.influxdb_5m.stages]]
+        use = "netpaca.stages:aggregate"
+        config.window = 300
+        config.functions = ["min", "max", "avg"]
+
+Alternatively set `config.passthrough = true` to export the raw values in
+addition to the aggregates through the same exporter.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict, Tuple, Literal
+from array import array
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pydantic import PositiveInt
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, LiteMetric, TagSet, timestamp_now
+from netpaca import selfmetrics
+from netpaca.core.config_model import NoExtraBaseModel
+from netpaca.drivers import DriverBase
+from netpaca.stages import StageBase
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["AggregateStage", "AggregateConfigModel"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+AggregateFunction = Literal["min", "max", "avg", "sum", "count", "last"]
+
+
+class AggregateConfigModel(NoExtraBaseModel):
+    window: PositiveInt = 300  # seconds
+    functions: List[AggregateFunction] = ["min", "max", "avg"]
+    name_format: str = "{name}_{function}"
+    passthrough: bool = False
+    metrics: Optional[List[str]]  # metric names, all if not provided
+    expire: PositiveInt = 3  # windows
+
+
+class DeviceSeries(object):
+    """
+    The series accumulators of a device, stored in compact arrays indexed by a
+    series number, rather than as a Python object per series.  The `window`
+    of a series is the start time of its current window; the values of an
+    earlier window are late.
+    """
+
+    __slots__ = (
+        "device",
+        "last_seen",
+        "checked",
+        "index",
+        "keys",
+        "window",
+        "count",
+        "min",
+        "max",
+        "sum",
+        "last",
+        "seen",
+    )
+
+    def __init__(self, device: DriverBase):
+        self.device = device
+        self.last_seen = 0
+        self.checked = 0
+        self.index: Dict[Tuple[str, TagSet], int] = dict()
+        self.keys: List[Tuple[str, TagSet]] = list()
+        self.window = array("q")
+        self.count = array("L")
+        self.min = array("d")
+        self.max = array("d")
+        self.sum = array("d")
+        self.last = array("d")
+        self.seen = array("q")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key: Tuple[str, TagSet], window: int) -> int:
+        idx = self.index[key] = len(self.keys)
+        self.keys.append(key)
+        self.window.append(window)
+        self.count.append(0)
+        for arr in (self.min, self.max, self.sum, self.last):
+            arr.append(0.0)
+        self.seen.append(0)
+        return idx
+
+    def keep(self, keep: List[int]):
+        """ retain only the given series, compacting the arrays """
+        self.keys = [self.keys[idx] for idx in keep]
+        self.index = {key: new_idx for new_idx, key in enumerate(self.keys)}
+        for attr in ("window", "count", "min", "max", "sum", "last", "seen"):
+            arr = getattr(self, attr)
+            setattr(self, attr, array(arr.typecode, (arr[idx] for idx in keep)))
+
+
+class AggregateStage(StageBase):
+    """
+    The series accumulators are stored per device, so that the elapsed
+    windows of a device are closed, and emitted for that device, when the
+    stage next processes the metrics of the device.
+    """
+
+    config = AggregateConfigModel
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.window_ms = 0
+        self.expire_ms = 0
+        self.functions = list()
+        self.name_format = None
+        self.passthrough = False
+        self.metric_names = None
+
+        self._devices: Dict[str, DeviceSeries] = dict()
+        self._swept = timestamp_now()
+
+        self.emitted = 0
+        self.late = 0
+        self.expired = 0
+
+    def prepare(self, config: AggregateConfigModel):
+        self.window_ms = config.window * 1000
+        self.expire_ms = config.expire * self.window_ms
+        self.functions = config.functions
+        self.name_format = config.name_format
+        self.passthrough = config.passthrough
+        self.metric_names = set(config.metrics) if config.metrics else None
+        selfmetrics.register(self.self_metrics)
+
+    def process(self, device: DriverBase, metrics: List[Metric]) -> List[Metric]:
+        results = list()
+        now = timestamp_now()
+
+        if (series := self._devices.get(device.name)) is None:
+            series = self._devices[device.name] = DeviceSeries(device)
+
+        series.device = device
+        series.last_seen = now
+
+        for metric in metrics:
+            value = metric.value
+            if (
+                self.metric_names is not None and metric.name not in self.metric_names
+            ) or not isinstance(value, (int, float)):
+                results.append(metric)
+                continue
+
+            if self.passthrough:
+                results.append(metric)
+
+            results.extend(self._accumulate(series, metric, now))
+
+        # the windows are checked once per wall clock window for each device.
+
+        if now - series.checked >= self.window_ms:
+            results.extend(self._close_elapsed(series, now))
+
+        if now - self._swept >= self.window_ms:
+            self._expire_devices(now)
+
+        return results
+
+    def close(self) -> List[Tuple[DriverBase, List[Metric]]]:
+        """ returns the rolled-up metrics of the open windows of each device """
+        flushed = list()
+
+        for series in self._devices.values():
+            metrics = [
+                metric
+                for idx in range(len(series))
+                if series.count[idx]
+                for metric in self._rollup(series, idx)
+            ]
+            if metrics:
+                flushed.append((series.device, metrics))
+
+        self._devices.clear()
+        return flushed
+
+    def _accumulate(self, series: DeviceSeries, metric: Metric, now: int):
+        """
+        Add the metric value to the series window.  If the value belongs to a
+        later window, then return the rolled-up metrics for the closed window.
+        """
+        key = (metric.name, TagSet.intern(metric.tags))
+        window = metric.ts - metric.ts % self.window_ms
+        value = metric.value
+        closed = []
+
+        if (idx := series.index.get(key)) is None:
+            idx = series.add(key, window)
+
+        elif window < series.window[idx]:
+            self.late += 1
+            return closed
+
+        elif window > series.window[idx]:
+            closed = self._rollup(series, idx)
+            series.window[idx] = window
+            series.count[idx] = 0
+
+        if series.count[idx] == 0:
+            series.min[idx] = series.max[idx] = value
+            series.sum[idx] = 0.0
+        else:
+            series.min[idx] = min(series.min[idx], value)
+            series.max[idx] = max(series.max[idx], value)
+
+        series.sum[idx] += value
+        series.last[idx] = value
+        series.count[idx] += 1
+        series.seen[idx] = now
+
+        return closed
+
+    def _close_elapsed(self, series: DeviceSeries, now: int) -> List[Metric]:
+        """
+        Return the rolled-up metrics of the device windows that have elapsed,
+        and drop the device series that have not been seen for the expire
+        period.
+        """
+        series.checked = now - now % self.window_ms
+        closed = list()
+
+        for idx in range(len(series)):
+            if series.count[idx] and series.window[idx] + self.window_ms <= now:
+                closed.extend(self._rollup(series, idx))
+                series.window[idx] += self.window_ms
+                series.count[idx] = 0
+
+        cutoff = now - self.expire_ms
+        keep = [idx for idx in range(len(series)) if series.seen[idx] >= cutoff]
+        if len(keep) != len(series):
+            self.expired += len(series) - len(keep)
+            series.keep(keep)
+
+        return closed
+
+    def _expire_devices(self, now: int):
+        """ drop the devices that have not been processed for the expire period """
+        self._swept = now
+        cutoff = now - self.expire_ms
+
+        for name, series in list(self._devices.items()):
+            if series.last_seen < cutoff:
+                self.expired += len(series)
+                del self._devices[name]
+
+    def _rollup(self, series: DeviceSeries, idx: int) -> List[Metric]:
+        count = series.count[idx]
+        if not count:
+            return []
+
+        values = {
+            "min": series.min[idx],
+            "max": series.max[idx],
+            "sum": series.sum[idx],
+            "avg": series.sum[idx] / count,
+            "count": count,
+            "last": series.last[idx],
+        }
+
+        name, tags = series.keys[idx]
+        ts = series.window[idx]
+        self.emitted += len(self.functions)
+
+        return [
+            LiteMetric(
+                name=self.name_format.format(name=name, function=func),
+                value=values[func],
+                ts=ts,
+                tags=tags,
+            )
+            for func in self.functions
+        ]
+
+    def self_metrics(self) -> List[Metric]:
+        tags = {"stage": self.name}
+        series = sum(map(len, self._devices.values()))
+        return [
+            Metric(name="netpaca_aggregate_emitted", value=self.emitted, tags=tags),
+            Metric(name="netpaca_aggregate_series", value=series, tags=tags),
+            Metric(name="netpaca_aggregate_late", value=self.late, tags=tags),
+            Metric(name="netpaca_aggregate_expired", value=self.expired, tags=tags),
+        ]
@@ -0,0 +1,223 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the "report-by-exception" deadband stage.  A metric value
+is only passed on to the exporter when it has changed by more than the
+configured deadband since the last value exported for the same series, or
+when the heartbeat interval has elapsed.  A series is identified by the
+device name, the metric name, and the metric tags.
+
+Example configuration
+---------------------
+    [[exporters.influxdb.stages]]
+        use = "netpaca.stages:deadband"
+        config.absolute = 0.1
+        config.relative = 0.02
+        config.heartbeat = 900
+        config.expire = 3
+
+If neither `absolute` nor `relative` is configured, then a value is exported
+only when it changes.  Non-numeric values are always exported on change.
+
+The state of a series that has not been seen for `expire` heartbeat intervals,
+for example of a removed interface, is dropped; if the series reappears then
+its first value is exported.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Optional, List, Dict, Tuple, Any
+from array import array
+
+# -----------------------------------------------------------------------------
+# Public Imports
+# -----------------------------------------------------------------------------
+
+from pydantic import PositiveInt, confloat
+
+# -----------------------------------------------------------------------------
+# Private Imports
+# -----------------------------------------------------------------------------
+
+from netpaca import Metric, TagSet, timestamp_now
+from netpaca import selfmetrics
+from netpaca.core.config_model import NoExtraBaseModel
+from netpaca.drivers import DriverBase
+from netpaca.stages import StageBase
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["DeadbandStage", "DeadbandConfigModel"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class DeadbandConfigModel(NoExtraBaseModel):
+    absolute: Optional[confloat(ge=0)]
+    relative: Optional[confloat(ge=0)]  # fraction of last value, 0.05 is 5%
+    heartbeat: PositiveInt = 600  # seconds
+    expire: PositiveInt = 3  # heartbeat intervals
+    metrics: Optional[List[str]]  # metric names, all if not provided
+
+
+SeriesKey = Tuple[str, str, TagSet]
+
+
+class DeadbandStage(StageBase):
+    """
+    The series state is stored as a dictionary that maps the series key to an
+    index into compact arrays of the last exported value and timestamp, and
+    the last seen timestamp, rather than storing a Metric instance per series.
+    The arrays are compacted when the idle series are expired.
+    """
+
+    config = DeadbandConfigModel
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.absolute = None
+        self.relative = None
+        self.heartbeat_ms = 0
+        self.expire_ms = 0
+        self.metric_names = None
+
+        self._index: Dict[SeriesKey, int] = dict()
+        self._values = array("d")
+        self._ts = array("q")
+        self._seen = array("q")
+        self._other_values: Dict[int, Any] = dict()
+        self._last_expire = timestamp_now()
+
+        self.passed = 0
+        self.suppressed = 0
+        self.expired = 0
+
+    def prepare(self, config: DeadbandConfigModel):
+        self.absolute = config.absolute
+        self.relative = config.relative
+        self.heartbeat_ms = config.heartbeat * 1000
+        self.expire_ms = config.expire * self.heartbeat_ms
+        self.metric_names = set(config.metrics) if config.metrics else None
+        selfmetrics.register(self.self_metrics)
+
+    def process(self, device: DriverBase, metrics: List[Metric]) -> List[Metric]:
+        exported = [metric for metric in metrics if self._changed(device, metric)]
+        self.passed += len(exported)
+        self.suppressed += len(metrics) - len(exported)
+
+        if (now := timestamp_now()) - self._last_expire >= self.expire_ms:
+            self._expire(now - self.expire_ms)
+            self._last_expire = now
+
+        return exported
+
+    def _changed(self, device: DriverBase, metric: Metric) -> bool:
+        """
+        Returns True if the metric should be exported, and updates the series
+        state accordingly.  Returns False if the metric is within the deadband.
+        """
+        if self.metric_names is not None and metric.name not in self.metric_names:
+            return True
+
+        key = (device.name, metric.name, TagSet.intern(metric.tags))
+        value = metric.value
+        numeric = isinstance(value, (int, float))
+
+        if (idx := self._index.get(key)) is None:
+            idx = self._index[key] = len(self._ts)
+            self._ts.append(metric.ts)
+            self._seen.append(metric.ts)
+            self._values.append(value if numeric else 0.0)
+            if not numeric:
+                self._other_values[idx] = value
+            return True
+
+        self._seen[idx] = metric.ts
+
+        if metric.ts - self._ts[idx] < self.heartbeat_ms:
+            if numeric:
+                if not self._exceeds(self._values[idx], value):
+                    return False
+            elif self._other_values.get(idx) == value:
+                return False
+
+        self._ts[idx] = metric.ts
+        if numeric:
+            self._values[idx] = value
+            self._other_values.pop(idx, None)
+        else:
+            self._other_values[idx] = value
+
+        return True
+
+    def _expire(self, cutoff_ts: int):
+        """
+        Drop the series last seen before the cutoff timestamp, and compact the
+        state arrays of the remaining series.
+        """
+        seen = self._seen
+        keep = [
+            (key, idx) for key, idx in self._index.items() if seen[idx] >= cutoff_ts
+        ]
+
+        if len(keep) == len(self._index):
+            return
+
+        self.expired += len(self._index) - len(keep)
+
+        other_values = self._other_values
+        self._other_values = {
+            new_idx: other_values[idx]
+            for new_idx, (_, idx) in enumerate(keep)
+            if idx in other_values
+        }
+        self._index = {key: new_idx for new_idx, (key, _) in enumerate(keep)}
+        self._values = array("d", (self._values[idx] for _, idx in keep))
+        self._ts = array("q", (self._ts[idx] for _, idx in keep))
+        self._seen = array("q", (seen[idx] for _, idx in keep))
+
+    def _exceeds(self, last: float, value: float) -> bool:
+        delta = abs(value - last)
+
+        if self.absolute is None and self.relative is None:
+            return value != last
+
+        if self.absolute is not None and delta > self.absolute:
+            return True
+
+        if self.relative is not None and delta > self.relative * abs(last):
+            return True
+
+        return False
+
+    def self_metrics(self) -> List[Metric]:
+        tags = {"stage": self.name}
+        return [
+            Metric(name="netpaca_deadband_passed", value=self.passed, tags=tags),
+            Metric(
+                name="netpaca_deadband_suppressed", value=self.suppressed, tags=tags
+            ),
+            Metric(name="netpaca_deadband_series", value=len(self._index), tags=tags),
+            Metric(name="netpaca_deadband_expired", value=self.expired, tags=tags),
+        ]
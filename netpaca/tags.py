@@ -0,0 +1,158 @@
+#  Copyright (C) 2020  Jeremy Schulman
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+This file contains the TagSet, an immutable and interned tag mapping.  Equal
+tag mappings, with the same key order, share a single TagSet instance across
+all metrics and devices.  A TagSet caches its hash, the merged TagSet of
+device and metric tags, and the exporter specific serialized forms of the
+tags, so that this work is done once per distinct tag-set rather than once
+per metric.
+
+The merged TagSet cache is a bounded LRU, of `merge_cache_size` entries per
+TagSet, so that the churn of the metric tags, for example interfaces that
+come and go, does not keep the merged TagSet instances alive indefinitely.
+"""
+
+# -----------------------------------------------------------------------------
+# System Imports
+# -----------------------------------------------------------------------------
+
+from typing import Mapping, Callable, Any, Iterator
+from collections.abc import Mapping as MappingABC
+from collections import OrderedDict
+from weakref import WeakValueDictionary
+
+# -----------------------------------------------------------------------------
+# Exports
+# -----------------------------------------------------------------------------
+
+__all__ = ["TagSet"]
+
+# -----------------------------------------------------------------------------
+#
+#                                   CODE BEGINS
+#
+# -----------------------------------------------------------------------------
+
+
+class TagSet(MappingABC):
+    """
+    An immutable tag mapping.  Creating a TagSet from a mapping, or from a
+    sequence of (key, value) items, returns the shared interned instance.
+
+    Examples
+    --------
+        device_tags = TagSet.intern(inventory_rec)
+        if_tags = TagSet.intern({"if_name": "Ethernet1/1"})
+        all_tags = device_tags.merge(if_tags)
+
+        labels = all_tags.serialized("influxdb", make_labels)
+    """
+
+    __slots__ = ("_items", "_dict", "_hash", "_forms", "_merged", "__weakref__")
+
+    _interned: Mapping[tuple, "TagSet"] = WeakValueDictionary()
+
+    merge_cache_size = 4096
+
+    def __new__(cls, tags=()):
+        items = tuple(tags.items() if isinstance(tags, MappingABC) else tags)
+
+        if (tag_set := cls._interned.get(items)) is None:
+            tag_set = super().__new__(cls)
+            tag_set._items = items
+            tag_set._dict = dict(items)
+            tag_set._hash = hash(items)
+            tag_set._forms = dict()
+            tag_set._merged = OrderedDict()
+            cls._interned[items] = tag_set
+
+        return tag_set
+
+    @classmethod
+    def intern(cls, tags: Mapping) -> "TagSet":
+        """ returns the shared TagSet instance equal to the `tags` mapping """
+        return tags if isinstance(tags, TagSet) else cls(tags)
+
+    def merge(self, other: Mapping) -> "TagSet":
+        """
+        Returns the TagSet of these tags updated by the `other` tags.  The
+        result is cached, so merging the device tags with the same metric tags
+        is only done once while the metric tags are in use.
+        """
+        other = TagSet.intern(other)
+        cache = self._merged
+
+        if (merged := cache.get(other)) is not None:
+            cache.move_to_end(other)
+            return merged
+
+        if not other:
+            merged = self
+        elif not self:
+            merged = other
+        else:
+            merged = TagSet.intern({**self._dict, **other._dict})
+
+        cache[other] = merged
+        if len(cache) > self.merge_cache_size:
+            cache.popitem(last=False)
+
+        return merged
+
+    def serialized(self, form: str, serializer: Callable[["TagSet"], Any]) -> Any:
+        """
+        Returns the serialized form of the tags identified by `form`, for
+        example "influxdb".  The `serializer` function is only called the
+        first time a form is requested.
+        """
+        try:
+            return self._forms[form]
+        except KeyError:
+            value = self._forms[form] = serializer(self)
+            return value
+
+    def __getitem__(self, key):
+        return self._dict[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._dict)
+
+    def __len__(self):
+        return len(self._items)
+
+    def items(self):
+        return self._dict.items()
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+
+        if isinstance(other, TagSet):
+            return self._hash == other._hash and self._items == other._items
+
+        return self._dict == other
+
+    def __reduce__(self):
+        # unpickled instances, for example in the exporter process, are
+        # interned in the receiving process.
+        return TagSet, (self._items,)
+
+    def __repr__(self):
+        return f"TagSet({self._dict!r})"
@@ -33,12 +33,15 @@ with open("README.md", "r") as fh:
 #
 # -----------------------------------------------------------------------------
 
-# builtin extras to support Cisco NX-API and Arista EOS device driver.
+# builtin extras to support Cisco NX-API and Arista EOS device driver, the
+# local file exporter Parquet/zstd formats, and the SNMP collectors.
 
 extras_require = {
     "nxapi": requirements("requirements-drivers-nxapi.txt"),
     "eapi": requirements("requirements-drivers-eapi.txt"),
     "ios": requirements("requirements-drivers-ssh.txt"),
+    "file": requirements("requirements-exporters-file.txt"),
+    "snmp": requirements("requirements-snmp.txt"),
 }
 
 # add the option for all optional extras
@@ -73,6 +76,14 @@ setup(
         "netpaca.exporters": [
             "circonus = netpaca.exporters.circonus:CirconusExporter",
             "influxdb = netpaca.exporters.influxdb:InfluxDBExporter",
+            "file = netpaca.exporters.file:FileExporter",
+        ],
+        "netpaca.collectors": [
+            "ifcounters = netpaca.collectors.ifcounters:IFCountersCollector",
+        ],
+        "netpaca.stages": [
+            "deadband = netpaca.stages.deadband:DeadbandStage",
+            "aggregate = netpaca.stages.aggregate:AggregateStage",
         ],
     },
     classifiers=[
@@ -42,3 +42,120 @@ def clean(ctx):
     ctx.run("rm -rf netcfgbu.egg-info")
     ctx.run("rm -rf .pytest_cache .pytest_tmpdir .coverage")
     ctx.run("rm -rf htmlcov")
+
+
+@task(
+    help={
+        "batch_sizes": "comma separated list of metric batch sizes",
+        "batches": "number of batches exported per batch size",
+        "latency": "stub backend response latency in milliseconds",
+        "error_rate": "fraction of stub backend responses that are 5xx",
+        "storm_every": "seconds between stub backend 5xx storms",
+        "storm_duration": "seconds that each 5xx storm lasts",
+    }
+)
+def bench_exporters(
+    ctx,
+    batch_sizes="100,1000,10000",
+    batches=50,
+    latency=0.0,
+    error_rate=0.0,
+    storm_every=0,
+    storm_duration=0,
+):
+    """ run the exporter throughput benchmark against local stub backends """
+    ctx.run(
+        "python benchmarks/bench_exporters.py"
+        f" --batch-sizes {batch_sizes} --batches {batches} --latency {latency}"
+        f" --error-rate {error_rate} --storm-every {storm_every}"
+        f" --storm-duration {storm_duration}",
+        pty=True,
+    )
+
+
+@task(help={"count": "number of metrics constructed per metric type"})
+def bench_metric(ctx, count=100_000):
+    """ run the Metric vs LiteMetric construction benchmark """
+    ctx.run(f"python benchmarks/bench_metric.py --count {count}", pty=True)
+
+
+@task(
+    help={
+        "interfaces": "number of interfaces served by the SNMP agent simulator",
+        "walks": "number of walks per method",
+        "max_repetitions": "comma separated list of GETBULK max-repetitions",
+        "latency": "agent response latency in milliseconds",
+        "loss": "fraction of agent responses that are dropped",
+        "agent": "agent simulator: sim (codec based) or pysnmp",
+        "recording": "recorded walk file served by the sim agent",
+    }
+)
+def bench_snmp_walk(
+    ctx,
+    interfaces=500,
+    walks=3,
+    max_repetitions="10,25,50",
+    latency=0.0,
+    loss=0.0,
+    agent="sim",
+    recording=None,
+):
+    """ run the SNMP GETNEXT vs GETBULK table walk benchmark """
+    ctx.run(
+        "python benchmarks/bench_snmp_walk.py"
+        f" --interfaces {interfaces} --walks {walks}"
+        f" --max-repetitions {max_repetitions} --latency {latency} --loss {loss}"
+        f" --agent {agent}" + (f" --recording {recording}" if recording else ""),
+        pty=True,
+    )
+
+
+@task(help={"rows": "number of table rows converted per factory"})
+def bench_snmp_factories(ctx, rows=50_000):
+    """ run the SNMP prettyPrint vs typed row factory benchmark """
+    ctx.run(f"python benchmarks/bench_snmp_factories.py --rows {rows}", pty=True)
+
+
+@task(
+    help={
+        "interfaces": "number of interfaces in the synthetic CLI output",
+        "count": "number of parses per parser",
+    }
+)
+def bench_parsers(ctx, interfaces=48, count=100):
+    """ run the new TTP parser per call vs cached TTP parser benchmark """
+    ctx.run(
+        "python benchmarks/bench_parsers.py"
+        f" --interfaces {interfaces} --count {count}",
+        pty=True,
+    )
+
+
+@task(help={"update": "write the golden result files from the parser results"})
+def check_parsers(ctx, update=False):
+    """ check the SSH driver parsers against the golden corpus results """
+    ctx.run(
+        "python benchmarks/check_parsers.py" + (" --update" if update else ""),
+        pty=True,
+    )
+
+
+@task
+def check_process_exporter(ctx):
+    """ check the exporter child process self-metrics and shutdown """
+    ctx.run("python benchmarks/check_process_exporter.py", pty=True)
+
+
+@task(
+    help={
+        "rounds": "number of timed rounds per corpus file",
+        "ttp": "include the retained TTP parsers",
+    }
+)
+def bench_corpus(ctx, rounds=5, ttp=False):
+    """ run the SSH driver parser benchmark on the golden corpus files """
+    ctx.run(
+        f"python benchmarks/bench_corpus.py --rounds {rounds}"
+        + (" --ttp" if ttp else ""),
+        pty=True,
+    )